@@ -0,0 +1,64 @@
+"""
+Re-fetch the public X.com home page and detect ondemand.s bundle rotation.
+
+Uses urllib from the standard library so the bridge service can run the
+refresh without importing requests.
+"""
+import urllib.request
+
+from artifact_scan import (
+    ONDEMAND_FILE_URL_TEMPLATE,
+    map_file,
+    scan_animation_frames,
+    scan_key_byte_indices,
+    scan_ondemand_file_url,
+    scan_site_verification_key,
+)
+
+PUBLIC_HOME_URL = "https://x.com"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36"
+
+
+def http_get_text(url: str, timeout: float = 30) -> str:
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read().decode(response.headers.get_content_charset() or "utf-8", errors="replace")
+
+
+def current_ondemand_file_url(store, url_template: str = ONDEMAND_FILE_URL_TEMPLATE):
+    """ondemand.s URL the stored artifacts belong to (recorded URL, else scanned from the saved home page)."""
+    recorded = store.snapshot().artifacts.get("ondemand", {}).get("url")
+    if recorded:
+        return recorded
+    if not store.has_transaction_artifacts():
+        return None
+    with map_file(store.home_path) as home_buf:
+        return scan_ondemand_file_url(home_buf, url_template)
+
+
+def refresh_public_artifacts(store, home_url: str = PUBLIC_HOME_URL,
+                             url_template: str = ONDEMAND_FILE_URL_TEMPLATE, timeout: float = 30) -> bool:
+    """
+    Fetch the public home page and, if it references a different ondemand.s
+    bundle than the stored artifacts, fetch the new bundle and replace both
+    artifacts in one store generation.
+
+    Returns:
+        bool: Whether the artifacts were replaced
+    """
+    home_html = http_get_text(home_url, timeout)
+    home_bytes = home_html.encode("utf-8")
+    ondemand_url = scan_ondemand_file_url(home_bytes, url_template)
+    if not ondemand_url:
+        raise ValueError(f"Could not extract ondemand.s JS URL from {home_url}")
+    if ondemand_url == current_ondemand_file_url(store, url_template):
+        return False
+
+    ondemand_js = http_get_text(ondemand_url, timeout)
+    # Validate the new pair before it replaces artifacts that are known to work
+    scan_site_verification_key(home_bytes)
+    scan_animation_frames(home_bytes)
+    scan_key_byte_indices(ondemand_js.encode("utf-8"))
+
+    store.write_artifacts({"home": (home_html, home_url), "ondemand": (ondemand_js, ondemand_url)})
+    return True
@@ -0,0 +1,129 @@
+"""
+Byte-level extraction of transaction generator inputs from saved artifacts.
+
+x_client_transaction expects BeautifulSoup trees of twitter_home.html and
+twitter_ondemand.js, but only reads a meta tag, the loading-x-anim SVG frames
+and an index array out of them. These helpers memory-map the files and pull the
+same values out with precompiled byte regexes, without building any tree.
+"""
+import base64
+import html
+import mmap
+import re
+from contextlib import contextmanager
+from functools import reduce
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Same patterns x_client_transaction applies to str(soup), compiled for bytes
+ON_DEMAND_FILE_REGEX = re.compile(
+    rb"""['|\"]{1}ondemand\.s['|\"]{1}:\s*['|\"]{1}([\w]*)['|\"]{1}""", flags=(re.VERBOSE | re.MULTILINE))
+INDICES_REGEX = re.compile(
+    rb"""(\(\w{1}\[(\d{1,2})\],\s*16\))+""", flags=(re.VERBOSE | re.MULTILINE))
+
+SITE_VERIFICATION_TAG_REGEX = re.compile(
+    rb"""<[a-zA-Z][\w-]*\b[^>]*?(?<![\w-])name\s*=\s*["']twitter-site-verification["'][^>]*>""")
+CONTENT_ATTR_REGEX = re.compile(rb"""\bcontent\s*=\s*["']([^"']*)["']""")
+# <svg id="loading-x-anim-N" ...><g><path .../><path d="..."/></g></svg>: the
+# library reads the 'd' attribute of the second child of the first child.
+ANIMATION_FRAME_REGEX = re.compile(
+    rb"""<[a-zA-Z][\w-]*\b[^>]*?(?<![\w-])id\s*=\s*["']loading-x-anim[^"']*["'][^>]*>\s*"""
+    rb"""<[a-zA-Z][\w-]*\b[^>]*>\s*"""
+    rb"""<[a-zA-Z][\w-]*\b[^>]*>(?:\s*</[a-zA-Z][\w-]*>)?\s*"""
+    rb"""<[a-zA-Z][\w-]*\b[^>]*?\sd\s*=\s*["']([^"']*)["']""")
+NON_DIGITS_REGEX = re.compile(r"[^\d]+")
+
+ONDEMAND_FILE_URL_TEMPLATE = "https://abs.twimg.com/responsive-web/client-web/ondemand.s.{}a.js"
+TOTAL_ANIMATION_TIME = 4096
+
+
+@contextmanager
+def map_file(path):
+    """Read-only memory map of a file; empty files yield b'' instead of failing."""
+    with open(path, "rb") as f:
+        if Path(path).stat().st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def scan_site_verification_key(buf) -> str:
+    """Content of the twitter-site-verification meta tag."""
+    tag = SITE_VERIFICATION_TAG_REGEX.search(buf)
+    content = CONTENT_ATTR_REGEX.search(tag.group(0)) if tag else None
+    if not content:
+        raise Exception("Couldn't get key from the page source")
+    return html.unescape(content.group(1).decode("utf-8"))
+
+
+def scan_animation_frames(buf) -> List[List[List[int]]]:
+    """Number rows of every loading-x-anim frame, in document order."""
+    frames = []
+    for match in ANIMATION_FRAME_REGEX.finditer(buf):
+        d = html.unescape(match.group(1).decode("utf-8"))
+        frames.append([[int(x) for x in NON_DIGITS_REGEX.sub(" ", item).strip().split()]
+                       for item in d[9:].split("C")])
+    if not frames:
+        raise Exception("Couldn't get animation frames from the page source")
+    return frames
+
+
+def scan_ondemand_file_url(buf, url_template: str = ONDEMAND_FILE_URL_TEMPLATE) -> Optional[str]:
+    """ondemand.s bundle URL referenced by the home page, or None."""
+    match = ON_DEMAND_FILE_REGEX.search(buf)
+    if not match:
+        return None
+    return url_template.format(match.group(1).decode("utf-8"))
+
+
+def scan_key_byte_indices(buf) -> Tuple[int, List[int]]:
+    """(row index, key byte indices) from the ondemand.s bundle."""
+    key_byte_indices = [int(match.group(2)) for match in INDICES_REGEX.finditer(buf)]
+    if not key_byte_indices:
+        raise Exception("Couldn't get KEY_BYTE indices")
+    return key_byte_indices[0], key_byte_indices[1:]
+
+
+def scan_home_artifact(path) -> Dict:
+    """Key, animation frames and ondemand URL from a saved home page."""
+    with map_file(path) as buf:
+        return {
+            "key": scan_site_verification_key(buf),
+            "frames": scan_animation_frames(buf),
+            "ondemand_file_url": scan_ondemand_file_url(buf),
+        }
+
+
+def scan_ondemand_artifact(path) -> Tuple[int, List[int]]:
+    """Row index and key byte indices from a saved ondemand.s bundle."""
+    with map_file(path) as buf:
+        return scan_key_byte_indices(buf)
+
+
+def derive_transaction_state(home_path, ondemand_path) -> Dict:
+    """
+    Compute the state ClientTransaction derives in its constructor (key,
+    animation key, row index, key byte indices) from the artifact files.
+    The animation itself is delegated to the library so values match exactly.
+    """
+    from x_client_transaction import ClientTransaction
+
+    home = scan_home_artifact(home_path)
+    row_index, key_bytes_indices = scan_ondemand_artifact(ondemand_path)
+    key_bytes = list(base64.b64decode(bytes(home["key"], "utf-8")))
+
+    frame_row = home["frames"][key_bytes[5] % 4][key_bytes[row_index] % 16]
+    frame_time = reduce(lambda num1, num2: num1 * num2,
+                        [key_bytes[index] % 16 for index in key_bytes_indices])
+    # Math.round(frame_time / 10) * 10, i.e. to the nearest 10 rounding halves up
+    frame_time = (frame_time + 5) // 10 * 10
+    # animate() only depends on the frame row and target time, not on the soups
+    animator = ClientTransaction.__new__(ClientTransaction)
+    animation_key = animator.animate(frame_row, float(frame_time) / TOTAL_ANIMATION_TIME)
+    return {
+        "key": home["key"],
+        "animation_key": animation_key,
+        "row_index": row_index,
+        "key_bytes_indices": key_bytes_indices,
+    }
@@ -0,0 +1,90 @@
+"""
+Microbenchmark: x_client_transaction.ClientTransaction vs TransactionEngine.
+
+Usage:
+    python bench_transaction_id.py [data_dir] [iterations]
+
+Loads the saved twitter_home.html / twitter_ondemand.js from data_dir
+(default: TWIKIT_DATA_DIR or ./twitter_data), checks that the artifact scanner
+derives the same state as the bs4-based library and that both generators
+produce byte-identical IDs for the same timestamp and random byte, then
+reports setup time and IDs/second for each.
+"""
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import bs4
+from x_client_transaction import ClientTransaction
+
+from artifact_scan import derive_transaction_state
+from transaction_engine import TransactionEngine
+
+SAMPLE_REQUESTS = [
+    ("GET", "/i/api/2/badge_count/badge_count.json"),
+    ("POST", "/i/api/graphql/SiM_cAu83R0wnrpmKQQSEw/CreateTweet"),
+    ("GET", "/i/api/graphql/G3KGOASz96M-Qu0nwmGXNg/UserByScreenName"),
+    ("POST", "/i/api/1.1/jot/client_event.json"),
+]
+
+
+def check_identical(ct, engine, rounds=1000):
+    """Compare both generators on identical time_now and random state."""
+    for i in range(rounds):
+        method, path = SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)]
+        time_now = random.randint(1, 2**31 - 1)
+        state = random.getstate()
+        expected = ct.generate_transaction_id(method=method, path=path, time_now=time_now)
+        random.setstate(state)
+        actual = engine.generate_transaction_id(method=method, path=path, time_now=time_now)
+        if expected != actual:
+            raise AssertionError(f"Mismatch for {method} {path} at {time_now}: {expected} != {actual}")
+
+
+def ids_per_second(generate, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        method, path = SAMPLE_REQUESTS[i & 3]
+        generate(method=method, path=path)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    data_dir = Path(sys.argv[1] if len(sys.argv) > 1 else os.getenv('TWIKIT_DATA_DIR', './twitter_data'))
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    with open(data_dir / "twitter_home.html", "r", encoding="utf-8") as f:
+        home_html = f.read()
+    with open(data_dir / "twitter_ondemand.js", "r", encoding="utf-8") as f:
+        ondemand_js = f.read()
+
+    start = time.perf_counter()
+    ct = ClientTransaction(home_page_response=bs4.BeautifulSoup(home_html, 'html.parser'),
+                           ondemand_file_response=bs4.BeautifulSoup(ondemand_js, 'html.parser'))
+    print(f"ClientTransaction setup: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    state = derive_transaction_state(data_dir / "twitter_home.html", data_dir / "twitter_ondemand.js")
+    engine = TransactionEngine(**state)
+    print(f"TransactionEngine setup (artifact scan): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    library_state = TransactionEngine.from_client_transaction(ct)
+    if (state["key"], state["animation_key"], state["row_index"], state["key_bytes_indices"]) != (
+            library_state.key, library_state.animation_key, library_state.row_index, library_state.key_bytes_indices):
+        raise AssertionError(f"Scanned state {state} differs from library state")
+    print("State check: artifact scan matches x_client_transaction")
+
+    check_identical(ct, engine)
+    print("Output check: byte-identical to x_client_transaction")
+
+    library_rate = ids_per_second(ct.generate_transaction_id, iterations)
+    engine_rate = ids_per_second(engine.generate_transaction_id, iterations)
+    print(f"x_client_transaction: {library_rate:,.0f} IDs/s")
+    print(f"TransactionEngine:    {engine_rate:,.0f} IDs/s")
+    print(f"Speedup:              {engine_rate / library_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
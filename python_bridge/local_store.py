@@ -0,0 +1,311 @@
+"""
+Local write-through store of fetched tweets and users.
+
+Every tweet and user in a result the service fetches (searches, timelines,
+get_tweet_by_id, followers, ...) is upserted into a SQLite database: the
+serialized JSON next to indexed columns (tweet id, author id, created_at),
+plus an FTS5 index on tweet text. local_search and local_timeline answer
+from it without an upstream call, so re-reading recent history costs
+milliseconds and no rate budget. The store also keeps the high-water marks
+of 'sync' mode commands.
+
+Pool workers share the database file through SQLite's WAL journal. The
+methods block, so the service calls them on its store thread. Builds of
+SQLite without FTS5 fall back to LIKE matching. A failing write is logged and
+never fails the command that fetched the data.
+"""
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from user_index import collect_users
+
+# Snowflake ids carry their creation time; older ids don't
+TWITTER_EPOCH_MS = 1288834974657
+FIRST_SNOWFLAKE_ID = 29700859247
+
+# Page size for local_search/local_timeline when args.count isn't set, and its cap
+DEFAULT_COUNT = 20
+MAX_COUNT = 500
+
+# Seconds between retention sweeps while recording
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id INTEGER PRIMARY KEY,
+    author_id TEXT,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tweets_author_created ON tweets (author_id, created_at);
+CREATE INDEX IF NOT EXISTS tweets_created ON tweets (created_at);
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    screen_name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_screen_name ON users (screen_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS sync_marks (
+    key TEXT PRIMARY KEY,
+    high_water INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5 (text, content='tweets', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS tweets_fts_insert AFTER INSERT ON tweets BEGIN
+    INSERT INTO tweets_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS tweets_fts_delete AFTER DELETE ON tweets BEGIN
+    INSERT INTO tweets_fts (tweets_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS tweets_fts_update AFTER UPDATE OF text ON tweets WHEN old.text IS NOT new.text BEGIN
+    INSERT INTO tweets_fts (tweets_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO tweets_fts (rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+UPSERT_TWEET = """
+INSERT INTO tweets (id, author_id, created_at, text, data, fetched_at) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET author_id = excluded.author_id, created_at = excluded.created_at,
+    text = excluded.text, data = excluded.data, fetched_at = excluded.fetched_at
+"""
+
+UPSERT_USER = """
+INSERT INTO users (id, screen_name, data, fetched_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET screen_name = excluded.screen_name, data = excluded.data,
+    fetched_at = excluded.fetched_at
+"""
+
+# Search terms: "quoted phrases" or runs of non-space characters
+TERM_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def collect_tweets(data, depth=0):
+    """Serialized tweets anywhere in a result, with their author object."""
+    if depth > 4:
+        return
+    if isinstance(data, dict):
+        if data.get('id') and isinstance(data.get('text'), str) and isinstance(data.get('user'), dict):
+            yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from collect_tweets(value, depth + 1)
+    elif isinstance(data, list):
+        for value in data:
+            if isinstance(value, (dict, list)):
+                yield from collect_tweets(value, depth + 1)
+
+
+def tweet_timestamp(tweet_id, created_at) -> float:
+    """Epoch seconds a tweet was posted: from its snowflake id, else its created_at string."""
+    if tweet_id >= FIRST_SNOWFLAKE_ID:
+        return ((tweet_id >> 22) + TWITTER_EPOCH_MS) / 1000
+    if isinstance(created_at, str):
+        try:
+            return datetime.strptime(created_at, '%a %b %d %H:%M:%S %z %Y').timestamp()
+        except ValueError:
+            pass
+    return 0.0
+
+
+def parse_time(value) -> Optional[float]:
+    """Epoch seconds from epoch seconds or an ISO 8601 string (args.since / args.until)."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}', expected ISO 8601 or epoch seconds") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def match_expression(query):
+    """An FTS5 expression matching every term of a plain query; FTS5 syntax isn't passed through."""
+    terms = [phrase or word for phrase, word in TERM_PATTERN.findall(query)]
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class LocalStore:
+    def __init__(self, path: Optional[str], max_age: float = 0):
+        self.path = path
+        self.max_age = max_age
+        # Built on the main thread, then used only from the service's store thread
+        self.db = sqlite3.connect(path or ':memory:', timeout=5, isolation_level=None, check_same_thread=False)
+        if path:
+            self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            sys.stderr.write(f"SQLite has no FTS5 ({str(e)}); local_search falls back to LIKE matching.\n")
+            self.fts = False
+        self.recorded_tweets = 0
+        self.recorded_users = 0
+        self.queries = 0
+        self.errors = 0
+        self._pruned_at = 0.0
+        self.prune()
+
+    def record(self, data):
+        """Upsert every tweet and user in a result."""
+        now = time.time()
+        tweets = {}
+        for tweet in collect_tweets(data):
+            try:
+                tweet_id = int(tweet['id'])
+            except (TypeError, ValueError):
+                continue
+            tweets[tweet_id] = (tweet_id, str(tweet['user'].get('id') or '') or None,
+                                tweet_timestamp(tweet_id, tweet.get('created_at')), tweet['text'],
+                                json.dumps(tweet, separators=(',', ':'), ensure_ascii=False), now)
+        users = {str(user['id']): (str(user['id']), user['screen_name'],
+                                   json.dumps(user, separators=(',', ':'), ensure_ascii=False), now)
+                 for user in collect_users(data)}
+        if not tweets and not users:
+            return
+        try:
+            with self.db:
+                self.db.execute('BEGIN IMMEDIATE')
+                self.db.executemany(UPSERT_TWEET, tweets.values())
+                self.db.executemany(UPSERT_USER, users.values())
+        except sqlite3.Error as e:
+            self.errors += 1
+            sys.stderr.write(f"Could not write local store {self.path}: {str(e)}\n")
+            return
+        self.recorded_tweets += len(tweets)
+        self.recorded_users += len(users)
+        if now - self._pruned_at > PRUNE_INTERVAL:
+            self.prune()
+
+    def delete_tweet(self, tweet_id):
+        try:
+            with self.db:
+                self.db.execute('BEGIN IMMEDIATE')
+                self.db.execute('DELETE FROM tweets WHERE id = ?', (int(tweet_id),))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            sys.stderr.write(f"Could not delete tweet {tweet_id} from local store: {str(e)}\n")
+
+    def prune(self):
+        """Drop tweets posted more than max_age seconds ago (0 keeps everything)."""
+        self._pruned_at = time.time()
+        if not self.max_age:
+            return
+        try:
+            with self.db:
+                self.db.execute('BEGIN IMMEDIATE')
+                self.db.execute('DELETE FROM tweets WHERE created_at < ?', (time.time() - self.max_age,))
+        except sqlite3.Error as e:
+            sys.stderr.write(f"Could not prune local store {self.path}: {str(e)}\n")
+
+    def get_mark(self, key) -> Optional[int]:
+        """The newest id a sync of key has returned, or None before its first sync."""
+        row = self.db.execute('SELECT high_water FROM sync_marks WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_mark(self, key, high_water):
+        # Never moves back, whichever of two concurrent syncs finishes last
+        with self.db:
+            self.db.execute('BEGIN IMMEDIATE')
+            self.db.execute('INSERT INTO sync_marks (key, high_water, synced_at) VALUES (?, ?, ?) '
+                            'ON CONFLICT (key) DO UPDATE SET high_water = max(high_water, excluded.high_water), '
+                            'synced_at = excluded.synced_at', (key, high_water, time.time()))
+
+    def drop_mark(self, key):
+        with self.db:
+            self.db.execute('BEGIN IMMEDIATE')
+            self.db.execute('DELETE FROM sync_marks WHERE key = ?', (key,))
+
+    def _author_id(self, args):
+        if args.get('user_id'):
+            return str(args['user_id'])
+        row = self.db.execute('SELECT id FROM users WHERE screen_name = ? COLLATE NOCASE ORDER BY fetched_at DESC',
+                              (str(args['screen_name']).lstrip('@'),)).fetchone()
+        # Nobody by that name has been seen, so no tweets of theirs are stored either
+        return row[0] if row else ''
+
+    def _page(self, select, where, params, args):
+        """Newest first, {items, next_cursor}; the cursor is the last item's 'created_at:id'."""
+        count = min(int(args.get('count') or DEFAULT_COUNT), MAX_COUNT)
+        since, until = parse_time(args.get('since')), parse_time(args.get('until'))
+        if since is not None:
+            where.append('t.created_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('t.created_at < ?')
+            params.append(until)
+        if args.get('cursor'):
+            created_at, _, tweet_id = str(args['cursor']).partition(':')
+            try:
+                params.extend((float(created_at), int(tweet_id)))
+            except ValueError:
+                raise ValueError(f"Invalid cursor '{args['cursor']}'") from None
+            where.append('(t.created_at, t.id) < (?, ?)')
+        sql = (f"SELECT t.created_at, t.id, t.data {select} WHERE {' AND '.join(where) or '1'} "
+               f"ORDER BY t.created_at DESC, t.id DESC LIMIT ?")
+        self.queries += 1
+        rows = self.db.execute(sql, (*params, count)).fetchall()
+        next_cursor = f"{rows[-1][0]!r}:{rows[-1][1]}" if len(rows) == count else None
+        return {"items": [json.loads(row[2]) for row in rows], "next_cursor": next_cursor}
+
+    def search(self, args):
+        """
+        Stored tweets matching every term of args['query'] ("quoted" phrases
+        stay together), optionally by one author (user_id or screen_name) and
+        within [since, until).
+        """
+        if not args.get('query') or not str(args['query']).strip():
+            raise ValueError("Missing 'query' in args")
+        where, params = [], []
+        if self.fts:
+            select = 'FROM tweets_fts JOIN tweets t ON t.id = tweets_fts.rowid'
+            where.append('tweets_fts MATCH ?')
+            params.append(match_expression(str(args['query'])))
+        else:
+            select = 'FROM tweets t'
+            for phrase, word in TERM_PATTERN.findall(str(args['query'])):
+                term = (phrase or word).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                where.append("t.text LIKE ? ESCAPE '\\'")
+                params.append(f'%{term}%')
+        if args.get('user_id') or args.get('screen_name'):
+            where.append('t.author_id = ?')
+            params.append(self._author_id(args))
+        return self._page(select, where, params, args)
+
+    def timeline(self, args):
+        """Stored tweets by one author (user_id or screen_name) within [since, until)."""
+        if not args.get('user_id') and not args.get('screen_name'):
+            raise ValueError("Missing 'user_id' or 'screen_name' in args")
+        return self._page('FROM tweets t', ['t.author_id = ?'], [self._author_id(args)], args)
+
+    def stats(self):
+        tweets, users = (self.db.execute(f'SELECT count(*) FROM {table}').fetchone()[0]
+                         for table in ('tweets', 'users'))
+        return {"path": self.path, "fts": self.fts, "max_age": self.max_age, "tweets": tweets, "users": users,
+                "recorded_tweets": self.recorded_tweets, "recorded_users": self.recorded_users,
+                "queries": self.queries, "errors": self.errors}
+
+    def close(self):
+        self.db.close()
+
+
+# Reads answered from the store alone
+LOCAL_ACTIONS = {
+    'local_search': LocalStore.search,
+    'local_timeline': LocalStore.timeline,
+}
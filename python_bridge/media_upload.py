@@ -0,0 +1,214 @@
+"""
+Chunked, resumable media upload for the bridge.
+
+twikit's Client.upload_media reads the whole file into memory before sending
+it. Here the file is read through a memory map one segment at a time, with
+several APPEND segments in flight at once, so memory use is bounded by
+segment size x concurrency however large the video is.
+
+Every acknowledged segment is recorded in a small JSON journal keyed by the
+account and the file's path, size and mtime. An upload interrupted by a crash,
+timeout or cancellation resumes from the journal with the same media_id and
+only sends the missing segments. Video and GIF uploads are polled with STATUS
+until X has finished processing them.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import mimetypes
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# Upload endpoint used when twikit's Endpoint table isn't available
+DEFAULT_UPLOAD_URL = 'https://upload.x.com/i/media/upload.json'
+
+# Bytes per APPEND segment (X accepts up to 5 MB) and segments sent at once
+SEGMENT_BYTES = int(os.getenv('TWIKIT_UPLOAD_SEGMENT_BYTES', str(4 * 1024 * 1024)))
+CONCURRENCY = int(os.getenv('TWIKIT_UPLOAD_CONCURRENCY', '4'))
+
+# Longest wait for X to finish processing a video or GIF
+PROCESSING_TIMEOUT = float(os.getenv('TWIKIT_UPLOAD_PROCESSING_TIMEOUT', '600'))
+
+# Where upload journals are kept
+JOURNAL_DIR = os.getenv('TWIKIT_UPLOAD_JOURNAL_DIR') or os.path.join(
+    os.getenv('TWIKIT_DATA_DIR', './twitter_data'), 'uploads')
+
+# A journal whose media_id expires sooner than this is started over
+EXPIRY_MARGIN = 300
+
+# Journal file I/O stays off the event loop. One thread runs it in the order
+# it was asked for, so a segment's save can't overtake an earlier one, and a
+# cancelled upload's pending write still lands before the next upload reads.
+JOURNAL_IO = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload-journal')
+
+
+def upload_url():
+    try:
+        from twikit.client.v11 import Endpoint
+        return Endpoint.UPLOAD_MEDIA
+    except (ImportError, AttributeError):
+        return DEFAULT_UPLOAD_URL
+
+
+def media_category_for(media_type):
+    """Videos and GIFs are processed asynchronously and need a category; images don't."""
+    if media_type == 'image/gif':
+        return 'tweet_gif'
+    if media_type.startswith('video/'):
+        return 'tweet_video'
+    return None
+
+
+class UploadJournal:
+    """Progress of one upload, rewritten atomically after every acknowledged segment."""
+
+    def __init__(self, path):
+        self.path = path
+
+    async def _run(self, func, *args):
+        # Shielded: cancelling the caller must not drop the queued call
+        return await asyncio.shield(asyncio.get_running_loop().run_in_executor(JOURNAL_IO, func, *args))
+
+    async def load(self, fingerprint) -> Optional[dict]:
+        state = await self._run(self._read)
+        if state is None:
+            return None
+        if state.get('fingerprint') != fingerprint or state.get('expires_at', 0) < time.time() + EXPIRY_MARGIN:
+            await self.remove()
+            return None
+        return state
+
+    async def save(self, state):
+        # Serialized on the loop: the state keeps changing while the write is queued
+        await self._run(self._write, json.dumps(state, separators=(',', ':')))
+
+    async def remove(self):
+        await self._run(self._remove)
+
+    async def flush(self):
+        """Wait for every journal write queued so far, including ones whose caller gave up."""
+        await self._run(lambda: None)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _remove(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def upload_file(client, path, media_type=None, media_category=None,
+                      segment_size=SEGMENT_BYTES, concurrency=CONCURRENCY,
+                      journal_dir=JOURNAL_DIR, processing_timeout=PROCESSING_TIMEOUT):
+    """
+    Upload a file with INIT/APPEND/FINALIZE(/STATUS).
+
+    Returns:
+        dict: media_id, media_type, total_bytes, segments, resumed_segments and
+        the final processing state (None for images)
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    if stat.st_size == 0:
+        raise ValueError(f"Media file is empty: {path}")
+    media_type = media_type or mimetypes.guess_type(path)[0]
+    if not media_type:
+        raise ValueError(f"Cannot determine the media type of {path}; pass media_type")
+    media_category = media_category or media_category_for(media_type)
+    cookies = client.get_cookies() or {}
+    fingerprint = {
+        "account": cookies.get('twid', ''), "path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+        "media_type": media_type, "media_category": media_category, "segment_size": segment_size,
+    }
+    digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+    journal = UploadJournal(os.path.join(journal_dir, f"{digest}.json"))
+
+    state = await journal.load(fingerprint)
+    if state is not None:
+        try:
+            return await _upload(client, path, fingerprint, journal, state, concurrency, processing_timeout)
+        except Exception as e:
+            # The media_id may have been dropped upstream; start over once
+            sys.stderr.write(f"Resuming upload of {path} failed ({str(e)}); starting over.\n")
+            await journal.remove()
+    return await _upload(client, path, fingerprint, journal, None, concurrency, processing_timeout)
+
+
+async def _upload(client, path, fingerprint, journal, state, concurrency, processing_timeout):
+    url = upload_url()
+    total_bytes = fingerprint['size']
+    segment_size = fingerprint['segment_size']
+    if state is None:
+        params = {'command': 'INIT', 'total_bytes': total_bytes, 'media_type': fingerprint['media_type']}
+        if fingerprint['media_category']:
+            params['media_category'] = fingerprint['media_category']
+        init, _ = await client.request('POST', url, params=params)
+        state = {"fingerprint": fingerprint, "media_id": str(init.get('media_id_string') or init['media_id']),
+                 "expires_at": time.time() + float(init.get('expires_after_secs') or 86400), "acked": []}
+        await journal.save(state)
+    media_id = state['media_id']
+    segments = math.ceil(total_bytes / segment_size)
+    acked = set(state['acked'])
+    resumed_segments = len(acked)
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        slots = asyncio.Semaphore(max(1, concurrency))
+
+        async def append(index):
+            async with slots:
+                # Only the segments being sent are paged in and copied
+                chunk = mapped[index * segment_size:(index + 1) * segment_size]
+                await client.request('POST', url,
+                                     params={'command': 'APPEND', 'media_id': media_id, 'segment_index': index},
+                                     files={'media': ('blob', chunk, 'application/octet-stream')})
+            acked.add(index)
+            state['acked'] = sorted(acked)
+            await journal.save(state)
+
+        tasks = [asyncio.create_task(append(index)) for index in range(segments) if index not in acked]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # On failure the other segments stop too; the map must outlive them
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A retry right after this returns must see every acknowledged segment
+            await journal.flush()
+
+    final, _ = await client.request('POST', url, params={'command': 'FINALIZE', 'media_id': media_id})
+    # A finalized media_id can't take more segments; nothing left to resume
+    await journal.remove()
+    info = final.get('processing_info') if isinstance(final, dict) else None
+    deadline = time.monotonic() + processing_timeout
+    while info and info.get('state') in ('pending', 'in_progress'):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Media {media_id} still processing after {processing_timeout:.0f}s")
+        await asyncio.sleep(min(float(info.get('check_after_secs') or 1), remaining))
+        status, _ = await client.request('GET', url, params={'command': 'STATUS', 'media_id': media_id})
+        info = status.get('processing_info') if isinstance(status, dict) else None
+    if info and info.get('state') == 'failed':
+        error = info.get('error') or {}
+        raise RuntimeError(f"Processing of media {media_id} failed: {error.get('message') or error}")
+    return {"media_id": media_id, "media_type": fingerprint['media_type'], "total_bytes": total_bytes,
+            "segments": segments, "resumed_segments": resumed_segments,
+            "processing": info.get('state') if info else None}
@@ -1,7 +1,6 @@
 import asyncio
 import json
 import os
-import bs4
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
@@ -9,8 +8,9 @@ from urllib.parse import urlparse
 from collections import Counter
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Request
 import requests
-from x_client_transaction import ClientTransaction
-from x_client_transaction.utils import get_ondemand_file_url
+from artifact_scan import map_file, scan_ondemand_file_url
+from session_store import SessionStore, DEFAULT_STORE_FILENAME
+from transaction_cache import load_transaction_engine
 
 class TwitterAuthenticator:
     def __init__(self, 
@@ -20,18 +20,22 @@ class TwitterAuthenticator:
                  headers_filename: str = "twitter_headers.json",
                  common_headers_filename: str = "twitter_common_headers.json",
                  home_filename: str = "twitter_home.html",
-                 ondemand_filename: str = "twitter_ondemand.js"):
+                 ondemand_filename: str = "twitter_ondemand.js",
+                 store_filename: str = DEFAULT_STORE_FILENAME):
         """
         Initialize the Twitter authenticator
         
         Args:
             data_dir: Directory to save files to, defaults to script directory
             headless: Whether to run the browser in headless mode
+            store_filename: Unified session store file; the per-item cookie/header
+                filenames are only read as a fallback for older exports
         """
         self.data_dir = Path(data_dir) if data_dir else Path(os.path.dirname(os.path.abspath(__file__)))
         self.headless = headless
         
-        # File paths
+        # File paths (the per-item cookie/header files are legacy exports, read
+        # by the session store only when twitter_session.json does not exist yet)
         self.cookies_path = self.data_dir / cookies_filename
         self.headers_path = self.data_dir / headers_filename
         self.common_headers_path = self.data_dir / common_headers_filename
@@ -41,6 +45,10 @@ class TwitterAuthenticator:
         # Ensure data directory exists
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
+        # Cookies, headers and artifact metadata are persisted through one store
+        self.store = SessionStore(data_dir=self.data_dir, store_filename=store_filename,
+                                  home_filename=home_filename, ondemand_filename=ondemand_filename)
+        
         # Data storage
         self.cookies = None
         self.headers = []
@@ -64,15 +72,13 @@ class TwitterAuthenticator:
         import os
         print("Current working directory:", os.getcwd())
         print("Checking for files:")
-        print("Cookies:", self.cookies_path, self.cookies_path.exists())
-        print("Common headers:", self.common_headers_path, self.common_headers_path.exists())
+        print("Session store:", self.store.path, self.store.path.exists())
         print("Home HTML:", self.home_path, self.home_path.exists())
         print("Ondemand JS:", self.ondemand_path, self.ondemand_path.exists())
         
         if not force_login:
-            # Check if all required files exist
-            if (self.cookies_path.exists() and 
-                self.common_headers_path.exists() and 
+            # Check if saved credentials and artifacts exist
+            if (self.store.has_credentials() and 
                 self.home_path.exists() and 
                 self.ondemand_path.exists()):
                 
@@ -88,11 +94,8 @@ class TwitterAuthenticator:
                 try:
                     transaction_id = None
                     try:
-                        home_html, ondemand_js = self.get_transaction_generator_data()
-                        if home_html and ondemand_js:
-                            home_soup = bs4.BeautifulSoup(home_html, 'html.parser')
-                            ondemand_soup = bs4.BeautifulSoup(ondemand_js, 'html.parser')
-                            ct = ClientTransaction(home_page_response=home_soup, ondemand_file_response=ondemand_soup)
+                        if self._has_artifact(self.home_path) and self._has_artifact(self.ondemand_path):
+                            ct = load_transaction_engine(self.home_path, self.ondemand_path)
                             test_path = urlparse(test_url).path
                             transaction_id = ct.generate_transaction_id(method="GET", path=test_path)
                             print("Generated transaction ID:", transaction_id)
@@ -158,13 +161,10 @@ class TwitterAuthenticator:
             self._extract_tokens_from_cookies()
             self._process_common_headers()
             
-            with open(self.headers_path, "w") as f:
-                json.dump(self.headers, f, indent=2)
-            print(f"Saved {len(self.headers)} unique header sets to {self.headers_path}")
-            
-            with open(self.cookies_path, "w") as f:
-                json.dump(self.cookies, f, indent=2)
-            print(f"Cookies saved to {self.cookies_path}")
+            # One atomic write so a running bridge never sees a half-updated session
+            self.store.update(cookies=self.cookies, headers=self.headers, common_headers=self.common_headers)
+            print(f"Saved {len(self.headers)} unique header sets, {len(self.common_headers)} common headers "
+                  f"and {len(self.cookies)} cookies to {self.store.path}")
             
             await browser.close()
             
@@ -216,12 +216,8 @@ class TwitterAuthenticator:
         if self.csrf_token and 'x-csrf-token' not in common_headers:
             common_headers['x-csrf-token'] = self.csrf_token
         
-        # Save common headers
         self.common_headers = common_headers
-        with open(self.common_headers_path, "w") as f:
-            json.dump(common_headers, f, indent=2)
-        
-        print(f"Processed and saved {len(common_headers)} common headers to {self.common_headers_path}")
+        print(f"Processed {len(common_headers)} common headers")
         
     def _extract_tokens_from_cookies(self) -> None:
         """Extract auth token and CSRF token from cookies"""
@@ -235,16 +231,13 @@ class TwitterAuthenticator:
                 self.csrf_token = cookie['value']
                 
     def _load_saved_data(self) -> None:
-        """Load data from saved files"""
-        # Load cookies if not already loaded
-        if not self.cookies and self.cookies_path.exists():
-            with open(self.cookies_path, "r") as f:
-                self.cookies = json.load(f)
-                
-        # Load common headers
-        if self.common_headers_path.exists():
-            with open(self.common_headers_path, "r") as f:
-                self.common_headers = json.load(f)
+        """Load data from the session store and saved artifacts"""
+        # Pick up a re-login written by another process since the last load
+        self.store.reload_if_changed()
+        snapshot = self.store.snapshot()
+        self.cookies = snapshot.cookies
+        self.headers = snapshot.headers
+        self.common_headers = snapshot.common_headers
                 
         # Load home page
         if self.home_path.exists():
@@ -259,6 +252,11 @@ class TwitterAuthenticator:
         # Extract tokens from cookies
         self._extract_tokens_from_cookies()
         
+    @staticmethod
+    def _has_artifact(path: Path) -> bool:
+        """Whether a saved artifact file exists and is non-empty"""
+        return path.exists() and path.stat().st_size > 0
+
     def get_auth_data(self) -> Dict[str, str]:
         """Get the authentication data needed for API requests"""
         if not self.auth_token or not self.csrf_token:
@@ -284,16 +282,11 @@ class TwitterAuthenticator:
         return self.common_headers
     
     def get_cookies_dict(self) -> Dict[str, str]:
-        """Convert cookies to a dictionary format for requests"""
+        """Cookies in dictionary format for requests (cached per store generation; do not mutate)"""
         if not self.cookies:
             self._load_saved_data()
             
-        cookies_dict = {}
-        for cookie in self.cookies:
-            if 'name' in cookie and 'value' in cookie:
-                cookies_dict[cookie['name']] = cookie['value']
-                
-        return cookies_dict
+        return self.store.snapshot().cookies_dict
 
     def fetch_public_home_and_ondemand(self):
         """Fetch the public (non-authenticated) X.com homepage and ondemand.s JS file, unless they already exist and are non-empty."""
@@ -313,26 +306,17 @@ class TwitterAuthenticator:
         })
         if need_fetch_home:
             home_page = session.get("https://x.com")
-            with open(public_home_path, "w", encoding="utf-8") as f:
-                f.write(home_page.text)
+            self.store.write_artifact("home", home_page.text, url="https://x.com")
             print(f"Public homepage HTML saved to {public_home_path}")
-        else:
-            with open(public_home_path, "r", encoding="utf-8") as f:
-                home_page_text = f.read()
-        # Always parse the home HTML to get the ondemand.s URL
-        if need_fetch_home:
-            home_html = home_page.text
-        else:
-            home_html = home_page_text
-        home_soup = bs4.BeautifulSoup(home_html, 'html.parser')
-        ondemand_file_url = get_ondemand_file_url(response=home_soup)
+        # Always scan the home HTML to get the ondemand.s URL
+        with map_file(public_home_path) as home_buf:
+            ondemand_file_url = scan_ondemand_file_url(home_buf)
         if not ondemand_file_url:
             print("ERROR: Could not extract ondemand.s JS URL from public homepage!")
             return
         if need_fetch_ondemand:
             ondemand_file = session.get(ondemand_file_url)
-            with open(public_ondemand_path, "w", encoding="utf-8") as f:
-                f.write(ondemand_file.text)
+            self.store.write_artifact("ondemand", ondemand_file.text, url=ondemand_file_url)
             print(f"Public ondemand.s JS saved to {public_ondemand_path}")
 
     def get_best_ondemand_js(self):
@@ -382,11 +366,8 @@ class TwitterAuthenticator:
             headers['x-csrf-token'] = self.csrf_token
         headers['cookie'] = "; ".join([f"{k}={v}" for k, v in cookies_dict.items()])
         # Use public home/ondemand for transaction ID generation
-        home_html, ondemand_js = self.get_public_transaction_generator_data()
-        if home_html and ondemand_js:
-            home_soup = bs4.BeautifulSoup(home_html, 'html.parser')
-            ondemand_soup = bs4.BeautifulSoup(ondemand_js, 'html.parser')
-            ct = ClientTransaction(home_page_response=home_soup, ondemand_file_response=ondemand_soup)
+        if self._has_artifact(self.home_path) and self._has_artifact(self.ondemand_path):
+            ct = load_transaction_engine(self.home_path, self.ondemand_path)
             path = urlparse(url).path
             transaction_id = ct.generate_transaction_id(method=method, path=path)
             headers['x-client-transaction-id'] = transaction_id
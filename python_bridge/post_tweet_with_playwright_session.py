@@ -3,8 +3,7 @@ from twikit import Client
 # Import twikit's own ClientTransaction to patch its prototype
 from twikit.x_client_transaction import ClientTransaction as TwikitClientTransactionInternal
 from playwright_login_and_export import TwitterAuthenticator
-from x_client_transaction import ClientTransaction as YourCustomClientTransaction # Your custom one
-import bs4
+from transaction_cache import load_transaction_engine # Your custom generator, built from the saved artifacts
 from urllib.parse import urlparse
 import functools
 
@@ -59,7 +58,6 @@ async def main():
     auth = TwitterAuthenticator(data_dir="./twitter_data")
     common_headers_from_playwright = auth.get_common_headers()
     cookies_dict_from_playwright = auth.get_cookies_dict()
-    home_html_str, ondemand_js_str = auth.get_public_transaction_generator_data()
     print("Playwright data loaded.")
 
     client = Client('en-US')
@@ -80,14 +78,11 @@ async def main():
     # client.client_transaction = None # This might not be strictly necessary if the prototype patch works
     print(f"client.enable_ui_metrics set to: {client.enable_ui_metrics}")
 
-    print("Parsing HTML/JS for your custom transaction ID generation...")
-    home_soup = bs4.BeautifulSoup(home_html_str, 'lxml')
-    ondemand_soup_or_str = bs4.BeautifulSoup(ondemand_js_str, 'lxml') 
-    
+    print("Scanning HTML/JS for your custom transaction ID generation...")
     gql_create_tweet_path = "/i/api/graphql/SiM_cAu83R0wnrpmKQQSEw/CreateTweet"
     
-    print("Initializing your custom ClientTransaction (YourCustomClientTransaction)...")
-    your_ct_instance = YourCustomClientTransaction(home_page_response=home_soup, ondemand_file_response=ondemand_soup_or_str)
+    print("Initializing your custom transaction generator...")
+    your_ct_instance = load_transaction_engine(auth.home_path, auth.ondemand_path)
     print("Generating x-client-transaction-id using your_ct_instance...")
     manual_transaction_id = your_ct_instance.generate_transaction_id(method="POST", path=gql_create_tweet_path)
     print(f"Manually generated x-client-transaction-id: {manual_transaction_id}")
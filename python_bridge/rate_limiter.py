@@ -0,0 +1,199 @@
+"""
+Per-endpoint rate-limit scheduling for one account.
+
+X reports each endpoint's budget in x-rate-limit-limit / -remaining / -reset
+response headers. RateLimiter keeps one bucket per operation (the GraphQL
+operation name, or the REST path) seeded from those headers; a request takes a
+token before it is sent and waits in the bucket's queue when none is left,
+until the window resets, instead of running into 429s.
+
+The time spent waiting is added to the current command's RequestMetrics,
+which the service returns as response metadata.
+"""
+import asyncio
+import contextvars
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Budget assumed exhausted for this long after a 429 without a reset header
+DEFAULT_RETRY_AFTER = 60
+
+
+class RateLimitExceeded(Exception):
+    """The next window opens later than the caller is willing to wait."""
+
+
+class RequestMetrics:
+    """Rate-limit bookkeeping for one bridge command."""
+
+    def __init__(self, deadline: Optional[float] = None):
+        self.queue_wait = 0.0
+        self.http_requests = 0
+        # Epoch seconds after which nobody waits for the command's result
+        self.deadline = deadline
+
+    def as_dict(self):
+        return {"queue_wait_ms": round(self.queue_wait * 1000, 1), "http_requests": self.http_requests}
+
+
+current_metrics: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar(
+    'current_metrics', default=None)
+
+
+def operation_for(url: str) -> str:
+    """'UserByScreenName' for /i/api/graphql/<query id>/UserByScreenName, else the path."""
+    path = urlparse(str(url)).path
+    parts = path.strip('/').split('/')
+    if 'graphql' in parts and parts[-1] != 'graphql':
+        return parts[-1]
+    return path
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimitBucket:
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None  # epoch seconds
+        self.unlimited = False
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = asyncio.Condition()
+
+    def _roll_window(self):
+        if self.reset is not None and time.time() >= self.reset:
+            self.remaining = self.limit
+            self.reset = None
+
+    def _has_budget(self):
+        self._roll_window()
+        if self.unlimited:
+            return True
+        if self.remaining is None:
+            # Budget unknown until the first response; probe with one request at a time
+            return self.in_flight == 0
+        return self.remaining - self.in_flight > 0
+
+    def _seconds_until_reset(self):
+        return None if self.reset is None else max(0.0, self.reset - time.time())
+
+    async def acquire(self, max_wait: float) -> float:
+        """Take a token, waiting in FIFO order for one at most max_wait seconds; returns the seconds waited."""
+        start = time.monotonic()
+        async with self._condition:
+            self.waiting += 1
+            try:
+                while not self._has_budget():
+                    delay = self._seconds_until_reset()
+                    left = max_wait - (time.monotonic() - start)
+                    if delay is not None and delay > left:
+                        raise RateLimitExceeded(f"rate limit exhausted for {delay:.0f}s")
+                    if delay is None and left <= 0:
+                        # Still waiting on a probe or on tokens in flight
+                        raise RateLimitExceeded(f"no token freed up within {max_wait:.0f}s")
+                    try:
+                        # Woken by a response that changes the budget, or by the reset
+                        await asyncio.wait_for(self._condition.wait(), delay if delay is not None else left)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        return time.monotonic() - start
+
+    async def release(self, status_code=None, headers=None):
+        """Return the token and update the budget from the response headers."""
+        async with self._condition:
+            self.in_flight -= 1
+            if headers is not None:
+                self._update(status_code, headers)
+            self._condition.notify_all()
+
+    def _update(self, status_code, headers):
+        limit = _header_int(headers, 'x-rate-limit-limit')
+        remaining = _header_int(headers, 'x-rate-limit-remaining')
+        reset = _header_int(headers, 'x-rate-limit-reset')
+        if status_code == 429:
+            remaining = 0
+            if reset is None:
+                reset = time.time() + DEFAULT_RETRY_AFTER
+        if limit is not None:
+            self.limit = limit
+        if remaining is None:
+            # No rate-limit headers on a successful response: the endpoint isn't metered
+            if self.remaining is None and status_code is not None and status_code < 400:
+                self.unlimited = True
+            return
+        self.unlimited = False
+        if reset is not None and reset != self.reset:
+            # New window: take its numbers as they are
+            self.reset = reset
+            self.remaining = remaining
+        elif self.remaining is None:
+            self.remaining = remaining
+        else:
+            # Responses in one window can arrive out of order; the lowest count is the latest
+            self.remaining = min(self.remaining, remaining)
+        if self.limit is None:
+            self.limit = max(remaining, 1)
+
+    def stats(self):
+        self._roll_window()
+        return {"limit": self.limit, "remaining": self.remaining, "reset": self.reset,
+                "in_flight": self.in_flight, "waiting": self.waiting}
+
+
+class RateLimiter:
+    """Token buckets for one account, keyed by operation."""
+
+    def __init__(self, max_wait: float = 900, max_retries: int = 2):
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.buckets: Dict[str, RateLimitBucket] = {}
+
+    def bucket(self, operation):
+        if operation not in self.buckets:
+            self.buckets[operation] = RateLimitBucket()
+        return self.buckets[operation]
+
+    async def request(self, send, method, url, **kwargs):
+        """
+        Send one HTTP request through the operation's bucket. A 429 puts the
+        bucket on hold until its reset and the request back in the queue, up
+        to max_retries times.
+        """
+        bucket = self.bucket(operation_for(url))
+        metrics = current_metrics.get()
+        for attempt in range(self.max_retries + 1):
+            max_wait = self.max_wait
+            if metrics is not None and metrics.deadline is not None:
+                # Fail now rather than wait for a window that opens after the caller gave up
+                max_wait = min(max_wait, max(0.0, metrics.deadline - time.time()))
+            try:
+                waited = await bucket.acquire(max_wait)
+            except RateLimitExceeded as e:
+                raise RateLimitExceeded(f"{operation_for(url)}: {str(e)}") from None
+            if metrics is not None:
+                metrics.queue_wait += waited
+                metrics.http_requests += 1
+            try:
+                response = await send(method, url, **kwargs)
+            except BaseException:
+                await bucket.release()
+                raise
+            status_code = getattr(response, 'status_code', None)
+            await bucket.release(status_code, getattr(response, 'headers', None))
+            if status_code != 429 or attempt == self.max_retries:
+                return response
+        return response
+
+    def stats(self):
+        return {operation: bucket.stats() for operation, bucket in self.buckets.items()}
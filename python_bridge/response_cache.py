@@ -0,0 +1,239 @@
+"""
+Bounded in-process cache for read action results.
+
+Entries expire after a per-action TTL and the least recently used ones are
+evicted once the entry or byte cap is reached. Every entry carries tags
+naming what it depends on ("tweet:<id>", "followers:<user id>", ...); a
+successful write invalidates the tags it affects, so e.g. delete_tweet evicts
+that tweet and add_list_member evicts the list's member pages.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Invalidated tags remembered for racing reads; older invalidations fall back
+# to rejecting every read that started before them
+MAX_TRACKED_TAG_EPOCHS = 4096
+
+# Seconds a read action's result stays fresh; actions not listed are never cached
+DEFAULT_TTLS = {
+    'get_user_by_screen_name': 300,
+    'get_tweet_by_id': 120,
+    'get_user_tweets': 60,
+    'get_user_favorites': 60,
+    'get_retweeters': 60,
+    'get_user_followers': 120,
+    'get_user_following': 120,
+    'get_list_members': 120,
+    'get_user_lists': 300,
+    'search_tweet': 30,
+}
+
+
+def parse_ttls(value: str) -> Dict[str, float]:
+    """DEFAULT_TTLS with 'action=seconds,...' overrides (0 disables caching for an action)."""
+    ttls = dict(DEFAULT_TTLS)
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        action, sep, seconds = entry.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid cache TTL entry '{entry}', expected action=seconds")
+        ttls[action.strip()] = float(seconds)
+    return ttls
+
+
+def read_tags(action, args, data, account_name) -> List[str]:
+    """What a cached read depends on, for write-driven invalidation."""
+    tags = []
+    if action == 'get_user_by_screen_name':
+        tags.append(f"screen_name:{str(args.get('screen_name', '')).lstrip('@').lower()}")
+        if isinstance(data, dict) and data.get('id'):
+            tags.append(f"user:{data['id']}")
+    elif action == 'get_tweet_by_id':
+        tags.append(f"tweet:{args.get('id')}")
+    elif action == 'get_user_tweets':
+        tags += ["user_tweets", f"user_tweets:{args.get('user_id')}"]
+    elif action == 'get_user_favorites':
+        tags += ["favorites", f"favorites:{args.get('user_id')}"]
+    elif action == 'get_retweeters':
+        tags.append(f"retweeters:{args.get('tweet_id')}")
+    elif action == 'get_user_followers':
+        tags.append(f"followers:{args.get('user_id')}")
+    elif action == 'get_user_following':
+        tags += ["following", f"following:{args.get('user_id')}"]
+    elif action == 'get_list_members':
+        tags.append(f"list_members:{args.get('list_id')}")
+    elif action == 'get_user_lists':
+        tags.append(f"lists:{account_name}")
+    return tags
+
+
+def write_tags(action, args, account_name) -> List[str]:
+    """Tags a successful write makes stale."""
+    if action == 'delete_tweet':
+        return [f"tweet:{args.get('id')}", f"retweeters:{args.get('id')}", "user_tweets"]
+    if action == 'create_tweet':
+        tags = ["user_tweets"]
+        if args.get('reply_to'):
+            tags.append(f"tweet:{args['reply_to']}")
+        return tags
+    if action in ('favorite_tweet', 'unfavorite_tweet'):
+        return [f"tweet:{args.get('tweet_id')}", "favorites"]
+    if action in ('retweet', 'delete_retweet'):
+        return [f"tweet:{args.get('tweet_id')}", f"retweeters:{args.get('tweet_id')}", "user_tweets"]
+    if action in ('follow_user', 'unfollow_user'):
+        return [f"user:{args.get('user_id')}", f"followers:{args.get('user_id')}", "following"]
+    if action in ('add_list_member', 'remove_list_member'):
+        return [f"list_members:{args.get('list_id')}", f"lists:{account_name}"]
+    if action == 'create_list':
+        return [f"lists:{account_name}"]
+    return []
+
+
+class CacheEntry:
+    __slots__ = ('value', 'expires_at', 'size', 'tags')
+
+    def __init__(self, value, expires_at, size, tags):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class ResponseCache:
+    def __init__(self, ttls: Dict[str, float] = None, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024):
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self._tag_index: Dict[str, set] = {}
+        # Invalidation counter, and the value it had when each tag was last invalidated
+        self._epoch = 0
+        self._tag_epochs: "OrderedDict[str, int]" = OrderedDict()
+        self._floor_epoch = -1
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.by_action: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def is_cacheable(self, action):
+        return self.enabled and self.ttls.get(action, 0) > 0
+
+    @staticmethod
+    def make_key(action, args, account_name=None):
+        """
+        Key on the action and its arguments; routing hints and the output
+        projection don't change the cached (full) result.
+        """
+        relevant = {key: value for key, value in (args or {}).items()
+                    if key not in ('account', 'cache', 'fields') and value is not None}
+        return (action, json.dumps(relevant, sort_keys=True, separators=(',', ':')), account_name)
+
+    def _count(self, action, outcome):
+        counts = self.by_action.setdefault(action, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def get(self, key):
+        """(True, value) for a fresh entry, else (False, None); counts as a hit or miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            self._count(key[0], "misses")
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._count(key[0], "hits")
+        return True, entry.value
+
+    def epoch(self):
+        """Token to pass to put() so a read that raced a write isn't stored."""
+        return self._epoch
+
+    def put(self, key, value, tags, started_epoch: Optional[int] = None):
+        ttl = self.ttls.get(key[0], 0)
+        if not self.enabled or ttl <= 0:
+            return
+        if started_epoch is not None and (
+                started_epoch < self._floor_epoch
+                or any(self._tag_epochs.get(tag, -1) > started_epoch for tag in tags)):
+            return
+        size = len(json.dumps(value, separators=(',', ':')))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(value, time.monotonic() + ttl, size, tags)
+        self.bytes += size
+        for tag in tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, tags):
+        """Drop every entry carrying one of the tags."""
+        self._epoch += 1
+        removed = 0
+        for tag in tags:
+            self._tag_epochs[tag] = self._epoch
+            self._tag_epochs.move_to_end(tag)
+            for key in list(self._tag_index.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        while len(self._tag_epochs) > MAX_TRACKED_TAG_EPOCHS:
+            _, self._floor_epoch = self._tag_epochs.popitem(last=False)
+        self.invalidations += removed
+        return removed
+
+    def clear(self):
+        removed = len(self._entries)
+        # Reads already in flight must not repopulate the cache
+        self._epoch += 1
+        self._floor_epoch = self._epoch
+        self._entries.clear()
+        self._tag_index.clear()
+        self.bytes = 0
+        return removed
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "by_action": {action: dict(counts) for action, counts in self.by_action.items()},
+        }
@@ -0,0 +1,141 @@
+"""
+Priority lanes for the bridge's concurrency slots.
+
+Commands wait for one of a fixed number of slots in the queue of their lane:
+'interactive' (user-visible writes), 'default' and 'background' (page walks,
+crawls, analytics). A freed slot goes to the lane chosen by smooth weighted
+round-robin among lanes with waiters, so interactive commands overtake a
+backlog of background work without starving it. Background commands never
+hold more than a share of the slots, leaving room for interactive ones.
+
+Each lane's queue is bounded; a command arriving at a full queue is rejected
+with Overloaded instead of waiting behind an ever longer backlog.
+"""
+import asyncio
+import contextlib
+from collections import deque
+from typing import Dict
+
+LANES = ('interactive', 'default', 'background')
+
+DEFAULT_WEIGHTS = {'interactive': 8, 'default': 3, 'background': 1}
+DEFAULT_QUEUE_LIMITS = {'interactive': 256, 'default': 512, 'background': 128}
+
+# Fraction of the slots background commands may occupy at once
+BACKGROUND_MAX_SHARE = 0.5
+
+
+class Overloaded(Exception):
+    """The lane's queue is full."""
+
+
+def parse_lane_values(value: str, defaults: Dict[str, int]) -> Dict[str, int]:
+    """defaults with 'lane=number,...' overrides."""
+    values = dict(defaults)
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        lane, sep, number = entry.partition('=')
+        lane = lane.strip()
+        if not sep or lane not in LANES:
+            raise ValueError(f"Invalid lane entry '{entry}', expected one of {', '.join(LANES)}=number")
+        values[lane] = int(number)
+    return values
+
+
+class Lane:
+    def __init__(self, name, weight, max_queue, max_running):
+        self.name = name
+        self.weight = max(1, weight)
+        self.max_queue = max_queue
+        self.max_running = max_running
+        self.waiting: "deque[asyncio.Future]" = deque()
+        self.running = 0
+        self.current = 0  # Smooth weighted round-robin state
+        self.admitted = 0
+        self.rejected = 0
+
+    def stats(self):
+        return {"weight": self.weight, "queued": len(self.waiting), "max_queue": self.max_queue,
+                "running": self.running, "max_running": self.max_running,
+                "admitted": self.admitted, "rejected": self.rejected}
+
+
+class LaneScheduler:
+    def __init__(self, concurrency: int, weights: Dict[str, int] = None, queue_limits: Dict[str, int] = None):
+        self.concurrency = max(1, concurrency)
+        weights = weights or DEFAULT_WEIGHTS
+        queue_limits = queue_limits or DEFAULT_QUEUE_LIMITS
+        self.lanes = {}
+        for name in LANES:
+            max_running = self.concurrency
+            if name == 'background':
+                max_running = max(1, int(self.concurrency * BACKGROUND_MAX_SHARE))
+            self.lanes[name] = Lane(name, weights[name], queue_limits[name], max_running)
+        self.running = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self, lane_name: str):
+        """Hold one concurrency slot, queued in lane_name; raises Overloaded when its queue is full."""
+        lane = self.lanes[lane_name]
+        await self._acquire(lane)
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def _can_start(self, lane):
+        return self.running < self.concurrency and lane.running < lane.max_running
+
+    async def _acquire(self, lane):
+        if self._can_start(lane) and not any(other.waiting for other in self.lanes.values()):
+            self._start(lane)
+            return
+        if len(lane.waiting) >= lane.max_queue:
+            lane.rejected += 1
+            raise Overloaded(f"{lane.name} queue is full ({lane.max_queue} waiting)")
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiting.append(waiter)
+        # The waiters ahead may all be in lanes at their cap while slots sit idle
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the waiter gave up
+                self._release(lane)
+            else:
+                with contextlib.suppress(ValueError):
+                    lane.waiting.remove(waiter)
+            raise
+
+    def _start(self, lane):
+        self.running += 1
+        lane.running += 1
+        lane.admitted += 1
+
+    def _release(self, lane):
+        self.running -= 1
+        lane.running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.running < self.concurrency:
+            eligible = [lane for lane in self.lanes.values()
+                        if lane.waiting and lane.running < lane.max_running]
+            if not eligible:
+                return
+            total = sum(lane.weight for lane in eligible)
+            for lane in eligible:
+                lane.current += lane.weight
+            chosen = max(eligible, key=lambda lane: lane.current)
+            chosen.current -= total
+            waiter = chosen.waiting.popleft()
+            if waiter.done():
+                continue
+            self._start(chosen)
+            waiter.set_result(None)
+
+    def stats(self):
+        return {"concurrency": self.concurrency, "running": self.running,
+                "lanes": {name: lane.stats() for name, lane in self.lanes.items()}}
@@ -6,17 +6,14 @@ from seleniumwire import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from session_store import SessionStore
 
 # Configurable browser
 BROWSER = os.getenv('SELENIUM_BROWSER', 'chrome')
 DATA_DIR = Path(os.getenv('TWIKIT_DATA_DIR', './twitter_data'))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-COOKIES_PATH = DATA_DIR / 'twitter_cookies.json'
-HEADERS_PATH = DATA_DIR / 'twitter_headers.json'
-COMMON_HEADERS_PATH = DATA_DIR / 'twitter_common_headers.json'
-HOME_PATH = DATA_DIR / 'twitter_home.html'
-ONDEMAND_PATH = DATA_DIR / 'twitter_ondemand.js'
+STORE = SessionStore(data_dir=DATA_DIR)
 
 # Helper to launch browser
 def get_driver():
@@ -40,18 +37,13 @@ def main():
     print("Try different actions like refreshing pages, viewing profiles, etc.")
     input("Press Enter when you're done...\n")
 
-    # Save cookies
     cookies = driver.get_cookies()
-    with open(COOKIES_PATH, 'w') as f:
-        json.dump(cookies, f, indent=2)
-    print(f"Cookies saved to {COOKIES_PATH}")
 
     # Save home page HTML
     driver.get('https://x.com/home')
     time.sleep(3)
-    with open(HOME_PATH, 'w', encoding='utf-8') as f:
-        f.write(driver.page_source)
-    print(f"Home page HTML saved to {HOME_PATH}")
+    STORE.write_artifact('home', driver.page_source, url='https://x.com/home')
+    print(f"Home page HTML saved to {STORE.home_path}")
 
     # Find ondemand.js URL
     scripts = driver.find_elements(By.TAG_NAME, 'script')
@@ -69,9 +61,8 @@ def main():
         for cookie in cookies:
             session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', '.x.com'))
         resp = session.get(ondemand_url)
-        with open(ONDEMAND_PATH, 'w', encoding='utf-8') as f:
-            f.write(resp.text)
-        print(f"Ondemand file saved to {ONDEMAND_PATH} ({len(resp.text)} bytes)")
+        STORE.write_artifact('ondemand', resp.text, url=ondemand_url)
+        print(f"Ondemand file saved to {STORE.ondemand_path} ({len(resp.text)} bytes)")
     else:
         print("Could not find ondemand.js URL.")
 
@@ -84,9 +75,6 @@ def main():
                 'headers': dict(request.headers),
                 'response_headers': dict(request.response.headers)
             })
-    with open(HEADERS_PATH, 'w') as f:
-        json.dump(all_headers, f, indent=2)
-    print(f"Saved {len(all_headers)} unique header sets to {HEADERS_PATH}")
 
     # Process and save common headers (most frequent in requests)
     from collections import Counter
@@ -106,9 +94,12 @@ def main():
             most_common = header_values[header].most_common(1)
             if most_common:
                 common_headers[header] = most_common[0][0]
-    with open(COMMON_HEADERS_PATH, 'w') as f:
-        json.dump(common_headers, f, indent=2)
-    print(f"Processed and saved {len(common_headers)} common headers to {COMMON_HEADERS_PATH}")
+
+    # Cookies and headers go out in one atomic store write so a running bridge
+    # picks up the new session in a single reload
+    STORE.update(cookies=cookies, headers=all_headers, common_headers=common_headers)
+    print(f"Saved {len(cookies)} cookies, {len(all_headers)} header sets and "
+          f"{len(common_headers)} common headers to {STORE.path}")
 
     driver.quit()
 
@@ -0,0 +1,189 @@
+"""
+Unified, versioned store for an exported X/Twitter session.
+
+Cookies, captured headers and common headers live in one JSON document
+(twitter_session.json) that is only ever replaced atomically. The large
+home page / ondemand.s artifacts stay as separate files, so they can be
+memory-mapped by artifact_scan, but are also written atomically and recorded
+(with their SHA-256) in the store. Readers keep a cached in-memory snapshot and
+reload it when the store file's mtime/size/inode change.
+
+Only the standard library is used so the bridge service can import this
+without pulling in Playwright, requests or bs4.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+STORE_VERSION = 1
+DEFAULT_STORE_FILENAME = "twitter_session.json"
+
+# Per-file layout written by older versions of the login scripts
+LEGACY_COOKIES_FILENAME = "twitter_cookies.json"
+LEGACY_HEADERS_FILENAME = "twitter_headers.json"
+LEGACY_COMMON_HEADERS_FILENAME = "twitter_common_headers.json"
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to a temporary file next to path and rename it into place."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SessionSnapshot:
+    """Immutable view of one generation of the store."""
+
+    def __init__(self, data: Dict, signature=None):
+        self.generation = data.get("generation", 0)
+        self.updated_at = data.get("updated_at")
+        self.cookies: List[Dict] = data.get("cookies") or []
+        self.headers: List[Dict] = data.get("headers") or []
+        self.common_headers: Dict[str, str] = data.get("common_headers") or {}
+        self.artifacts: Dict[str, Dict] = data.get("artifacts") or {}
+        self.signature = signature
+        # Built once per generation instead of on every lookup; treat as read-only
+        self.cookies_dict: Dict[str, str] = {cookie['name']: cookie['value'] for cookie in self.cookies
+                                             if 'name' in cookie and 'value' in cookie}
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": STORE_VERSION,
+            "generation": self.generation,
+            "updated_at": self.updated_at,
+            "cookies": self.cookies,
+            "headers": self.headers,
+            "common_headers": self.common_headers,
+            "artifacts": self.artifacts,
+        }
+
+
+class SessionStore:
+    def __init__(self,
+                 data_dir: str = None,
+                 store_filename: str = DEFAULT_STORE_FILENAME,
+                 home_filename: str = "twitter_home.html",
+                 ondemand_filename: str = "twitter_ondemand.js"):
+        """
+        Args:
+            data_dir: Directory holding the store and artifacts, defaults to script directory
+        """
+        self.data_dir = Path(data_dir) if data_dir else Path(os.path.dirname(os.path.abspath(__file__)))
+        self.path = self.data_dir / store_filename
+        self.home_path = self.data_dir / home_filename
+        self.ondemand_path = self.data_dir / ondemand_filename
+        self._snapshot: Optional[SessionSnapshot] = None
+
+    # --- Reading ---
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read_legacy(self) -> Dict:
+        """Assemble a store document from the old one-file-per-item layout."""
+        def read_json(filename, default):
+            path = self.data_dir / filename
+            if not path.exists():
+                return default
+            with open(path, "r") as f:
+                return json.load(f)
+        return {
+            "generation": 0,
+            "cookies": read_json(LEGACY_COOKIES_FILENAME, []),
+            "headers": read_json(LEGACY_HEADERS_FILENAME, []),
+            "common_headers": read_json(LEGACY_COMMON_HEADERS_FILENAME, {}),
+        }
+
+    def _load(self) -> SessionSnapshot:
+        signature = self._signature()
+        if signature is None:
+            data = self._read_legacy()
+        else:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version", 0) > STORE_VERSION:
+                raise ValueError(f"Unsupported session store version {data.get('version')} in {self.path}")
+        self._snapshot = SessionSnapshot(data, signature)
+        return self._snapshot
+
+    def snapshot(self) -> SessionSnapshot:
+        """Cached view of the store; loaded on first use."""
+        if self._snapshot is None:
+            return self._load()
+        return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Reload the cached snapshot if the store file changed on disk."""
+        if self._snapshot is not None and self._signature() == self._snapshot.signature:
+            return False
+        self._load()
+        return True
+
+    def has_credentials(self) -> bool:
+        snapshot = self.snapshot()
+        return bool(snapshot.cookies_dict and snapshot.common_headers)
+
+    def has_transaction_artifacts(self) -> bool:
+        """Whether the home page and ondemand.s artifacts exist and are non-empty"""
+        return all(path.exists() and path.stat().st_size > 0
+                   for path in (self.home_path, self.ondemand_path))
+
+    # --- Writing ---
+
+    def update(self, cookies: List[Dict] = None, headers: List[Dict] = None,
+               common_headers: Dict[str, str] = None, artifacts: Dict[str, Dict] = None) -> SessionSnapshot:
+        """
+        Write a new generation of the store with the given fields replaced.
+        Fields left as None keep their current value.
+        """
+        data = self.snapshot().to_dict()
+        if cookies is not None:
+            data["cookies"] = cookies
+        if headers is not None:
+            data["headers"] = headers
+        if common_headers is not None:
+            data["common_headers"] = common_headers
+        if artifacts is not None:
+            data["artifacts"] = {**data["artifacts"], **artifacts}
+        data["generation"] = data["generation"] + 1
+        data["updated_at"] = time.time()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(self.path, json.dumps(data, indent=2).encode("utf-8"))
+        self._snapshot = SessionSnapshot(data, self._signature())
+        return self._snapshot
+
+    def write_artifact(self, name: str, content: str, url: str = None) -> SessionSnapshot:
+        """
+        Atomically replace the 'home' or 'ondemand' artifact file and record its
+        hash (and source URL) in the store, bumping the generation.
+        """
+        return self.write_artifacts({name: (content, url)})
+
+    def write_artifacts(self, artifacts: Dict[str, tuple]) -> SessionSnapshot:
+        """
+        Replace several artifacts ({name: (content, url)}) and record them in a
+        single store generation, so readers never pair a new ondemand.s with an
+        old home page.
+        """
+        paths = {"home": self.home_path, "ondemand": self.ondemand_path}
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        entries = {}
+        for name, (content, url) in artifacts.items():
+            path = paths[name]
+            data = content.encode("utf-8")
+            atomic_write_bytes(path, data)
+            entry = {"file": path.name, "sha256": hashlib.sha256(data).hexdigest(), "fetched_at": time.time()}
+            if url:
+                entry["url"] = url
+            entries[name] = entry
+        return self.update(artifacts=entries)
@@ -0,0 +1,87 @@
+"""
+Single-flight coalescing of identical in-flight commands.
+
+The first caller for a key starts the upstream call as its own task; callers
+arriving with the same key while it runs await that task instead of issuing
+another call, and all of them get its result (or exception). When every
+caller waiting on a flight has been cancelled, the flight is cancelled too.
+
+A flight belongs to no single caller: it runs under its own RequestMetrics
+whose deadline is the latest one among its callers (none if any caller has
+none), while each caller stops waiting at its own deadline.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from rate_limiter import RequestMetrics
+
+
+class Flight:
+    def __init__(self, deadline: Optional[float]):
+        self.metrics = RequestMetrics(deadline)
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+    def join(self, deadline: Optional[float]):
+        """Let the call run at least as long as this caller waits for it."""
+        if self.metrics.deadline is not None and (deadline is None or deadline > self.metrics.deadline):
+            self.metrics.deadline = deadline
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key: Hashable, call: Callable[[RequestMetrics], Awaitable],
+                  metrics: Optional[RequestMetrics] = None):
+        """
+        Args:
+            call: Starts the upstream call, given the flight's RequestMetrics
+            metrics: The caller's metrics; its deadline bounds this caller's wait,
+                and a leader is credited with the flight's requests and queue wait
+
+        Returns:
+            tuple: (result, whether it was shared from another caller's flight)
+        """
+        deadline = metrics.deadline if metrics is not None else None
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if shared:
+            self.followers += 1
+            flight.join(deadline)
+        else:
+            self.leaders += 1
+            flight = Flight(deadline)
+            flight.task = asyncio.ensure_future(call(flight.metrics))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        flight.waiters += 1
+        try:
+            # Shielded so one caller giving up doesn't cancel the call for the rest
+            waiter = asyncio.shield(flight.task)
+            if deadline is None:
+                result = await waiter
+            else:
+                result = await asyncio.wait_for(waiter, max(0.0, deadline - time.time()))
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if flight.waiters == 1 and not flight.task.done():
+                # Nobody is left to read the result
+                flight.task.cancel()
+                self._forget(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+            if not shared and metrics is not None:
+                metrics.queue_wait += flight.metrics.queue_wait
+                metrics.http_requests += flight.metrics.http_requests
+        return result, shared
+
+    def _forget(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self):
+        return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.followers}
@@ -0,0 +1,188 @@
+"""
+Unix domain socket transport for the bridge service.
+
+Instead of every Node process spawning its own service over stdin/stdout,
+several of them on one host can connect to one warm service and share its
+transaction generator, response cache, rate-limit buckets and HTTP pools.
+
+Frames in both directions are a 4-byte big-endian length followed by one JSON
+document. A connection may have any number of requests in flight; they are
+told apart by their 'id' and every reply goes back on the connection its
+request arrived on. The first frame on a new connection is the usual
+{"status": "ready"} signal.
+"""
+import asyncio
+import fcntl
+import os
+import sys
+from typing import Awaitable, Callable, Optional
+
+HEADER_SIZE = 4
+
+# Largest frame accepted from a client; anything bigger is a protocol error
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+def pack_frame(payload: bytes) -> bytes:
+    return len(payload).to_bytes(HEADER_SIZE, 'big') + payload
+
+
+async def read_frame(reader: asyncio.StreamReader, max_bytes: int = MAX_FRAME_BYTES) -> Optional[bytes]:
+    """The next frame's payload, or None when the peer closed between frames."""
+    try:
+        header = await reader.readexactly(HEADER_SIZE)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ConnectionError("Connection closed inside a frame header") from None
+        return None
+    length = int.from_bytes(header, 'big')
+    if length > max_bytes:
+        raise ValueError(f"Frame of {length} bytes exceeds the {max_bytes} byte limit")
+    try:
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ConnectionError("Connection closed inside a frame") from None
+
+
+class SocketServer:
+    """
+    Serves dispatch(payload, out_queue) on a Unix socket. dispatch puts its
+    reply (a dict) on out_queue; encode turns a dict into a JSON payload.
+    """
+
+    def __init__(self, path: str,
+                 dispatch: Callable[[bytes, asyncio.Queue], Awaitable[None]],
+                 encode: Callable[[dict], bytes],
+                 idle_timeout: float = 0,
+                 max_frame_bytes: int = MAX_FRAME_BYTES):
+        self.path = path
+        self.dispatch = dispatch
+        self.encode = encode
+        self.idle_timeout = idle_timeout
+        self.max_frame_bytes = max_frame_bytes
+        self.connections = 0
+        self.total_connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_file = None
+        self._stopped = asyncio.Event()
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._readers = {}  # writer -> connection's read loop task
+
+    def _acquire_lock(self):
+        """
+        One service per socket path. The lock is held for the life of the
+        process, so a socket file found while holding it was left behind by a
+        service that died and can be replaced.
+        """
+        lock_file = open(self.path + '.lock', 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(f"Another bridge service is already serving {self.path}") from None
+        self._lock_file = lock_file
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def start(self):
+        self._acquire_lock()
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+        # Credentials are behind this socket; keep it to the owning user
+        os.chmod(self.path, 0o600)
+        self._arm_idle_timer()
+        sys.stderr.write(f"Serving on unix socket {self.path}\n")
+
+    def stop(self):
+        self._stopped.set()
+
+    async def wait_stopped(self):
+        await self._stopped.wait()
+
+    async def close(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        if self._server is not None:
+            self._server.close()
+            # wait_closed() also waits for open connections; end their read loops
+            for task in list(self._readers.values()):
+                task.cancel()
+            if self._readers:
+                await asyncio.gather(*self._readers.values(), return_exceptions=True)
+            await self._server.wait_closed()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    def _arm_idle_timer(self):
+        if self.idle_timeout > 0 and self.connections == 0:
+            self._idle_handle = asyncio.get_running_loop().call_later(self.idle_timeout, self._on_idle)
+
+    def _on_idle(self):
+        sys.stderr.write(f"No clients for {self.idle_timeout:.0f}s; shutting down.\n")
+        self.stop()
+
+    async def _handle_connection(self, reader, writer):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        self.connections += 1
+        self.total_connections += 1
+        self._readers[writer] = asyncio.current_task()
+        out_queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._write_frames(out_queue, writer))
+        await out_queue.put({"status": "ready"})
+        pending_tasks = set()
+        try:
+            while True:
+                payload = await read_frame(reader, self.max_frame_bytes)
+                if payload is None:
+                    break
+                task = asyncio.create_task(self.dispatch(payload, out_queue))
+                pending_tasks.add(task)
+                task.add_done_callback(pending_tasks.discard)
+        except ValueError as e:
+            # The stream can't be resynchronised after a bad length prefix
+            await out_queue.put({"id": None, "success": False, "error": str(e)})
+        except ConnectionError as e:
+            sys.stderr.write(f"Socket client disconnected: {str(e)}\n")
+        finally:
+            # Nobody is left to read these replies. Coalesced reads run as
+            # shielded tasks, so other connections waiting on them still get theirs.
+            for task in pending_tasks:
+                task.cancel()
+            if pending_tasks:
+                await asyncio.gather(*pending_tasks, return_exceptions=True)
+            await out_queue.put(None)
+            await writer_task
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.connections -= 1
+            self._readers.pop(writer, None)
+            self._arm_idle_timer()
+
+    async def _write_frames(self, out_queue, writer):
+        """Single writer per connection so replies from concurrent tasks never interleave."""
+        broken = False
+        while True:
+            response_data = await out_queue.get()
+            if response_data is None:
+                break
+            if broken:
+                continue  # Keep draining so producers never block on a dead peer
+            try:
+                writer.write(pack_frame(self.encode(response_data)))
+                await writer.drain()
+            except ConnectionError:
+                broken = True
+
+    def stats(self):
+        return {"path": self.path, "connections": self.connections,
+                "total_connections": self.total_connections}
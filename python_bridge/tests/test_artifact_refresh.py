@@ -0,0 +1,101 @@
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from artifact_refresh import refresh_public_artifacts
+from session_store import SessionStore
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "twitter_data"
+HOME_HTML = (DATA_DIR / "twitter_home.html").read_text(encoding="utf-8")
+ONDEMAND_JS = (DATA_DIR / "twitter_ondemand.js").read_text(encoding="utf-8")
+
+
+def home_page(bundle):
+    return HOME_HTML.replace('"ondemand.s":"63fc9f1"', f'"ondemand.s":"{bundle}"')
+
+
+@pytest.fixture
+def site():
+    """Local stand-in for x.com and abs.twimg.com serving a mutable {path: (status, body)} map."""
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, body = pages.get(self.path, (404, "not found"))
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield base, pages
+    server.shutdown()
+    server.server_close()
+
+
+def refresh(store, base):
+    return refresh_public_artifacts(store, f"{base}/", f"{base}/ondemand.s.{{}}a.js", timeout=5)
+
+
+def test_refresh_replaces_artifacts_when_bundle_rotates(tmp_path, site):
+    base, pages = site
+    store = SessionStore(str(tmp_path))
+    pages["/"] = (200, home_page("aaa1111"))
+    pages["/ondemand.s.aaa1111a.js"] = (200, ONDEMAND_JS)
+
+    assert refresh(store, base) is True
+    assert store.home_path.read_text(encoding="utf-8") == home_page("aaa1111")
+    assert store.ondemand_path.read_text(encoding="utf-8") == ONDEMAND_JS
+    assert store.snapshot().artifacts["ondemand"]["url"] == f"{base}/ondemand.s.aaa1111a.js"
+
+    # Same bundle: nothing is fetched beyond the home page and nothing is rewritten
+    generation = store.snapshot().generation
+    assert refresh(store, base) is False
+    assert store.snapshot().generation == generation
+
+
+@pytest.mark.parametrize("ondemand, error", [
+    ((404, "not found"), urllib.error.HTTPError),
+    ((200, "no indices in here"), Exception),
+])
+def test_failed_refresh_keeps_last_good_artifacts(tmp_path, site, ondemand, error):
+    base, pages = site
+    store = SessionStore(str(tmp_path))
+    pages["/"] = (200, home_page("aaa1111"))
+    pages["/ondemand.s.aaa1111a.js"] = (200, ONDEMAND_JS)
+    assert refresh(store, base) is True
+    generation = store.snapshot().generation
+
+    pages["/"] = (200, home_page("bbb2222"))
+    pages["/ondemand.s.bbb2222a.js"] = ondemand
+    with pytest.raises(error):
+        refresh(store, base)
+
+    assert store.snapshot().generation == generation
+    assert store.home_path.read_text(encoding="utf-8") == home_page("aaa1111")
+    assert store.ondemand_path.read_text(encoding="utf-8") == ONDEMAND_JS
+    assert store.snapshot().artifacts["ondemand"]["url"] == f"{base}/ondemand.s.aaa1111a.js"
+
+
+def test_failed_home_fetch_keeps_last_good_artifacts(tmp_path, site):
+    base, pages = site
+    store = SessionStore(str(tmp_path))
+    pages["/"] = (200, home_page("aaa1111"))
+    pages["/ondemand.s.aaa1111a.js"] = (200, ONDEMAND_JS)
+    assert refresh(store, base) is True
+
+    pages["/"] = (503, "unavailable")
+    with pytest.raises(urllib.error.HTTPError):
+        refresh(store, base)
+    assert store.home_path.read_text(encoding="utf-8") == home_page("aaa1111")
@@ -0,0 +1,42 @@
+import base64
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from artifact_scan import derive_transaction_state
+from transaction_engine import TransactionEngine
+
+bs4 = pytest.importorskip("bs4")
+x_client_transaction = pytest.importorskip("x_client_transaction")
+
+HOME_HTML = (Path(__file__).resolve().parent.parent / "twitter_data" / "twitter_home.html").read_text(encoding="utf-8")
+KEY_PATTERN = re.compile(r'(name="twitter-site-verification" content=")([^"]*)(")')
+
+
+def write_artifacts(tmp_path, rng):
+    """Saved home page with a random verification key, and an ondemand.s with random indices."""
+    key = base64.b64encode(bytes(rng.randrange(256) for _ in range(48))).decode()
+    home = KEY_PATTERN.sub(lambda m: m.group(1) + key + m.group(3), HOME_HTML, count=1)
+    indices = [rng.randrange(48) for _ in range(4)]
+    ondemand = ";".join(f"x=(n[{index}],16)" for index in indices)
+    home_path = tmp_path / "twitter_home.html"
+    ondemand_path = tmp_path / "twitter_ondemand.js"
+    home_path.write_text(home, encoding="utf-8")
+    ondemand_path.write_text(ondemand, encoding="utf-8")
+    return home_path, ondemand_path
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_derived_state_matches_client_transaction(tmp_path, seed):
+    home_path, ondemand_path = write_artifacts(tmp_path, random.Random(seed))
+    ct = x_client_transaction.ClientTransaction(
+        home_page_response=bs4.BeautifulSoup(home_path.read_text(encoding="utf-8"), "html.parser"),
+        ondemand_file_response=bs4.BeautifulSoup(ondemand_path.read_text(encoding="utf-8"), "html.parser"))
+
+    state = derive_transaction_state(home_path, ondemand_path)
+    library = TransactionEngine.from_client_transaction(ct)
+
+    assert state == {"key": library.key, "animation_key": library.animation_key,
+                     "row_index": library.row_index, "key_bytes_indices": library.key_bytes_indices}
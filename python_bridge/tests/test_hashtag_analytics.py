@@ -0,0 +1,80 @@
+import random
+from collections import Counter
+
+from hashtag_analytics import PERCENTILE_ACCURACY, HashtagAnalytics, QuantileSketch, TimeHistogram, TopCounter
+from local_store import TWITTER_EPOCH_MS
+
+
+def snowflake(epoch_seconds):
+    return (int(epoch_seconds * 1000) - TWITTER_EPOCH_MS) << 22
+
+
+def test_quantiles_within_relative_error():
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(3, 2)) for _ in range(5000)]
+    sketch = QuantileSketch()
+    for start in range(0, len(values), 20):
+        sketch.add_batch(values[start:start + 20])
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(values) - 1))]
+        # Integer rounding of the bucket midpoint adds at most one
+        assert abs(sketch.quantile(q) - exact) <= exact * PERCENTILE_ACCURACY + 1
+    assert sketch.max == max(values)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_top_counter_is_exact_below_capacity():
+    rng = random.Random(3)
+    keys = [rng.choice('abcdefghij') for _ in range(1000)]
+    counter = TopCounter(capacity=100)
+    for key in keys:
+        counter.add(key)
+    assert counter.top(3) == Counter(keys).most_common(3)
+    assert counter.max_error == 0
+
+
+def test_top_counter_bounds_memory_and_reports_error():
+    counter = TopCounter(capacity=10)
+    for i in range(100):
+        counter.add('heavy', 5)
+        counter.add(f'rare{i}')
+    assert len(counter.counts) < 20
+    assert counter.top(1) == [('heavy', 500)]
+    assert counter.max_error >= 1
+
+
+def test_time_histogram_widens_buckets():
+    histogram = TimeHistogram(bucket_seconds=60, max_buckets=4)
+    histogram.add_batch([i * 60 for i in range(10)], [1] * 10)
+    report = histogram.report()
+    assert report["bucket_seconds"] == 240
+    assert sum(bucket["tweets"] for bucket in report["buckets"]) == 10
+    assert len(report["buckets"]) <= 4
+
+
+def test_report_over_pages():
+    base = 1_700_000_000
+    tweets = [
+        {"id": str(snowflake(base)), "text": "#Python and #asyncio", "favorite_count": 3, "retweet_count": 1,
+         "view_count": "100", "user": {"screen_name": "alice"}},
+        {"id": str(snowflake(base + 7200)), "text": "more #python", "hashtags": ["python", "sqlite"],
+         "favorite_count": 10, "reply_count": 2, "view_count": None, "user": {"screen_name": "bob"}},
+        {"id": str(snowflake(base + 3600)), "text": "#python", "favorite_count": 0, "user": {"screen_name": "alice"}},
+    ]
+    analytics = HashtagAnalytics('#Python')
+    analytics.add_page(tweets[:2])
+    analytics.add_page(tweets[2:])
+    analytics.add_page([])
+    report = analytics.report()
+
+    assert report["hashtag"] == "#python"
+    assert report["tweets"] == 3
+    assert report["engagement"]["sums"]["favorite_count"] == 13
+    assert report["engagement"]["sums"]["view_count"] == 100
+    assert report["engagement"]["total"] == 16
+    assert report["engagement"]["max"] == 12
+    assert report["top_authors"][0] == {"screen_name": "alice", "tweets": 2, "engagement": 4}
+    assert {entry["hashtag"] for entry in report["co_hashtags"]} == {"#asyncio", "#sqlite"}
+    assert report["first_tweet_at"] == "2023-11-14T22:13:20Z"
+    assert [bucket["tweets"] for bucket in report["histogram"]["buckets"]] == [1, 1, 1]
@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from local_store import TWITTER_EPOCH_MS, LocalStore, match_expression, parse_time
+
+NOW = time.time()
+
+
+def snowflake(seconds_ago, sequence=0):
+    return ((int((NOW - seconds_ago) * 1000) - TWITTER_EPOCH_MS) << 22) + sequence
+
+
+def tweet(seconds_ago, text, author="alice", author_id="10"):
+    return {"id": str(snowflake(seconds_ago)), "text": text, "user": {"id": author_id, "screen_name": author}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalStore(str(tmp_path / "store.sqlite3"))
+    store.record({"items": [tweet(300, "hello sqlite world"),
+                            tweet(200, "full text search with fts5"),
+                            tweet(100, "hello again", author="bob", author_id="20")]})
+    yield store
+    store.close()
+
+
+def texts(page):
+    return [item["text"] for item in page["items"]]
+
+
+def test_search_matches_every_term_newest_first(store):
+    assert texts(store.search({"query": "hello"})) == ["hello again", "hello sqlite world"]
+    assert texts(store.search({"query": "hello world"})) == ["hello sqlite world"]
+    assert texts(store.search({"query": '"sqlite world"'})) == ["hello sqlite world"]
+    assert texts(store.search({"query": "hello", "screen_name": "Bob"})) == ["hello again"]
+
+
+def test_query_syntax_is_not_passed_to_fts(store):
+    assert match_expression('a OR b* "c d"') == '"a" "OR" "b*" "c d"'
+    assert texts(store.search({"query": "NEAR(hello"})) == []
+
+
+def test_like_fallback_without_fts(store):
+    store.fts = False
+    assert texts(store.search({"query": "hello world"})) == ["hello sqlite world"]
+    assert texts(store.search({"query": "100%"})) == []
+
+
+def test_timeline_pages_with_cursor_and_time_window(store):
+    first = store.timeline({"screen_name": "alice", "count": 1})
+    assert texts(first) == ["full text search with fts5"]
+    second = store.timeline({"screen_name": "alice", "count": 1, "cursor": first["next_cursor"]})
+    assert texts(second) == ["hello sqlite world"]
+    assert store.timeline({"user_id": "10", "since": NOW - 250})["next_cursor"] is None
+    assert texts(store.timeline({"user_id": "10", "since": NOW - 250})) == ["full text search with fts5"]
+    assert texts(store.timeline({"screen_name": "nobody"})) == []
+
+
+def test_upsert_and_delete_keep_fts_in_sync(store):
+    edited = tweet(300, "goodbye sqlite world")
+    store.record(edited)
+    assert texts(store.search({"query": "hello"})) == ["hello again"]
+    store.delete_tweet(edited["id"])
+    assert texts(store.search({"query": "sqlite"})) == []
+
+
+def test_prune_drops_tweets_past_max_age(tmp_path):
+    store = LocalStore(str(tmp_path / "store.sqlite3"), max_age=150)
+    store.record({"items": [tweet(300, "old"), tweet(100, "new")]})
+    store.prune()
+    assert texts(store.timeline({"user_id": "10"})) == ["new"]
+    store.close()
+
+
+def test_sync_marks_never_move_back(store):
+    assert store.get_mark("key") is None
+    store.set_mark("key", 20)
+    store.set_mark("key", 10)
+    assert store.get_mark("key") == 20
+    store.drop_mark("key")
+    assert store.get_mark("key") is None
+
+
+def test_store_is_usable_from_the_service_store_thread(store):
+    with ThreadPoolExecutor(max_workers=1) as thread:
+        thread.submit(store.record, tweet(50, "written off the loop")).result()
+        page = thread.submit(store.search, {"query": "loop"}).result()
+    assert texts(page) == ["written off the loop"]
+    assert store.errors == 0
+
+
+def test_data_persists_across_instances(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    LocalStore(path).record(tweet(10, "persisted"))
+    reopened = LocalStore(path)
+    assert texts(reopened.search({"query": "persisted"})) == ["persisted"]
+    reopened.close()
+
+
+def test_parse_time():
+    assert parse_time("1970-01-01T00:01:00Z") == 60.0
+    assert parse_time(5) == 5.0
+    assert parse_time(None) is None
+    with pytest.raises(ValueError):
+        parse_time("yesterday")
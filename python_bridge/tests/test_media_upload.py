@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from media_upload import UploadJournal, upload_file
+
+
+class UploadEndpoint:
+    """Stands in for X's upload endpoint; fail_segment makes one APPEND fail once."""
+
+    def __init__(self, fail_segment=None, processing=()):
+        self.fail_segment = fail_segment
+        self.processing = list(processing)
+        self.inits = 0
+        self.appended = []
+
+    def get_cookies(self):
+        return {'twid': 'u=1'}
+
+    async def request(self, method, url, params=None, files=None):
+        command = params['command']
+        if command == 'INIT':
+            self.inits += 1
+            return {'media_id_string': f'media{self.inits}', 'expires_after_secs': 3600}, None
+        if command == 'APPEND':
+            index = params['segment_index']
+            await asyncio.sleep(0)
+            if index == self.fail_segment:
+                self.fail_segment = None
+                raise ConnectionError("connection reset")
+            self.appended.append((index, files['media'][1]))
+            return {}, None
+        if command in ('FINALIZE', 'STATUS'):
+            if self.processing:
+                return {'processing_info': {'state': self.processing.pop(0), 'check_after_secs': 0.01}}, None
+            return {'media_id_string': params['media_id']}, None
+        raise AssertionError(command)
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(bytes(range(256)) * 10)
+    return path
+
+
+def upload(client, media, tmp_path, concurrency=1):
+    return asyncio.run(upload_file(client, str(media), segment_size=1000, concurrency=concurrency,
+                                   journal_dir=str(tmp_path / "uploads"), processing_timeout=5))
+
+
+def test_segments_reassemble_the_file(media, tmp_path):
+    client = UploadEndpoint()
+    result = upload(client, media, tmp_path, concurrency=3)
+    assert result["segments"] == 3 and result["resumed_segments"] == 0
+    assert b''.join(chunk for _, chunk in sorted(client.appended)) == media.read_bytes()
+    assert os.listdir(tmp_path / "uploads") == []
+
+
+def test_interrupted_upload_resumes_from_the_journal(media, tmp_path):
+    client = UploadEndpoint(fail_segment=1)
+    with pytest.raises(ConnectionError):
+        upload(client, media, tmp_path)
+    journals = os.listdir(tmp_path / "uploads")
+    assert len(journals) == 1
+    with open(tmp_path / "uploads" / journals[0]) as f:
+        acked = json.load(f)["acked"]
+    assert 0 in acked and 1 not in acked
+
+    result = upload(client, media, tmp_path)
+    assert client.inits == 1
+    assert result["media_id"] == "media1"
+    assert result["resumed_segments"] == len(acked)
+    # Acknowledged segments are not sent again
+    assert sorted(index for index, _ in client.appended) == [0, 1, 2]
+    assert os.listdir(tmp_path / "uploads") == []
+
+
+def test_changed_file_starts_over(media, tmp_path):
+    client = UploadEndpoint(fail_segment=1)
+    with pytest.raises(ConnectionError):
+        upload(client, media, tmp_path)
+    media.write_bytes(b'x' * 1500)
+    result = upload(client, media, tmp_path)
+    assert client.inits == 2 and result["resumed_segments"] == 0
+
+
+def test_video_processing_is_polled(media, tmp_path):
+    result = upload(UploadEndpoint(processing=['pending', 'in_progress', 'succeeded']), media, tmp_path)
+    assert result["processing"] == "succeeded"
+
+
+def test_journal_rejects_other_files_and_expired_media(tmp_path):
+    async def scenario():
+        journal = UploadJournal(str(tmp_path / "uploads" / "j.json"))
+        await journal.save({"fingerprint": {"path": "a"}, "expires_at": 0, "acked": []})
+        return journal, await journal.load({"path": "a"})
+
+    journal, state = asyncio.run(scenario())
+    assert state is None
+    assert not os.path.exists(journal.path)
+
+
+def test_journal_writes_leave_the_loop_and_keep_their_order(tmp_path, monkeypatch):
+    writers = []
+    write = UploadJournal._write
+
+    def record(self, data):
+        writers.append(threading.get_ident())
+        write(self, data)
+
+    monkeypatch.setattr(UploadJournal, '_write', record)
+
+    async def scenario():
+        journal = UploadJournal(str(tmp_path / "uploads" / "j.json"))
+        state = {"acked": []}
+        saves = []
+        for index in range(20):
+            state["acked"].append(index)
+            saves.append(asyncio.ensure_future(journal.save(state)))
+        await asyncio.sleep(0)
+        # A save whose caller gave up still lands in its turn
+        saves[-1].cancel()
+        await asyncio.gather(*saves, return_exceptions=True)
+        await journal.flush()
+        return journal
+
+    journal = asyncio.run(scenario())
+    assert len(writers) == 20 and threading.get_ident() not in writers
+    with open(journal.path) as f:
+        assert json.load(f)["acked"] == list(range(20))
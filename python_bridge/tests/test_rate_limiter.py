@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import RateLimitBucket, RateLimiter, RateLimitExceeded, RequestMetrics, current_metrics, operation_for
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Response:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def window(limit, remaining, reset_in):
+    return {'x-rate-limit-limit': str(limit), 'x-rate-limit-remaining': str(remaining),
+            'x-rate-limit-reset': str(int(time.time() + reset_in))}
+
+
+def test_operation_for():
+    assert operation_for('https://x.com/i/api/graphql/abc123/UserByScreenName?variables=1') == 'UserByScreenName'
+    assert operation_for('https://api.x.com/1.1/friendships/create.json') == '/1.1/friendships/create.json'
+
+
+def test_unknown_budget_probes_one_request_at_a_time():
+    async def scenario():
+        bucket = RateLimitBucket()
+        await bucket.acquire(1)
+        second = asyncio.ensure_future(bucket.acquire(1))
+        await asyncio.sleep(0.01)
+        blocked = not second.done()
+        await bucket.release(200, window(10, 9, 900))
+        await second
+        return blocked, bucket.stats()
+
+    blocked, stats = run(scenario())
+    assert blocked
+    assert (stats["limit"], stats["remaining"], stats["in_flight"]) == (10, 9, 1)
+
+
+def test_unmetered_endpoint_is_unlimited():
+    async def scenario():
+        bucket = RateLimitBucket()
+        await bucket.acquire(1)
+        await bucket.release(200, {})
+        await asyncio.gather(*(bucket.acquire(0) for _ in range(5)))
+        return bucket.in_flight
+
+    assert run(scenario()) == 5
+
+
+def test_exhausted_window_fails_fast_beyond_max_wait():
+    async def scenario():
+        bucket = RateLimitBucket()
+        await bucket.acquire(1)
+        await bucket.release(200, window(10, 0, 600))
+        await bucket.acquire(60)
+
+    with pytest.raises(RateLimitExceeded):
+        run(scenario())
+
+
+def test_out_of_order_responses_keep_the_lowest_remaining():
+    bucket = RateLimitBucket()
+    headers = window(10, 5, 900)
+    bucket._update(200, headers)
+    bucket._update(200, {**headers, 'x-rate-limit-remaining': '7'})
+    assert bucket.remaining == 5
+
+
+def test_request_fails_without_sending_when_the_window_is_out_of_reach():
+    async def scenario():
+        limiter = RateLimiter(max_wait=1)
+        limiter.bucket('UserByScreenName')._update(200, window(10, 0, 60))
+        sent = []
+
+        async def send(method, url):
+            sent.append(url)
+            return Response()
+
+        with pytest.raises(RateLimitExceeded):
+            await limiter.request(send, 'GET', 'https://x.com/i/api/graphql/q/UserByScreenName')
+        return sent
+
+    assert run(scenario()) == []
+
+
+def test_429_is_retried_once_the_window_resets():
+    async def scenario():
+        limiter = RateLimiter(max_wait=5, max_retries=2)
+        metrics = RequestMetrics()
+        current_metrics.set(metrics)
+        responses = [Response(429, window(10, 0, -1)), Response(200, window(10, 9, 900))]
+
+        async def send(method, url):
+            return responses.pop(0)
+
+        response = await limiter.request(send, 'GET', 'https://x.com/i/api/graphql/q/SearchTimeline')
+        return response.status_code, metrics.http_requests
+
+    assert run(scenario()) == (200, 2)
+
+
+def test_request_respects_the_callers_deadline():
+    async def scenario():
+        limiter = RateLimiter(max_wait=900)
+        limiter.bucket('UserByScreenName')._update(200, window(10, 0, 60))
+        current_metrics.set(RequestMetrics(time.time() + 1))
+        sent = []
+
+        async def send(method, url):
+            sent.append(url)
+            return Response()
+
+        with pytest.raises(RateLimitExceeded):
+            await limiter.request(send, 'GET', 'https://x.com/i/api/graphql/q/UserByScreenName')
+        return sent
+
+    assert run(scenario()) == []
+
+
+def test_waiting_behind_a_probe_is_bounded_by_the_deadline():
+    async def scenario():
+        limiter = RateLimiter(max_wait=900)
+        # The probe holds the only token of an operation whose budget is unknown
+        await limiter.bucket('UserByScreenName').acquire(1)
+        current_metrics.set(RequestMetrics(time.time() + 0.05))
+
+        async def send(method, url):
+            return Response()
+
+        with pytest.raises(RateLimitExceeded):
+            await asyncio.wait_for(limiter.request(send, 'GET', 'https://x.com/i/api/graphql/q/UserByScreenName'), 1)
+
+    run(scenario())
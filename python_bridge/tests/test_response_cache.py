@@ -0,0 +1,86 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, parse_ttls, read_tags, write_tags
+
+
+def test_key_ignores_routing_and_projection():
+    assert ResponseCache.make_key('get_tweet_by_id', {'id': '1', 'account': 'a', 'cache': True, 'fields': ['id']}) == \
+        ResponseCache.make_key('get_tweet_by_id', {'id': '1'})
+
+
+def test_hit_miss_and_uncached_actions():
+    cache = ResponseCache()
+    key = cache.make_key('get_tweet_by_id', {'id': '1'})
+    assert cache.get(key) == (False, None)
+    cache.put(key, {'id': '1'}, ['tweet:1'])
+    assert cache.get(key) == (True, {'id': '1'})
+    assert not cache.is_cacheable('create_tweet')
+    assert cache.stats()["by_action"]["get_tweet_by_id"] == {"hits": 1, "misses": 1}
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now[0])
+    cache = ResponseCache({'get_tweet_by_id': 10})
+    key = cache.make_key('get_tweet_by_id', {'id': '1'})
+    cache.put(key, 'tweet', [])
+    now[0] += 11
+    assert cache.get(key) == (False, None)
+    assert cache.expirations == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    keys = [cache.make_key('get_tweet_by_id', {'id': str(i)}) for i in range(3)]
+    cache.put(keys[0], 0, [])
+    cache.put(keys[1], 1, [])
+    cache.get(keys[0])
+    cache.put(keys[2], 2, [])
+    assert [cache.get(key)[0] for key in keys] == [True, False, True]
+    assert cache.evictions == 1
+
+
+def test_byte_cap_is_enforced():
+    cache = ResponseCache(max_bytes=20)
+    cache.put(cache.make_key('get_tweet_by_id', {'id': '1'}), 'x' * 100, [])
+    assert cache.stats()["entries"] == 0
+
+
+def test_writes_invalidate_dependent_reads():
+    cache = ResponseCache()
+    tweet_key = cache.make_key('get_tweet_by_id', {'id': '1'})
+    timeline_args = {'user_id': '10'}
+    timeline_key = cache.make_key('get_user_tweets', timeline_args)
+    cache.put(tweet_key, {'id': '1'}, read_tags('get_tweet_by_id', {'id': '1'}, None, 'a'))
+    cache.put(timeline_key, [], read_tags('get_user_tweets', timeline_args, [], 'a'))
+    assert cache.invalidate(write_tags('delete_tweet', {'id': '1'}, 'a')) == 2
+    assert cache.get(tweet_key)[0] is False and cache.get(timeline_key)[0] is False
+
+
+def test_read_that_raced_a_write_is_not_stored():
+    cache = ResponseCache()
+    key = cache.make_key('get_tweet_by_id', {'id': '1'})
+    started = cache.epoch()
+    cache.invalidate(['tweet:1'])
+    cache.put(key, 'stale', ['tweet:1'], started)
+    assert cache.get(key) == (False, None)
+    # Unrelated tags don't block it
+    cache.put(key, 'fresh', ['tweet:2'], started)
+    assert cache.get(key) == (True, 'fresh')
+
+
+def test_clear_blocks_reads_already_in_flight():
+    cache = ResponseCache()
+    key = cache.make_key('get_tweet_by_id', {'id': '1'})
+    started = cache.epoch()
+    cache.clear()
+    cache.put(key, 'stale', [], started)
+    assert cache.get(key) == (False, None)
+
+
+def test_parse_ttls():
+    ttls = parse_ttls('search_tweet=0, get_tweet_by_id=5')
+    assert ttls['search_tweet'] == 0 and ttls['get_tweet_by_id'] == 5
+    with pytest.raises(ValueError):
+        parse_ttls('search_tweet')
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from scheduler import LaneScheduler, Overloaded, parse_lane_values
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold(scheduler, lane, release, started=None):
+    async with scheduler.slot(lane):
+        if started is not None:
+            started.append(lane)
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_interactive_starts_on_idle_slot_while_background_is_capped():
+    async def scenario():
+        scheduler = LaneScheduler(4)
+        release = asyncio.Event()
+        # Two background commands fill the background share, a third queues
+        background = [asyncio.ensure_future(hold(scheduler, 'background', release)) for _ in range(3)]
+        await settle()
+        assert scheduler.lanes['background'].running == 2
+        assert len(scheduler.lanes['background'].waiting) == 1
+
+        started = []
+        interactive = asyncio.ensure_future(hold(scheduler, 'interactive', release, started))
+        await settle()
+        running = scheduler.lanes['interactive'].running
+        release.set()
+        await asyncio.gather(*background, interactive)
+        return started, running, scheduler.running
+
+    started, running, remaining = run(scenario())
+    assert started == ['interactive']
+    assert running == 1
+    assert remaining == 0
+
+
+def test_background_never_holds_more_than_its_share():
+    async def scenario():
+        scheduler = LaneScheduler(4)
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(scheduler, 'background', release)) for _ in range(6)]
+        await settle()
+        stats = scheduler.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = run(scenario())
+    assert stats["running"] == 2
+    assert stats["lanes"]["background"]["queued"] == 4
+
+
+def test_freed_slots_favour_interactive_over_background_backlog():
+    async def scenario():
+        scheduler = LaneScheduler(1, weights={'interactive': 8, 'default': 3, 'background': 1})
+        release = asyncio.Event()
+        blocker = asyncio.ensure_future(hold(scheduler, 'default', release))
+        await settle()
+        order = []
+
+        async def record(lane):
+            async with scheduler.slot(lane):
+                order.append(lane)
+
+        tasks = [asyncio.ensure_future(record('background')) for _ in range(3)]
+        await settle()
+        tasks += [asyncio.ensure_future(record('interactive')) for _ in range(3)]
+        await settle()
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+        return order
+
+    order = run(scenario())
+    assert order[:3] == ['interactive'] * 3
+    assert sorted(order) == ['background'] * 3 + ['interactive'] * 3
+
+
+def test_full_queue_rejects_with_overloaded():
+    async def scenario():
+        scheduler = LaneScheduler(1, queue_limits={'interactive': 1, 'default': 1, 'background': 1})
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(scheduler, 'default', release))
+        queued = asyncio.ensure_future(hold(scheduler, 'default', release))
+        await settle()
+        with pytest.raises(Overloaded):
+            async with scheduler.slot('default'):
+                pass
+        rejected = scheduler.lanes['default'].rejected
+        release.set()
+        await asyncio.gather(holder, queued)
+        return rejected
+
+    assert run(scenario()) == 1
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        scheduler = LaneScheduler(1)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(scheduler, 'default', release))
+        waiter = asyncio.ensure_future(hold(scheduler, 'default', release))
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        release.set()
+        await holder
+        async with scheduler.slot('interactive'):
+            inside = scheduler.running
+        return inside, scheduler.running, scheduler.lanes['default'].waiting
+
+    inside, running, waiting = run(scenario())
+    assert (inside, running, len(waiting)) == (1, 0, 0)
+
+
+def test_parse_lane_values():
+    assert parse_lane_values('interactive=5, background=2', {'interactive': 1, 'default': 1, 'background': 1}) == \
+        {'interactive': 5, 'default': 1, 'background': 2}
+    with pytest.raises(ValueError):
+        parse_lane_values('urgent=3', {'interactive': 1, 'default': 1, 'background': 1})
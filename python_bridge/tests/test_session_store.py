@@ -0,0 +1,61 @@
+import hashlib
+import json
+
+import pytest
+
+from session_store import SessionStore
+
+COOKIES = [{"name": "ct0", "value": "csrf", "domain": ".x.com"}, {"name": "auth_token", "value": "secret"}]
+
+
+def test_update_writes_a_new_generation(tmp_path):
+    store = SessionStore(data_dir=str(tmp_path))
+    assert not store.has_credentials()
+    snapshot = store.update(cookies=COOKIES, common_headers={"authorization": "Bearer x"})
+    assert snapshot.generation == 1
+    assert snapshot.cookies_dict == {"ct0": "csrf", "auth_token": "secret"}
+    assert store.has_credentials()
+    # Fields left out keep their value
+    assert store.update(headers=[{"url": "https://x.com"}]).cookies == COOKIES
+    assert json.loads(store.path.read_text())["generation"] == 2
+    assert [path.name for path in tmp_path.iterdir()] == [store.path.name]
+
+
+def test_reader_reloads_only_when_another_writer_changed_the_file(tmp_path):
+    writer = SessionStore(data_dir=str(tmp_path))
+    writer.update(cookies=COOKIES, common_headers={"a": "1"})
+    reader = SessionStore(data_dir=str(tmp_path))
+    assert reader.snapshot().generation == 1
+    assert not reader.reload_if_changed()
+    writer.update(cookies=[{"name": "ct0", "value": "rotated"}])
+    assert reader.reload_if_changed()
+    assert reader.snapshot().cookies_dict == {"ct0": "rotated"}
+
+
+def test_legacy_per_file_export_is_read(tmp_path):
+    (tmp_path / "twitter_cookies.json").write_text(json.dumps(COOKIES))
+    (tmp_path / "twitter_common_headers.json").write_text(json.dumps({"authorization": "Bearer x"}))
+    snapshot = SessionStore(data_dir=str(tmp_path)).snapshot()
+    assert snapshot.generation == 0
+    assert snapshot.cookies_dict["ct0"] == "csrf"
+    assert snapshot.common_headers == {"authorization": "Bearer x"}
+
+
+def test_write_artifact_records_its_hash(tmp_path):
+    store = SessionStore(data_dir=str(tmp_path))
+    assert not store.has_transaction_artifacts()
+    store.write_artifact("home", "<html></html>", url="https://x.com")
+    store.write_artifact("ondemand", "ondemand();")
+    artifacts = store.snapshot().artifacts
+    assert artifacts["home"]["sha256"] == hashlib.sha256(b"<html></html>").hexdigest()
+    assert artifacts["home"]["url"] == "https://x.com"
+    assert "url" not in artifacts["ondemand"]
+    assert store.ondemand_path.read_text() == "ondemand();"
+    assert store.has_transaction_artifacts()
+
+
+def test_newer_store_version_is_refused(tmp_path):
+    store = SessionStore(data_dir=str(tmp_path))
+    store.path.write_text(json.dumps({"version": 99, "cookies": []}))
+    with pytest.raises(ValueError):
+        store.snapshot()
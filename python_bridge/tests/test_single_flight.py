@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import RequestMetrics
+from single_flight import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_identical_calls_share_one_upstream_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def call(metrics):
+            calls.append(metrics)
+            metrics.http_requests += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        leader_metrics = RequestMetrics()
+        results = await asyncio.gather(flight.run("key", call, leader_metrics),
+                                       flight.run("key", call, RequestMetrics()))
+        return calls, results, leader_metrics, flight.stats()
+
+    calls, results, leader_metrics, stats = run(scenario())
+    assert len(calls) == 1
+    assert results == [("result", False), ("result", True)]
+    assert leader_metrics.http_requests == 1
+    assert stats == {"in_flight": 0, "leaders": 1, "coalesced": 1}
+
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def call(metrics):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        return await asyncio.gather(flight.run("key", call), flight.run("key", call), return_exceptions=True)
+
+    results = run(scenario())
+    assert [str(result) for result in results] == ["upstream failed", "upstream failed"]
+
+
+def test_follower_outlives_leader_deadline():
+    async def scenario():
+        flight = SingleFlight()
+        seen_deadlines = []
+
+        async def call(metrics):
+            await asyncio.sleep(0.1)
+            # The rate limiter reads the deadline at each request, after callers joined
+            seen_deadlines.append(metrics.deadline)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.run("key", call, RequestMetrics(time.time() + 0.03)))
+        await asyncio.sleep(0)
+        follower_deadline = time.time() + 5
+        follower = asyncio.ensure_future(flight.run("key", call, RequestMetrics(follower_deadline)))
+        results = await asyncio.gather(leader, follower, return_exceptions=True)
+        return results, seen_deadlines, follower_deadline
+
+    (leader, follower), seen_deadlines, follower_deadline = run(scenario())
+    assert isinstance(leader, asyncio.TimeoutError)
+    assert follower == ("result", True)
+    assert seen_deadlines == [follower_deadline]
+
+
+def test_caller_without_deadline_lifts_flight_deadline():
+    async def scenario():
+        flight = SingleFlight()
+        seen_deadlines = []
+
+        async def call(metrics):
+            await asyncio.sleep(0.01)
+            seen_deadlines.append(metrics.deadline)
+            return "result"
+
+        await asyncio.gather(flight.run("key", call, RequestMetrics(time.time() + 5)),
+                             flight.run("key", call, RequestMetrics()))
+        return seen_deadlines
+
+    assert run(scenario()) == [None]
+
+
+def test_cancelling_leader_keeps_flight_for_followers():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def call(metrics):
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.run("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("key", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(scenario()) == ("result", True)
+
+
+def test_flight_is_cancelled_when_every_caller_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def call(metrics):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.ensure_future(flight.run("key", call)) for _ in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return flight.stats()
+
+    assert run(scenario())["in_flight"] == 0
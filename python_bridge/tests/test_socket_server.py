@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+
+from socket_server import HEADER_SIZE, SocketServer, pack_frame, read_frame
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def reader_with(data, eof=True):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    if eof:
+        reader.feed_eof()
+    return reader
+
+
+def test_frames_round_trip():
+    async def scenario():
+        reader = await reader_with(pack_frame(b'{"a":1}') + pack_frame(b''))
+        return [await read_frame(reader) for _ in range(3)]
+
+    assert run(scenario()) == [b'{"a":1}', b'', None]
+
+
+@pytest.mark.parametrize("data, error", [
+    (b'\x00\x00', ConnectionError),
+    (pack_frame(b'payload')[:-2], ConnectionError),
+    ((64).to_bytes(HEADER_SIZE, 'big'), ValueError),
+])
+def test_truncated_or_oversized_frames(data, error):
+    async def scenario():
+        return await read_frame(await reader_with(data), max_bytes=32)
+
+    with pytest.raises(error):
+        run(scenario())
+
+
+def encode(response):
+    return json.dumps(response).encode('utf-8')
+
+
+async def echo(payload, out_queue):
+    command = json.loads(payload)
+    await asyncio.sleep(command.get('delay', 0))
+    await out_queue.put({"id": command['id'], "success": True})
+
+
+def test_replies_return_on_their_connection_in_completion_order(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "bridge.sock")
+        server = SocketServer(path, echo, encode)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            ready = json.loads(await read_frame(reader))
+            writer.write(pack_frame(encode({"id": "slow", "delay": 0.05})) + pack_frame(encode({"id": "fast"})))
+            await writer.drain()
+            replies = [json.loads(await read_frame(reader))["id"] for _ in range(2)]
+            writer.close()
+            await writer.wait_closed()
+            return ready, replies
+        finally:
+            await server.close()
+
+    ready, replies = run(scenario())
+    assert ready == {"status": "ready"}
+    assert replies == ["fast", "slow"]
+
+
+def test_one_service_per_socket_path(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "bridge.sock")
+        first = SocketServer(path, echo, encode)
+        await first.start()
+        try:
+            with pytest.raises(RuntimeError):
+                await SocketServer(path, echo, encode).start()
+        finally:
+            await first.close()
+
+    run(scenario())
+
+
+def test_oversized_frame_is_rejected_with_an_error_reply(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "bridge.sock")
+        server = SocketServer(path, echo, encode, max_frame_bytes=16)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await read_frame(reader)
+            writer.write((1024).to_bytes(HEADER_SIZE, 'big'))
+            await writer.drain()
+            reply = json.loads(await read_frame(reader))
+            closed = await read_frame(reader)
+            writer.close()
+            return reply, closed
+        finally:
+            await server.close()
+
+    reply, closed = run(scenario())
+    assert reply["success"] is False and "exceeds" in reply["error"]
+    assert closed is None
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import transaction_cache
+from transaction_cache import load_transaction_engine
+
+STATE = {"key": "AAECAwQFBgcICQoLDA0ODw==", "animation_key": "a1b2c3", "row_index": 7,
+         "key_bytes_indices": [1, 2, 3]}
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    home, ondemand = tmp_path / "home.html", tmp_path / "ondemand.js"
+    home.write_text("<html>home</html>")
+    ondemand.write_text("ondemand();")
+    builds = []
+
+    def build(home_path, ondemand_path):
+        builds.append((home_path.read_text(), ondemand_path.read_text()))
+        return dict(STATE)
+
+    monkeypatch.setattr(transaction_cache, 'derive_transaction_state', build)
+    return home, ondemand, tmp_path / transaction_cache.DEFAULT_CACHE_FILENAME, builds
+
+
+def test_second_load_is_served_from_the_cache(artifacts):
+    home, ondemand, cache_path, builds = artifacts
+    first = load_transaction_engine(home, ondemand)
+    second = load_transaction_engine(home, ondemand)
+    assert len(builds) == 1
+    assert json.loads(cache_path.read_text())["state"] == STATE
+    assert first.generate_transaction_id("GET", "/a", time_now=1, random_num=2) == \
+        second.generate_transaction_id("GET", "/a", time_now=1, random_num=2)
+
+
+def test_changed_artifact_misses_the_cache(artifacts):
+    home, ondemand, cache_path, builds = artifacts
+    load_transaction_engine(home, ondemand)
+    ondemand.write_text("rotated();")
+    load_transaction_engine(home, ondemand)
+    assert [built[1] for built in builds] == ["ondemand();", "rotated();"]
+
+
+def test_unreadable_or_foreign_cache_is_rebuilt(artifacts):
+    home, ondemand, cache_path, builds = artifacts
+    cache_path.write_text("{truncated")
+    load_transaction_engine(home, ondemand)
+    cached = json.loads(cache_path.read_text())
+    cached["version"] = transaction_cache.CACHE_VERSION + 1
+    cache_path.write_text(json.dumps(cached))
+    load_transaction_engine(home, ondemand)
+    assert len(builds) == 2
+
+
+def test_cache_file_override(artifacts, tmp_path):
+    home, ondemand, default_path, builds = artifacts
+    override = tmp_path / "elsewhere.json"
+    load_transaction_engine(home, ondemand, override)
+    assert override.exists() and not default_path.exists()
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+
+from rate_limiter import RateLimiter
+from session_store import SessionStore
+from twikit_actions import USER_FIELDS, SessionClient, parse_fields, project, to_plain, with_flag
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class StubGenerator:
+    def generate_transaction_id(self, method, path):
+        return f"tid {method} {path}"
+
+
+class StubState:
+    async def get_transaction_generator(self):
+        return StubGenerator()
+
+
+def mock_transport(session_client, handler):
+    http = session_client.client.http
+    http._transport = httpx.MockTransport(handler)
+    http._mounts = {}
+
+
+def make_store(tmp_path):
+    store = SessionStore(data_dir=str(tmp_path))
+    store.update(cookies=[{"name": "ct0", "value": "login"}, {"name": "auth_token", "value": "secret"}],
+                 common_headers={"authorization": "Bearer captured", "x-csrf-token": "login",
+                                 "cookie": "ct0=login; auth_token=secret", "content-type": "text/plain",
+                                 "x-client-transaction-id": "captured"})
+    return store
+
+
+def test_requests_follow_the_jar_and_keep_twikits_transaction_id(tmp_path):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        # The first response rotates ct0, as X does during a session
+        headers = {"set-cookie": "ct0=rotated; Domain=.x.com; Path=/"} if len(seen) == 1 else {}
+        return httpx.Response(200, json={}, headers=headers)
+
+    async def scenario():
+        session_client = SessionClient(make_store(tmp_path), RateLimiter())
+        mock_transport(session_client, handler)
+        client = await session_client.prepare(StubState())
+        await client.get("https://x.com/i/api/1.1/first.json", headers=client._base_headers)
+        await client.post("https://x.com/i/api/1.1/second.json", json={}, headers=client._base_headers)
+        await session_client.close()
+
+    run(scenario())
+    first, second = seen
+    assert first.headers["x-csrf-token"] == "login"
+    assert "ct0=login" in first.headers["cookie"] and "auth_token=secret" in first.headers["cookie"]
+    assert second.headers["x-csrf-token"] == "rotated"
+    assert "ct0=rotated" in second.headers["cookie"] and "ct0=login" not in second.headers["cookie"]
+    assert second.headers["x-client-transaction-id"] == "tid POST /i/api/1.1/second.json"
+    assert second.headers["content-type"] == "application/json"
+    assert second.headers["authorization"] == "Bearer captured"
+
+
+def test_relogin_replaces_the_jar(tmp_path):
+    store = make_store(tmp_path)
+    seen = []
+
+    async def scenario():
+        session_client = SessionClient(store, RateLimiter())
+        mock_transport(session_client, lambda request: seen.append(request) or httpx.Response(200, json={}))
+        store.update(cookies=[{"name": "ct0", "value": "relogin"}, {"name": "auth_token", "value": "new"}])
+        client = await session_client.prepare(StubState())
+        await client.get("https://x.com/i/api/1.1/a.json")
+        await session_client.close()
+
+    run(scenario())
+    assert seen[0].headers["x-csrf-token"] == "relogin"
+    assert "auth_token=new" in seen[0].headers["cookie"]
+
+
+def test_to_plain_flattens_pages_and_responses():
+    class Page:
+        def __init__(self, items):
+            self.items = items
+            self.next_cursor = "next"
+
+        def __iter__(self):
+            return iter(self.items)
+
+    class Item:
+        def __init__(self, item_id):
+            self.id = item_id
+            self._client = object()
+
+    assert to_plain(Page([Item("1"), Item("2")])) == {"items": [{"id": "1"}, {"id": "2"}], "next_cursor": "next"}
+    assert to_plain(httpx.Response(204)) == {"success": True, "status_code": 204}
+    assert with_flag(httpx.Response(200), favorited=True) == {"success": True, "status_code": 200, "favorited": True}
+    assert with_flag(httpx.Response(403), favorited=True) == {"success": False, "status_code": 403}
+
+
+def test_twikit_types_always_carry_their_full_schema():
+    class User:
+        screen_name = "x"
+
+        @property
+        def name(self):
+            raise KeyError("name")
+
+    user = to_plain(User())
+    assert set(user) == set(USER_FIELDS)
+    assert user["screen_name"] == "x" and user["name"] is None
+
+
+def test_requests_are_paced_by_the_accounts_rate_limiter(tmp_path):
+    limiter = RateLimiter()
+
+    def handler(request):
+        return httpx.Response(200, json={}, headers={"x-rate-limit-limit": "50", "x-rate-limit-remaining": "49",
+                                                     "x-rate-limit-reset": "4102444800"})
+
+    async def scenario():
+        session_client = SessionClient(make_store(tmp_path), limiter)
+        mock_transport(session_client, handler)
+        client = await session_client.prepare(StubState())
+        await client.get("https://x.com/i/api/graphql/abc/UserByScreenName", headers=client._base_headers)
+        await session_client.close()
+
+    run(scenario())
+    assert limiter.stats()["UserByScreenName"]["remaining"] == 49
+
+
+def test_parse_fields_builds_a_nested_tree():
+    assert parse_fields(["id", "user.screen_name", "user.id"]) == {"id": None, "user": {"screen_name": None, "id": None}}
+    with pytest.raises(ValueError):
+        parse_fields("id")
+
+
+def test_project_keeps_pages_and_fills_missing_fields():
+    page = {"items": [{"id": "1", "text": "a"}, {"id": "2"}], "next_cursor": "c"}
+    assert project(page, parse_fields(["id", "text"])) == {
+        "items": [{"id": "1", "text": "a"}, {"id": "2", "text": None}], "next_cursor": "c"}
+    assert project(page, None) is page
@@ -0,0 +1,679 @@
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import twikit_service
+from local_store import LocalStore
+from rate_limiter import current_metrics
+from response_cache import ResponseCache
+from scheduler import LaneScheduler
+from user_index import UserIndex
+
+BRIDGE_DIR = Path(__file__).resolve().parent.parent
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class StubGenerator:
+    def generate_transaction_id(self, method, path):
+        return f"{method} {path}"
+
+
+class StubStore(SimpleNamespace):
+    def __init__(self):
+        super().__init__(home_path=None, ondemand_path=None, data_dir='.')
+
+    def has_credentials(self):
+        return True
+
+    def snapshot(self):
+        return SimpleNamespace(generation=1)
+
+
+class StubSessionClient:
+    async def prepare(self, account):
+        # Actions get the account in place of the twikit client
+        return account
+
+
+class StubAccount(twikit_service.AccountState):
+    """An account with its transaction generator and twikit client ready."""
+
+    def __init__(self, name):
+        super().__init__(name, StubStore(), twikit_service.StartupReport())
+
+    async def get_transaction_generator(self):
+        return StubGenerator()
+
+    async def get_session_client(self):
+        return StubSessionClient()
+
+
+def make_state(*accounts, concurrency=4, user_index=None, local_store=None):
+    return twikit_service.BridgeState(list(accounts) or [StubAccount('a')], twikit_service.StartupReport(),
+                                      ResponseCache(), LaneScheduler(concurrency), user_index or UserIndex(None),
+                                      local_store or LocalStore(None))
+
+
+def command(request_id, action='get_transaction_id', **args):
+    return {"id": request_id, "action": action,
+            "args": args or {"method": "GET", "url": "https://x.com/i/api/1.1/a.json"}}
+
+
+def test_slow_command_does_not_hold_up_the_next_one(monkeypatch):
+    async def handle_command(command_data, state, emit=None, metrics=None):
+        request_id = command_data["id"]
+        await asyncio.sleep(0.05 if request_id == "slow" else 0)
+        return {"id": request_id, "success": True}
+
+    monkeypatch.setattr(twikit_service, 'handle_command', handle_command)
+
+    async def scenario():
+        state, out_queue = make_state(), asyncio.Queue()
+        await asyncio.gather(*(twikit_service.run_command(json.dumps(command(request_id)), state, out_queue)
+                               for request_id in ("slow", "fast")))
+        return [out_queue.get_nowait()["id"] for _ in range(out_queue.qsize())]
+
+    assert run(scenario()) == ["fast", "slow"]
+
+
+def test_concurrency_is_bounded_by_the_scheduler(monkeypatch):
+    running = peak = 0
+
+    async def handle_command(command_data, state, emit=None, metrics=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"id": command_data["id"], "success": True}
+
+    monkeypatch.setattr(twikit_service, 'handle_command', handle_command)
+
+    async def scenario():
+        state, out_queue = make_state(concurrency=2), asyncio.Queue()
+        await asyncio.gather(*(twikit_service.run_command(json.dumps(command(i)), state, out_queue)
+                               for i in range(6)))
+        return out_queue.qsize()
+
+    assert run(scenario()) == 6
+    assert peak == 2
+
+
+def test_replies_carry_the_request_id():
+    async def scenario():
+        state = make_state()
+        good = await twikit_service.handle_command(command("a"), state)
+        unknown = await twikit_service.handle_command(command("b", action='nope'), state)
+        out_queue = asyncio.Queue()
+        await twikit_service.run_command("{not json", state, out_queue)
+        return good, unknown, out_queue.get_nowait()
+
+    good, unknown, invalid = run(scenario())
+    assert good == {"id": "a", "success": True, "data": "GET /i/api/1.1/a.json"}
+    assert unknown == {"id": "b", "success": False, "error": "Unknown action 'nope'"}
+    assert invalid["success"] is False and invalid["error"].startswith("Invalid JSON command")
+
+
+def test_writer_emits_one_line_per_reply(capsys):
+    async def scenario():
+        out_queue = asyncio.Queue()
+        writer = asyncio.ensure_future(twikit_service.stdout_writer(out_queue))
+        for reply in ({"id": 1, "success": True}, {"id": 2, "success": False, "error": "x"}, None):
+            await out_queue.put(reply)
+        await writer
+
+    run(scenario())
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+
+def test_batch_reports_each_item_on_its_own():
+    batch = {"id": "batch", "action": "get_transaction_ids", "args": {"items": [
+        {"method": "GET", "url": "https://x.com/i/api/graphql/abc/UserByScreenName?variables=%7B%7D"},
+        {"method": "POST"},
+        {"method": "POST", "url": "https://x.com/i/api/1.1/b.json"},
+    ]}}
+    reply = run(twikit_service.handle_command(batch, make_state()))
+    assert reply["success"] is True
+    assert reply["data"] == [
+        {"success": True, "data": "GET /i/api/graphql/abc/UserByScreenName"},
+        {"success": False, "error": "Missing 'url' or 'method' for get_transaction_id action"},
+        {"success": True, "data": "POST /i/api/1.1/b.json"},
+    ]
+
+
+def test_batch_needs_an_items_list():
+    batch = {"id": "batch", "action": "get_transaction_ids", "args": {"items": "GET /"}}
+    reply = run(twikit_service.handle_command(batch, make_state()))
+    assert reply == {"id": "batch", "success": False,
+                     "error": "Missing 'items' list for get_transaction_ids action"}
+
+
+def test_importing_the_service_leaves_heavy_modules_alone():
+    script = ("import sys, twikit_service; "
+              "print(','.join(name for name in twikit_service.HEAVY_MODULES if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", script], cwd=BRIDGE_DIR, capture_output=True, text=True,
+                            check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_transaction_ids_wait_for_the_background_generator(monkeypatch):
+    release = threading.Event()
+
+    def load_transaction_engine(home_path, ondemand_path, cache_file):
+        release.wait(5)
+        return StubGenerator()
+
+    monkeypatch.setattr(twikit_service, 'load_transaction_engine', load_transaction_engine)
+
+    async def scenario():
+        account = twikit_service.AccountState('a', StubStore(), twikit_service.StartupReport())
+        state = twikit_service.BridgeState([account], account.startup_report, ResponseCache(), LaneScheduler(1),
+                                           UserIndex(None), LocalStore(None))
+        account.start_transaction_generator()
+        pending = asyncio.ensure_future(twikit_service.handle_command(command("a"), state))
+        report = await twikit_service.handle_command({"id": "r", "action": "get_startup_report"}, state)
+        waiting = not pending.done()
+        release.set()
+        return waiting, report, await pending, state.startup_report.phases
+
+    waiting, report, reply, phases = run(scenario())
+    # The startup report is answered while the generator is still being built
+    assert waiting and report["success"] is True
+    assert "transaction_generator" not in report["data"]["phases_ms"]
+    assert reply["data"] == "GET /i/api/1.1/a.json"
+    assert "transaction_generator" in phases
+
+
+def test_rebuilt_generator_is_swapped_in_after_the_build(monkeypatch):
+    generators = iter([StubGenerator(), StubGenerator()])
+    monkeypatch.setattr(twikit_service, 'load_transaction_engine', lambda *args: next(generators))
+
+    async def scenario():
+        state = twikit_service.AccountState('a', StubStore(), twikit_service.StartupReport())
+        state.start_transaction_generator()
+        first = await state.get_transaction_generator()
+        state.refresh_transaction_generator()
+        during = await state.get_transaction_generator()
+        await state._refresh_task
+        return first, during, await state.get_transaction_generator()
+
+    first, during, after = run(scenario())
+    assert during is first
+    assert after is not first
+
+
+def test_reads_go_to_the_least_loaded_account_and_writes_to_the_named_one(monkeypatch):
+    async def action(client, args):
+        return client.name
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_tweet_by_id', action)
+    monkeypatch.setitem(twikit_service.ACTIONS, 'create_tweet', action)
+
+    async def scenario():
+        first, second = StubAccount('first'), StubAccount('second')
+        state = make_state(first, second)
+        first.in_flight = 1
+        read = await twikit_service.handle_command(command("r", 'get_tweet_by_id', id="1"), state)
+        write = await twikit_service.handle_command(command("w", 'create_tweet', text="hi"), state)
+        named = await twikit_service.handle_command(command("n", 'create_tweet', text="hi", account='second'), state)
+        unknown = await twikit_service.handle_command(command("u", 'create_tweet', text="hi", account='third'), state)
+        return read, write, named, unknown
+
+    read, write, named, unknown = run(scenario())
+    assert (read["data"], read["account"]) == ("second", "second")
+    assert write["data"] == "first"
+    assert named["data"] == "second"
+    assert unknown == {"id": "u", "success": False, "error": "Unknown account 'third'"}
+
+
+def test_failing_account_is_skipped_for_reads_until_it_cools_down(monkeypatch):
+    monkeypatch.setattr(twikit_service, 'ACCOUNT_MAX_CONSECUTIVE_ERRORS', 2)
+
+    async def action(client, args):
+        if args.get('bad'):
+            raise ValueError("Missing 'id' in args")
+        if client.name == 'broken':
+            raise RuntimeError("403")
+        return client.name
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_tweet_by_id', action)
+
+    async def scenario():
+        broken, healthy = StubAccount('broken'), StubAccount('healthy')
+        state = make_state(broken, healthy)
+        # Bad arguments are the caller's fault, not the account's
+        for _ in range(3):
+            await twikit_service.handle_command(command("v", 'get_tweet_by_id', bad=True, account='broken'), state)
+        still_healthy = broken.is_healthy()
+        for _ in range(2):
+            await twikit_service.handle_command(command("e", 'get_tweet_by_id', id="1", account='broken'), state)
+        replies = [await twikit_service.handle_command(command(i, 'get_tweet_by_id', id="1"), state)
+                   for i in range(3)]
+        return still_healthy, broken, replies
+
+    still_healthy, broken, replies = run(scenario())
+    assert still_healthy
+    assert not broken.is_healthy()
+    assert broken.stats()["errors"] == 2
+    assert [reply["data"] for reply in replies] == ["healthy"] * 3
+
+
+def test_parse_account_dirs():
+    assert twikit_service.parse_account_dirs('', './data') == [('default', './data')]
+    assert twikit_service.parse_account_dirs('main=/srv/a, /srv/backup/', './data') == \
+        [('main', '/srv/a'), ('backup', '/srv/backup/')]
+    with pytest.raises(ValueError):
+        twikit_service.parse_account_dirs('a=/x,a=/y', './data')
+
+
+def test_reads_are_cached_until_a_write_makes_them_stale(monkeypatch):
+    calls = []
+
+    async def action(client, args):
+        calls.append(args)
+        return {"id": args.get('id') or args.get('tweet_id'), "calls": len(calls)}
+
+    for name in ('get_tweet_by_id', 'favorite_tweet'):
+        monkeypatch.setitem(twikit_service.ACTIONS, name, action)
+
+    async def scenario():
+        state = make_state()
+        replies = [await twikit_service.handle_command(command(i, 'get_tweet_by_id', id="1"), state) for i in range(2)]
+        replies.append(await twikit_service.handle_command(command(2, 'get_tweet_by_id', id="1", cache=False), state))
+        await twikit_service.handle_command(command(3, 'favorite_tweet', tweet_id="1"), state)
+        replies.append(await twikit_service.handle_command(command(4, 'get_tweet_by_id', id="1"), state))
+        return replies
+
+    replies = run(scenario())
+    assert [reply["meta"].get("cache") for reply in replies] == ["miss", "hit", None, "miss"]
+    assert [reply["data"]["calls"] for reply in replies] == [1, 1, 2, 4]
+
+
+
+def test_a_write_on_one_worker_invalidates_the_others(monkeypatch):
+    async def action(client, args):
+        return {"id": args.get('id') or args.get('tweet_id')}
+
+    for name in ('get_tweet_by_id', 'favorite_tweet'):
+        monkeypatch.setitem(twikit_service.ACTIONS, name, action)
+
+    async def scenario():
+        writer, reader = make_state(), make_state()
+        await twikit_service.handle_command(command(1, 'get_tweet_by_id', id="1"), reader)
+        write = await twikit_service.handle_command(command(2, 'favorite_tweet', tweet_id="1"), writer)
+        # What TwikitBridgeClient forwards to every other worker
+        forwarded = await twikit_service.handle_command(
+            command(3, 'invalidate_cache', tags=write["meta"]["invalidated"]), reader)
+        read = await twikit_service.handle_command(command(4, 'get_tweet_by_id', id="1"), reader)
+        return write, forwarded, read
+
+    write, forwarded, read = run(scenario())
+    assert "tweet:1" in write["meta"]["invalidated"]
+    assert forwarded["data"] == {"removed": 1}
+    assert read["meta"]["cache"] == "miss"
+
+
+def test_control_commands_skip_the_concurrency_limit(monkeypatch):
+    async def scenario():
+        state, out_queue = make_state(concurrency=1), asyncio.Queue()
+        async with state.scheduler.slot('interactive'):
+            # Answered even though every slot is taken
+            await asyncio.wait_for(twikit_service.run_command(json.dumps(command("p", 'ping')), state, out_queue), 1)
+        return out_queue.get_nowait()
+
+    assert run(scenario())["id"] == "p"
+
+
+PAGES = {None: (["1", "2", "3"], "c1"), "c1": ([], "c2"), "c2": (["4", "5"], "c3"), "c3": (["6"], None)}
+
+
+def iterate(monkeypatch, pages=PAGES, **args):
+    async def action(client, args):
+        ids, next_cursor = pages[args.get('cursor')]
+        return {"items": [{"id": item} for item in ids], "next_cursor": next_cursor}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_user_followers', action)
+
+    async def scenario():
+        frames = []
+
+        async def emit(frame):
+            frames.append(frame)
+
+        end = await twikit_service.handle_command({"id": "it", "action": "get_user_followers", "mode": "iterate",
+                                                   "args": {"user_id": "42", **args}}, make_state(), emit)
+        return frames, end
+
+    frames, end = run(scenario())
+    return [[item["id"] for item in frame["data"]["items"]] for frame in frames], frames, end["data"]
+
+
+def test_iterate_walks_past_empty_pages(monkeypatch):
+    pages, frames, end = iterate(monkeypatch)
+    assert pages == [["1", "2", "3"], ["4", "5"], ["6"]]
+    assert [frame["data"]["resume"] for frame in frames] == [{"cursor": "c1", "skip": 0},
+                                                             {"cursor": "c3", "skip": 0}, None]
+    assert end == {"pages": 3, "items": 6, "next_cursor": None, "resume": None}
+
+
+def test_resuming_a_cut_short_walk_repeats_and_loses_nothing(monkeypatch):
+    delivered = []
+    resume = {"cursor": None, "skip": 0}
+    for _ in range(10):
+        pages, frames, end = iterate(monkeypatch, max_items=2, **resume)
+        delivered += [item for page in pages for item in page]
+        resume = end["resume"]
+        if resume is None:
+            break
+    assert delivered == ["1", "2", "3", "4", "5", "6"]
+
+
+def test_first_page_cut_short_reports_its_cursor(monkeypatch):
+    pages, frames, end = iterate(monkeypatch, max_items=2)
+    assert pages == [["1", "2"]]
+    assert frames[0]["data"]["next_cursor"] == "c1"
+    assert end == {"pages": 1, "items": 2, "next_cursor": "c1", "resume": {"cursor": None, "skip": 2}}
+
+
+def test_iterate_stops_when_the_cursor_does_not_advance(monkeypatch):
+    pages, frames, end = iterate(monkeypatch, pages={None: (["1"], "c1"), "c1": (["2"], "c1")})
+    assert pages == [["1"], ["2"]]
+    assert end["resume"] is None
+
+
+def test_iterate_honours_max_pages(monkeypatch):
+    pages, frames, end = iterate(monkeypatch, max_pages=2)
+    # The empty page counts towards the cap
+    assert pages == [["1", "2", "3"]]
+    assert end["resume"] == {"cursor": "c2", "skip": 0}
+
+
+def test_iterate_projects_every_page(monkeypatch):
+    pages, frames, end = iterate(monkeypatch, fields=["id"], max_pages=1)
+    assert frames[0]["data"]["items"] == [{"id": "1"}, {"id": "2"}, {"id": "3"}]
+
+
+def test_fields_project_a_single_reply(monkeypatch):
+    async def action(client, args):
+        return {"id": args['id'], "text": "hi", "user": {"screen_name": "x", "name": "X"}}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_tweet_by_id', action)
+    reply = run(twikit_service.handle_command(
+        command(1, 'get_tweet_by_id', id="1", fields=["id", "user.screen_name"]), make_state()))
+    assert reply["data"] == {"id": "1", "user": {"screen_name": "x"}}
+
+
+def run_lines(state, *lines, settle=0.2):
+    async def scenario():
+        out_queue = asyncio.Queue()
+        tasks = []
+        for line in lines:
+            tasks.append(asyncio.ensure_future(twikit_service.run_command(json.dumps(line), state, out_queue)))
+            await asyncio.sleep(0)
+        await asyncio.wait(tasks, timeout=settle)
+        return [out_queue.get_nowait() for _ in range(out_queue.qsize())]
+
+    return run(scenario())
+
+
+def deadline_in(seconds):
+    return (time.time() + seconds) * 1000
+
+
+def test_command_past_its_deadline_is_answered_with_an_error(monkeypatch):
+    async def action(client, args):
+        await asyncio.sleep(1)
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_tweet_by_id', action)
+    state = make_state()
+    replies = run_lines(state, {**command("slow", 'get_tweet_by_id', id="1"), "deadline": deadline_in(0.05)})
+    assert replies == [{"id": "slow", "success": False, "error": "Deadline exceeded for action 'get_tweet_by_id'"}]
+    assert state.deadline_exceeded == 1
+
+
+def test_cancelled_command_gets_no_reply(monkeypatch):
+    async def action(client, args):
+        await asyncio.sleep(1)
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_tweet_by_id', action)
+    state = make_state()
+    replies = run_lines(state, command("slow", 'get_tweet_by_id', id="1"), command("c", 'cancel', id="slow"))
+    assert replies == [{"id": "c", "success": True, "data": {"id": "slow", "cancelled": True}}]
+    assert state.cancelled == 1
+
+
+def test_iterate_deadline_covers_each_frame_and_reaches_the_rate_limiter(monkeypatch):
+    deadlines = []
+
+    async def action(client, args):
+        deadlines.append(current_metrics.get().deadline)
+        await asyncio.sleep(0.06)
+        cursor = int(args.get('cursor') or 0)
+        return {"items": [{"id": str(cursor)}], "next_cursor": str(cursor + 1) if cursor < 3 else None}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_user_followers', action)
+    # Four pages take longer than the budget, but each one arrives within it
+    replies = run_lines(make_state(), {"id": "it", "action": "get_user_followers", "mode": "iterate",
+                                       "args": {"user_id": "42"}, "deadline": deadline_in(0.1)}, settle=1)
+    assert [reply.get("stream") for reply in replies] == ["page"] * 4 + ["end"]
+    assert all(deadline is not None for deadline in deadlines)
+    assert deadlines == sorted(deadlines) and deadlines[-1] > deadlines[0]
+
+
+def test_unknown_priority_is_rejected_before_scheduling():
+    replies = run_lines(make_state(), {**command("p"), "priority": "urgent"})
+    assert replies[0]["id"] == "p" and replies[0]["error"].startswith("Invalid command: Unknown priority 'urgent'")
+
+
+def test_full_lane_answers_overloaded(monkeypatch):
+    async def action(client, args):
+        await asyncio.sleep(0.1)
+        return {"items": [], "next_cursor": None}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_user_followers', action)
+    state = make_state()
+    state.scheduler = LaneScheduler(1, queue_limits={'interactive': 1, 'default': 1, 'background': 1})
+    walks = [{"id": i, "action": "get_user_followers", "mode": "iterate", "args": {"user_id": str(i)}}
+             for i in range(3)]
+    replies = run_lines(state, *walks, settle=1)
+    overloaded = [reply for reply in replies if reply.get("overloaded")]
+    assert [(reply["id"], reply["lane"]) for reply in overloaded] == [(2, "background")]
+
+
+def bulk(monkeypatch, action, parallelism=1, deadline=None, **args):
+    async def scenario():
+        frames = []
+
+        async def emit(frame):
+            frames.append(frame)
+
+        command_data = {"id": "bulk", "action": "bulk_favorite", "args": {"parallelism": parallelism, **args}}
+        metrics = twikit_service.RequestMetrics(deadline)
+        end = await twikit_service.handle_command(command_data, make_state(), emit, metrics)
+        return frames, end
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'favorite_tweet', action)
+    return run(scenario())
+
+
+def test_bulk_reports_every_item_and_keeps_going_past_failures(monkeypatch):
+    async def action(client, args):
+        if args['tweet_id'] == "2":
+            raise RuntimeError("not found")
+        return {"favorited": True}
+
+    frames, end = bulk(monkeypatch, action, tweet_ids=["1", "2", "3", "1"])
+    assert [(frame["done"], frame["item"]["id"]) for frame in frames] == [(1, "1"), (2, "2"), (3, "3")]
+    assert (end["data"]["total"], end["data"]["succeeded"], end["data"]["failed"]) == (3, 2, 1)
+    assert end["data"]["results"][1] == {"id": "2", "success": False, "error": "not found"}
+    # What TwikitBridgeClient forwards to the other workers
+    assert end["meta"]["invalidated"] == ["favorites", "tweet:1", "tweet:3"]
+
+
+def test_bulk_skips_the_rest_once_the_rate_limit_is_out_of_reach(monkeypatch):
+    async def action(client, args):
+        if args['tweet_id'] == "2":
+            raise twikit_service.RateLimitExceeded("FavoriteTweet: rate limit exhausted for 900s")
+        return {"favorited": True}
+
+    frames, end = bulk(monkeypatch, action, tweet_ids=["1", "2", "3", "4"])
+    assert (end["data"]["succeeded"], end["data"]["failed"], end["data"]["skipped"]) == (1, 1, 2)
+    assert all(result.get("skipped") for result in end["data"]["results"][2:])
+
+
+def test_bulk_items_run_under_the_command_deadline(monkeypatch):
+    deadlines = []
+
+    async def action(client, args):
+        deadlines.append(current_metrics.get().deadline)
+        return {"favorited": True}
+
+    deadline = time.time() + 30
+    bulk(monkeypatch, action, parallelism=2, deadline=deadline, tweet_ids=["1", "2"])
+    assert deadlines == [deadline, deadline]
+
+
+def test_screen_names_resolve_from_the_index_then_upstream(monkeypatch, tmp_path):
+    calls, deadlines = [], []
+
+    async def action(client, args):
+        calls.append(args['screen_name'])
+        deadlines.append(current_metrics.get().deadline)
+        if args['screen_name'] == "gone":
+            raise RuntimeError("User not found")
+        return {"id": f"id-{args['screen_name']}", "screen_name": args['screen_name'], "name": "N"}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_user_by_screen_name', action)
+
+    async def scenario():
+        state = make_state(user_index=UserIndex(str(tmp_path / "users.jsonl")))
+        deadline = time.time() + 30
+        first = await twikit_service.handle_command(
+            {**command(1, 'resolve_screen_names', screen_names=["@alice", "bob", "gone", "alice"]),
+             "deadline": deadline * 1000}, state)
+        # Lookups of ids alone are answered by the index
+        indexed = await twikit_service.handle_command(
+            command(2, 'get_user_by_screen_name', screen_name="alice", fields=["id"]), state)
+        second = await twikit_service.handle_command(
+            command(3, 'resolve_screen_names', screen_names=["alice", "bob"]), state)
+        return first, indexed, second, deadline
+
+    first, indexed, second, deadline = run(scenario())
+    assert sorted(calls) == ["alice", "bob", "gone"]
+    assert deadlines == [pytest.approx(deadline)] * 3
+    assert first["data"]["users"]["alice"]["id"] == "id-alice"
+    assert first["data"]["errors"] == {"gone": "User not found"}
+    assert (first["data"]["index_hits"], first["data"]["lookups"]) == (0, 3)
+    assert indexed["data"] == {"id": "id-alice"} and indexed["meta"] == {"index": "hit"}
+    assert (second["data"]["index_hits"], second["data"]["lookups"]) == (2, 0)
+
+
+def test_fetched_tweets_are_searchable_locally_without_the_upstream(monkeypatch):
+    async def action(client, args):
+        return {"items": [{"id": "1700000000000000000", "text": "kept for offline search",
+                           "user": {"id": "10", "screen_name": "alice"}}]}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'search_tweet', action)
+
+    async def scenario():
+        state = make_state()
+        await twikit_service.handle_command(command(1, 'search_tweet', query="offline"), state)
+        found = await twikit_service.handle_command(command(2, 'local_search', query="offline"), state)
+        thread = await state.in_store_thread(threading.current_thread)
+        return found, thread, state
+
+    found, thread, state = run(scenario())
+    assert [item["text"] for item in found["data"]["items"]] == ["kept for offline search"]
+    assert thread.name.startswith("bridge-store")
+    state.local_store.close()
+
+
+def test_sync_returns_only_what_is_newer_than_the_last_sync(monkeypatch):
+    timeline = {None: (["90", "80"], "c1"), "c1": (["70", "60"], "c2"), "c2": (["50"], None)}
+    calls = []
+
+    async def action(client, args):
+        calls.append((args.get('cursor'), args.get('cache')))
+        ids, next_cursor = timeline[args.get('cursor')]
+        return {"items": [{"id": item} for item in ids], "next_cursor": next_cursor}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'get_user_tweets', action)
+
+    async def sync(state, request_id, **args):
+        return await twikit_service.handle_command(
+            {**command(request_id, 'get_user_tweets', user_id="10", **args), "mode": "sync"}, state)
+
+    async def scenario():
+        state = make_state()
+        first = await sync(state, 1)
+        timeline[None] = (["110", "100"], "c0")
+        timeline["c0"] = (["90", "80"], "c1")
+        second = await sync(state, 2)
+        other = await sync(state, 3, subscriber="other")
+        unchanged = await sync(state, 4)
+        return first, second, other, unchanged
+
+    first, second, other, unchanged = run(scenario())
+    assert first["data"]["first_sync"] and first["data"]["high_water"] == "90" and first["data"]["pages"] == 1
+    # The walk stops at the page reaching the mark, and never reads from the cache
+    assert [item["id"] for item in second["data"]["items"]] == ["110", "100"]
+    assert (second["data"]["pages"], second["data"]["complete"]) == (2, True)
+    assert second["data"]["previous_high_water"] == "90"
+    assert other["data"]["first_sync"]
+    assert unchanged["data"]["new_items"] == 0 and unchanged["data"]["high_water"] == "110"
+    assert all(cache is False for _, cache in calls)
+
+
+def test_sync_runs_under_the_command_deadline(monkeypatch):
+    deadlines = []
+
+    async def action(client, args):
+        deadlines.append(current_metrics.get().deadline)
+        return {"items": [{"id": "1"}], "next_cursor": None}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'search_tweet', action)
+    deadline = time.time() + 30
+    reply = run(twikit_service.handle_command(
+        {**command(1, 'search_tweet', query="q", search_type="Latest"), "mode": "sync", "deadline": deadline * 1000},
+        make_state()))
+    assert reply["success"] and deadlines == [pytest.approx(deadline)]
+
+
+def test_sync_needs_a_newest_first_search():
+    reply = run(twikit_service.handle_command(
+        {**command(1, 'search_tweet', query="q", search_type="Top"), "mode": "sync"}, make_state()))
+    assert not reply["success"] and "Latest" in reply["error"]
+
+
+def test_hashtag_analytics_streams_progress_under_a_per_frame_deadline(monkeypatch):
+    deadlines, queries = [], []
+
+    async def action(client, args):
+        deadlines.append(current_metrics.get().deadline)
+        queries.append((args['query'], args['search_type'], args['cache']))
+        await asyncio.sleep(0.06)
+        cursor = int(args.get('cursor') or 0)
+        return {"items": [{"id": str(1700000000000000000 - cursor), "text": "#python",
+                           "user": {"screen_name": "alice"}}],
+                "next_cursor": str(cursor + 1) if cursor < 3 else None}
+
+    monkeypatch.setitem(twikit_service.ACTIONS, 'search_tweet', action)
+    # Four pages take longer than the budget, but each one arrives within it
+    replies = run_lines(make_state(), {"id": "h", "action": "hashtag_analytics", "args": {"hashtag": "python"},
+                                       "deadline": deadline_in(0.1)}, settle=1)
+    assert [reply.get("stream") for reply in replies] == ["progress"] * 4 + ["end"]
+    assert replies[-1]["data"]["tweets"] == 4 and replies[-1]["data"]["complete"]
+    assert queries[0] == ("#python", "Latest", False)
+    assert all(deadline is not None for deadline in deadlines)
+    assert deadlines == sorted(deadlines) and deadlines[-1] > deadlines[0]
@@ -0,0 +1,58 @@
+import json
+import time
+
+import user_index
+from user_index import UserIndex, collect_users
+
+
+def test_collect_users_finds_authors_and_pages():
+    data = {"items": [{"id": "1", "text": "hi", "user": {"id": "10", "screen_name": "alice"}},
+                      {"id": "11", "screen_name": "bob"}]}
+    assert sorted(user["screen_name"] for user in collect_users(data)) == ["alice", "bob"]
+
+
+def test_lookup_is_case_insensitive_and_keeps_indexed_fields(tmp_path):
+    index = UserIndex(str(tmp_path / "index.jsonl"))
+    index.record({"id": 10, "screen_name": "Alice", "name": "Alice A", "description": "not indexed"})
+    entry = index.lookup("@alice")
+    assert entry["id"] == "10" and entry["name"] == "Alice A"
+    assert "description" not in entry
+    assert index.lookup("nobody") is None
+    assert (index.hits, index.misses) == (1, 1)
+
+
+def test_entries_survive_restart_and_reach_other_instances(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    writer = UserIndex(path)
+    reader = UserIndex(path)
+    writer.record({"id": "10", "screen_name": "alice"})
+    # A miss re-reads what other processes appended since
+    assert reader.lookup("alice")["id"] == "10"
+    assert UserIndex(path).lookup("alice")["id"] == "10"
+
+
+def test_stale_entries_miss(tmp_path):
+    index = UserIndex(str(tmp_path / "index.jsonl"), max_age=60)
+    index.record({"id": "10", "screen_name": "alice"})
+    index._by_name["alice"]["updated_at"] = time.time() - 120
+    assert index.lookup("alice") is None
+    assert index.stale == 1
+
+
+def test_unchanged_users_are_not_rewritten(tmp_path):
+    path = tmp_path / "index.jsonl"
+    index = UserIndex(str(path))
+    for _ in range(3):
+        index.record({"id": "10", "screen_name": "alice", "name": "Alice"})
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_file_is_compacted_to_live_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_index, "COMPACT_MIN_LINES", 10)
+    path = tmp_path / "index.jsonl"
+    index = UserIndex(str(path))
+    for count in range(30):
+        index.record({"id": "10", "screen_name": "alice", "followers_count": count})
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) < 30
+    assert UserIndex(str(path)).lookup("alice")["followers_count"] == 29
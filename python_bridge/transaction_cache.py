@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from artifact_scan import derive_transaction_state
+from transaction_engine import TransactionEngine
+
+# Bump when the layout of the cached state changes
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILENAME = "twitter_transaction_state.json"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _generator_version() -> str:
+    """Installed x_client_transaction version, read without importing it."""
+    try:
+        from importlib.metadata import version
+        return version("XClientTransaction")
+    except Exception:
+        return "unknown"
+
+
+def read_cached_state(cache_path: Path, home_hash: str, ondemand_hash: str):
+    """Return the cached derived state if it matches the artifact hashes, else None."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (cached.get("version") != CACHE_VERSION
+            or cached.get("home_sha256") != home_hash
+            or cached.get("ondemand_sha256") != ondemand_hash
+            or cached.get("generator_version") != _generator_version()):
+        return None
+    state = cached.get("state")
+    if not isinstance(state, dict) or not state.get("key") or not state.get("animation_key"):
+        return None
+    return state
+
+
+def write_cached_state(cache_path: Path, home_hash: str, ondemand_hash: str, state: dict) -> None:
+    """Atomically replace the cache file with the given derived state."""
+    payload = {
+        "version": CACHE_VERSION,
+        "generator_version": _generator_version(),
+        "home_sha256": home_hash,
+        "ondemand_sha256": ondemand_hash,
+        "state": state,
+    }
+    # Per-process temp name: several bridge workers may rewrite the cache at once
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, cache_path)
+
+
+def load_transaction_engine(home_path, ondemand_path, cache_path=None) -> TransactionEngine:
+    """
+    Build a TransactionEngine for the given artifacts, using the on-disk cache
+    of derived state when both artifact hashes match and falling back to a full
+    scan of the artifacts (and refreshing the cache) on a miss.
+    """
+    home_path = Path(home_path)
+    ondemand_path = Path(ondemand_path)
+    cache_path = Path(cache_path) if cache_path else home_path.parent / DEFAULT_CACHE_FILENAME
+
+    home_hash = _file_sha256(home_path)
+    ondemand_hash = _file_sha256(ondemand_path)
+
+    state = read_cached_state(cache_path, home_hash, ondemand_hash)
+    if state is not None:
+        sys.stderr.write(f"Loaded transaction generator state from cache {cache_path}.\n")
+        return TransactionEngine(**state)
+
+    sys.stderr.write("Transaction generator cache miss; scanning home/ondemand artifacts.\n")
+    state = derive_transaction_state(home_path, ondemand_path)
+    try:
+        write_cached_state(cache_path, home_hash, ondemand_hash, state)
+    except OSError as e:
+        sys.stderr.write(f"Could not write transaction generator cache {cache_path}: {str(e)}\n")
+    return TransactionEngine(**state)
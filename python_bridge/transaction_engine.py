@@ -0,0 +1,74 @@
+import base64
+import hashlib
+import math
+import random
+import time
+
+
+class TransactionEngine:
+    """
+    Precomputed x-client-transaction-id generator.
+
+    x_client_transaction.ClientTransaction re-derives the key bytes and rebuilds
+    every intermediate list on each call. For a given home/ondemand artifact set
+    only the timestamp and the method+path hash change between IDs, so this
+    engine derives everything else once and per call does a SHA-256 plus a
+    table-driven XOR. Output is byte-identical to ClientTransaction for the same
+    time_now and random byte.
+    """
+
+    ADDITIONAL_RANDOM_NUMBER = 3
+    DEFAULT_KEYWORD = "obfiowerehiring"
+    EPOCH_OFFSET = 1682924400
+
+    # XOR_TABLES[r] maps every byte b to b ^ r, usable with bytes.translate()
+    XOR_TABLES = [bytes(b ^ r for b in range(256)) for r in range(256)]
+
+    def __init__(self, key: str, animation_key: str, row_index: int = None, key_bytes_indices=None):
+        """
+        Args:
+            key: Content of the twitter-site-verification meta tag
+            animation_key: Animation key derived from the home page SVG frames
+            row_index: Row index read from ondemand.s (kept for reference/caching)
+            key_bytes_indices: Key byte indices read from ondemand.s (kept for reference/caching)
+        """
+        self.key = key
+        self.animation_key = animation_key
+        self.row_index = row_index
+        self.key_bytes_indices = list(key_bytes_indices) if key_bytes_indices is not None else None
+        self.key_bytes = base64.b64decode(bytes(key, 'utf-8'))
+
+        self._hash_suffix = f"{self.DEFAULT_KEYWORD}{animation_key}"
+        # The random byte followed by the key bytes XOR-ed with it is constant
+        # for each of the 256 possible random values.
+        self._prefixes = [bytes([r]) + self.key_bytes.translate(table)
+                          for r, table in enumerate(self.XOR_TABLES)]
+
+    @classmethod
+    def from_client_transaction(cls, client_transaction) -> "TransactionEngine":
+        """Build an engine from an initialised x_client_transaction.ClientTransaction."""
+        # 1.x reads the indices from ondemand.s into row_index/key_bytes_indices;
+        # 0.0.x only had the DEFAULT_* class constants.
+        row_index = getattr(client_transaction, "row_index", None)
+        if row_index is None:
+            row_index = client_transaction.DEFAULT_ROW_INDEX
+        key_bytes_indices = getattr(client_transaction, "key_bytes_indices", None)
+        if key_bytes_indices is None:
+            key_bytes_indices = client_transaction.DEFAULT_KEY_BYTES_INDICES
+        return cls(
+            key=client_transaction.key,
+            animation_key=client_transaction.animation_key,
+            row_index=row_index,
+            key_bytes_indices=key_bytes_indices,
+        )
+
+    def generate_transaction_id(self, method: str, path: str, time_now: int = None, random_num: int = None) -> str:
+        """Generate an x-client-transaction-id for the given method and path."""
+        if time_now is None:
+            time_now = math.floor((time.time() * 1000 - self.EPOCH_OFFSET * 1000) / 1000)
+        hash_val = hashlib.sha256(f"{method}!{path}!{time_now}{self._hash_suffix}".encode()).digest()
+        if random_num is None:
+            random_num = random.randint(0, 255)
+        tail = (time_now & 0xFFFFFFFF).to_bytes(4, 'little') + hash_val[:16] + bytes([self.ADDITIONAL_RANDOM_NUMBER])
+        out = self._prefixes[random_num] + tail.translate(self.XOR_TABLES[random_num])
+        return base64.b64encode(out).decode().strip("=")
@@ -0,0 +1,430 @@
+"""
+twikit-backed actions for the bridge service.
+
+All actions share one long-lived twikit.Client, so its httpx connection pool
+(and the TLS sessions in it) is reused across commands. Instead of patching
+twikit's ClientTransaction prototype the way post_tweet_with_playwright_session.py
+does, the client gets an adapter that produces x-client-transaction-id values
+with our TransactionEngine, and its http.request is wrapped to inject the
+common headers of the current session store snapshot and to pace requests
+through the account's RateLimiter. Cookies live in the client's jar, loaded
+from the store on each new generation, so the ones the server rotates during
+the session (ct0 among them) are kept.
+
+twikit is imported lazily so the service can report 'ready' without it.
+"""
+from collections import namedtuple
+from typing import Any, Dict
+
+from media_upload import upload_file
+
+# Headers twikit sets per request that the session's captured headers must not replace
+TWIKIT_HEADERS = frozenset({'content-type', 'x-client-transaction-id'})
+
+# Captured headers that duplicate what the client's cookie jar provides
+JAR_HEADERS = frozenset({'cookie', 'x-csrf-token'})
+
+
+class EngineTransaction:
+    """Stand-in for twikit's ClientTransaction backed by a TransactionEngine."""
+
+    def __init__(self):
+        self.engine = None
+        # twikit only calls init() while this is None
+        self.home_page_response = True
+
+    async def init(self, *args, **kwargs):
+        return
+
+    def generate_transaction_id(self, method, path, **kwargs):
+        return self.engine.generate_transaction_id(method=method, path=path)
+
+
+class SessionClient:
+    """One twikit.Client kept in sync with the session store."""
+
+    def __init__(self, store, rate_limiter):
+        from twikit import Client
+
+        self.store = store
+        self.rate_limiter = rate_limiter
+        self.client = Client('en-US')
+        self.client.enable_ui_metrics = False
+        self.transaction = EngineTransaction()
+        self.client.client_transaction = self.transaction
+        self._original_request = self.client.http.request
+        self.client.http.request = self._request
+        self._snapshot = None
+        self._inject_headers: Dict[str, str] = {}
+        self.sync_session()
+
+    def sync_session(self):
+        """Pick up a new store generation (re-login) without rebuilding the client."""
+        snapshot = self.store.snapshot()
+        if snapshot is self._snapshot:
+            return
+        cookies = snapshot.cookies_dict
+        if not cookies.get('ct0'):
+            raise ValueError("'ct0' cookie not found in session store")
+        self.client.set_cookies(dict(cookies), clear_cookies=True)
+        # Captured cookie and CSRF headers would pin the login-time values over
+        # the jar's; both are derived from the jar per request instead
+        self._inject_headers = {key: value for key, value in snapshot.common_headers.items()
+                                if key.lower() not in JAR_HEADERS}
+        self._snapshot = snapshot
+
+    async def _request(self, method, url, **kwargs):
+        # Session headers win over twikit's defaults, except the request body
+        # type and the transaction ID twikit just generated through the engine.
+        # The CSRF token always matches the jar's current ct0.
+        overridden = {key.lower() for key in self._inject_headers} - TWIKIT_HEADERS
+        final_headers = {key: value for key, value in (kwargs.pop('headers', None) or {}).items()
+                         if key.lower() not in overridden}
+        present = {key.lower() for key in final_headers}
+        final_headers.update((key, value) for key, value in self._inject_headers.items() if key.lower() not in present)
+        ct0_token = self.client.http.cookies.get('ct0')
+        if ct0_token:
+            final_headers = {key: value for key, value in final_headers.items() if key.lower() != 'x-csrf-token'}
+            final_headers['x-csrf-token'] = ct0_token
+        if kwargs.get('files'):
+            # httpx sets the multipart content type with its boundary
+            final_headers = {key: value for key, value in final_headers.items() if key.lower() != 'content-type'}
+        kwargs['headers'] = final_headers
+        response = await self.rate_limiter.request(self._original_request, method, url, **kwargs)
+        self._keep_rotated_cookies(response)
+        return response
+
+    def _keep_rotated_cookies(self, response):
+        """
+        Let cookies a response sets replace the session's ones of the same name.
+        The jar would otherwise hold both (the stored ones have no domain, the
+        server's have), and twikit keeps the first ct0 it finds: the stale one.
+        """
+        rotated = {cookie.name: cookie.value for cookie in response.cookies.jar}
+        if not rotated:
+            return
+        jar = self.client.http.cookies
+        kept = {cookie.name: cookie.value for cookie in jar.jar if cookie.name not in rotated}
+        self.client.http.cookies = list({**kept, **rotated}.items())
+
+    async def prepare(self, account):
+        """Bind the current session and transaction generator before a call."""
+        self.sync_session()
+        self.transaction.engine = await account.get_transaction_generator()
+        return self.client
+
+    async def close(self):
+        await self.client.http.aclose()
+
+
+# --- Serialization ---
+
+MAX_DEPTH = 4
+
+# Stable output schema per twikit type: every field is always present (None
+# when twikit doesn't have it), whatever the twikit version puts on the object
+TWEET_FIELDS = (
+    'id', 'created_at', 'text', 'lang', 'user', 'in_reply_to', 'is_quote_status', 'quote',
+    'retweeted_tweet', 'reply_count', 'favorite_count', 'retweet_count', 'quote_count', 'view_count',
+    'bookmark_count', 'favorited', 'retweeted', 'bookmarked', 'hashtags', 'urls', 'media',
+    'possibly_sensitive',
+)
+USER_FIELDS = (
+    'id', 'created_at', 'name', 'screen_name', 'description', 'location', 'url', 'profile_image_url',
+    'profile_banner_url', 'is_blue_verified', 'verified', 'protected', 'followers_count',
+    'following_count', 'favourites_count', 'statuses_count', 'media_count', 'listed_count',
+    'following', 'followed_by', 'can_dm',
+)
+LIST_FIELDS = (
+    'id', 'created_at', 'name', 'description', 'mode', 'is_member', 'is_following', 'member_count',
+    'subscriber_count',
+)
+SCHEMAS = {'Tweet': TWEET_FIELDS, 'User': USER_FIELDS, 'List': LIST_FIELDS}
+
+
+def _field(value, name):
+    # Some twikit properties parse raw data lazily and raise on missing keys
+    try:
+        return getattr(value, name, None)
+    except Exception:
+        return None
+
+
+def to_plain(value: Any, depth: int = 0) -> Any:
+    """Convert twikit results (Tweet, User, List, Result, Response) to JSON-safe data."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if depth >= MAX_DEPTH:
+        return str(value)
+    if isinstance(value, dict):
+        return {str(key): to_plain(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_plain(item, depth + 1) for item in value]
+    if hasattr(value, 'next_cursor') and hasattr(value, '__iter__'):
+        # twikit.utils.Result: one page plus the cursor for the next one
+        return {"items": [to_plain(item, depth + 1) for item in value],
+                "next_cursor": value.next_cursor}
+    if hasattr(value, 'status_code') and hasattr(value, 'is_success'):
+        # Raw httpx.Response from endpoints that don't return an object
+        return {"success": value.is_success, "status_code": value.status_code}
+    schema = SCHEMAS.get(type(value).__name__)
+    if schema is not None:
+        return {name: to_plain(_field(value, name), depth + 1) for name in schema}
+    if hasattr(value, '__dict__'):
+        return {key: to_plain(item, depth + 1) for key, item in vars(value).items()
+                if not key.startswith('_') and not callable(item)}
+    return str(value)
+
+
+def parse_fields(fields):
+    """
+    Projection tree from a list of field names, dotted for nested objects:
+    ['id', 'user.screen_name'] -> {'id': None, 'user': {'screen_name': None}}
+    """
+    if not isinstance(fields, list) or not all(isinstance(field, str) and field for field in fields):
+        raise ValueError("'fields' must be a list of field names")
+    tree = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split('.')
+        for part in parents:
+            child = node.get(part)
+            if child is None:
+                child = node[part] = {}
+            node = child
+        node.setdefault(leaf, None)
+    return tree
+
+
+def project(data, tree):
+    """Keep only the fields in tree; applied per item for {items, next_cursor} pages and lists."""
+    if tree is None:
+        return data
+    if isinstance(data, list):
+        return [project(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if 'items' in data and 'next_cursor' in data and 'items' not in tree:
+        return {"items": project(data['items'], tree), "next_cursor": data['next_cursor']}
+    return {name: project(data.get(name), subtree) for name, subtree in tree.items()}
+
+
+def with_flag(response, **flags):
+    """Plain response for a state-changing call, with the resulting flags set on success."""
+    data = to_plain(response)
+    if not isinstance(data, dict):
+        data = {"result": data}
+    if data.get("success", True):
+        data.update(flags)
+    return data
+
+
+# --- Action handlers ---
+# Each takes (client, args) and returns JSON-safe data. Argument names follow
+# the ones TwikitBridgeClient sends.
+
+def require(args, *names):
+    missing = [name for name in names if args.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing {', '.join(repr(name) for name in missing)} in args")
+
+
+async def search_tweet(client, args):
+    require(args, 'query')
+    result = await client.search_tweet(args['query'], args.get('search_type') or 'Latest',
+                                       count=args.get('count') or 20, cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def get_user_by_screen_name(client, args):
+    require(args, 'screen_name')
+    return to_plain(await client.get_user_by_screen_name(args['screen_name'].lstrip('@')))
+
+
+async def get_user_tweets(client, args):
+    require(args, 'user_id')
+    result = await client.get_user_tweets(args['user_id'], args.get('type') or 'Tweets',
+                                          count=args.get('count') or 20, cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def get_user_favorites(client, args):
+    require(args, 'user_id')
+    result = await client.get_user_tweets(args['user_id'], 'Likes',
+                                          count=args.get('count') or 20, cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def create_tweet(client, args):
+    require(args, 'text')
+    poll_uri = None
+    poll = args.get('poll')
+    if poll:
+        # {'choices': [...], 'duration_minutes': n}
+        poll_uri = await client.create_poll(poll['choices'], poll.get('duration_minutes', 1440))
+    tweet = await client.create_tweet(text=args['text'], media_ids=args.get('media_ids'),
+                                      poll_uri=poll_uri, reply_to=args.get('reply_to'))
+    return to_plain(tweet)
+
+
+async def get_tweet_by_id(client, args):
+    require(args, 'id')
+    return to_plain(await client.get_tweet_by_id(args['id']))
+
+
+async def delete_tweet(client, args):
+    require(args, 'id')
+    return with_flag(await client.delete_tweet(args['id']), deleted=True)
+
+
+async def favorite_tweet(client, args):
+    require(args, 'tweet_id')
+    return with_flag(await client.favorite_tweet(args['tweet_id']), favorited=True)
+
+
+async def unfavorite_tweet(client, args):
+    require(args, 'tweet_id')
+    return with_flag(await client.unfavorite_tweet(args['tweet_id']), favorited=False)
+
+
+async def retweet(client, args):
+    require(args, 'tweet_id')
+    return with_flag(await client.retweet(args['tweet_id']), retweeted=True)
+
+
+async def delete_retweet(client, args):
+    require(args, 'tweet_id')
+    return with_flag(await client.delete_retweet(args['tweet_id']), retweeted=False)
+
+
+async def get_retweeters(client, args):
+    require(args, 'tweet_id')
+    result = await client.get_retweeters(args['tweet_id'], count=args.get('count') or 20,
+                                         cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def follow_user(client, args):
+    require(args, 'user_id')
+    await client.follow_user(args['user_id'])
+    return {"user_id": args['user_id'], "following": True}
+
+
+async def unfollow_user(client, args):
+    require(args, 'user_id')
+    await client.unfollow_user(args['user_id'])
+    return {"user_id": args['user_id'], "following": False}
+
+
+async def get_user_followers(client, args):
+    require(args, 'user_id')
+    result = await client.get_user_followers(args['user_id'], count=args.get('count') or 20,
+                                             cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def get_user_following(client, args):
+    require(args, 'user_id')
+    result = await client.get_user_following(args['user_id'], count=args.get('count') or 20,
+                                             cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def upload_media(client, args):
+    require(args, 'path')
+    return await upload_file(client, args['path'], media_type=args.get('media_type'),
+                             media_category=args.get('media_category'))
+
+
+async def create_list(client, args):
+    require(args, 'name')
+    result = await client.create_list(args['name'], description=args.get('description') or '',
+                                      is_private=args.get('mode') == 1)
+    return to_plain(result)
+
+
+async def add_list_member(client, args):
+    require(args, 'list_id', 'user_id')
+    await client.add_list_member(args['list_id'], args['user_id'])
+    return {"list_id": args['list_id'], "user_id": args['user_id'], "is_member": True}
+
+
+async def remove_list_member(client, args):
+    require(args, 'list_id', 'user_id')
+    await client.remove_list_member(args['list_id'], args['user_id'])
+    return {"list_id": args['list_id'], "user_id": args['user_id'], "is_member": False}
+
+
+async def get_list_members(client, args):
+    require(args, 'list_id')
+    result = await client.get_list_members(args['list_id'], count=args.get('count') or 20,
+                                           cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+async def get_user_lists(client, args):
+    # twikit can only list the authenticated account's lists; user_id is accepted
+    # for API parity with the v2 client
+    result = await client.get_lists(count=args.get('count') or 20, cursor=args.get('cursor'))
+    return to_plain(result)
+
+
+# Reads returning {items, next_cursor} pages, usable in 'iterate' mode
+PAGED_ACTIONS = frozenset({
+    'search_tweet', 'get_user_tweets', 'get_user_favorites', 'get_retweeters', 'get_user_followers',
+    'get_user_following', 'get_list_members', 'get_user_lists',
+})
+
+# Newest-first reads usable in 'sync' mode: the args naming what is synced,
+# with their defaults
+SYNC_ACTIONS = {
+    'get_user_tweets': (('user_id', None), ('type', 'Tweets')),
+    'search_tweet': (('query', None), ('search_type', 'Latest')),
+}
+
+# Actions that change account state
+WRITE_ACTIONS = frozenset({
+    'create_tweet', 'delete_tweet', 'favorite_tweet', 'unfavorite_tweet', 'retweet', 'delete_retweet',
+    'follow_user', 'unfollow_user', 'upload_media', 'create_list', 'add_list_member', 'remove_list_member',
+})
+
+# The service pins these to the account the caller names instead of
+# load-balancing them: writes, and get_user_lists, which reads the
+# authenticated account's own lists
+PINNED_ACTIONS = WRITE_ACTIONS | {'get_user_lists'}
+
+# Bulk writes: the per-item action, the args key holding the id list, other
+# required args, and the per-item args built from the bulk args and one id
+BulkAction = namedtuple('BulkAction', 'action items_key required item_args')
+
+BULK_ACTIONS = {
+    'bulk_add_list_members': BulkAction('add_list_member', 'user_ids', ('list_id',),
+                                        lambda args, item: {'list_id': args['list_id'], 'user_id': item}),
+    'bulk_follow': BulkAction('follow_user', 'user_ids', (), lambda args, item: {'user_id': item}),
+    'bulk_favorite': BulkAction('favorite_tweet', 'tweet_ids', (), lambda args, item: {'tweet_id': item}),
+}
+
+ACTIONS = {
+    'search_tweet': search_tweet,
+    'get_user_by_screen_name': get_user_by_screen_name,
+    'get_user_tweets': get_user_tweets,
+    'get_user_favorites': get_user_favorites,
+    'create_tweet': create_tweet,
+    'get_tweet_by_id': get_tweet_by_id,
+    'delete_tweet': delete_tweet,
+    'favorite_tweet': favorite_tweet,
+    'unfavorite_tweet': unfavorite_tweet,
+    'retweet': retweet,
+    'delete_retweet': delete_retweet,
+    'get_retweeters': get_retweeters,
+    'follow_user': follow_user,
+    'unfollow_user': unfollow_user,
+    'get_user_followers': get_user_followers,
+    'get_user_following': get_user_following,
+    'upload_media': upload_media,
+    'create_list': create_list,
+    'add_list_member': add_list_member,
+    'remove_list_member': remove_list_member,
+    'get_list_members': get_list_members,
+    'get_user_lists': get_user_lists,
+}
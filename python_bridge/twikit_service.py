@@ -1,85 +1,1115 @@
+import time
+_PROCESS_START = time.perf_counter()
+
 import asyncio
+import importlib
 import json
 import sys
 import os
-from pathlib import Path
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from urllib.parse import urlparse
-import importlib.util
 
-# Import TwitterAuthenticator from playwright_login_and_export.py
-from playwright_login_and_export import TwitterAuthenticator
+# Dependency-light modules only; Playwright, requests, bs4 and
+# x_client_transaction are imported lazily where they are actually needed.
+from artifact_refresh import ONDEMAND_FILE_URL_TEMPLATE, PUBLIC_HOME_URL, refresh_public_artifacts
+from response_cache import ResponseCache, parse_ttls, read_tags, write_tags
+from rate_limiter import RateLimitExceeded, RateLimiter, RequestMetrics, current_metrics
+from session_store import SessionStore
+from transaction_cache import load_transaction_engine
+from scheduler import DEFAULT_QUEUE_LIMITS, DEFAULT_WEIGHTS, LANES, LaneScheduler, Overloaded, parse_lane_values
+from single_flight import SingleFlight
+from user_index import INDEX_FIELDS, UserIndex
+from local_store import LOCAL_ACTIONS, LocalStore, parse_time, tweet_timestamp
+from hashtag_analytics import DEFAULT_BUCKET_SECONDS, HashtagAnalytics
+from socket_server import SocketServer
+from twikit_actions import (ACTIONS, BULK_ACTIONS, PAGED_ACTIONS, PINNED_ACTIONS, SYNC_ACTIONS, WRITE_ACTIONS,
+                            SessionClient, parse_fields, project, require)
 
-async def main():
-    data_dir = os.getenv('TWIKIT_DATA_DIR', './twitter_data')
-    username = os.getenv('TWIKIT_USERNAME')
-    email = os.getenv('TWIKIT_EMAIL')
-    password = os.getenv('TWIKIT_PASSWORD')
-    cookies_file = os.getenv('TWIKIT_COOKIES_FILE')
+# Compact frames; orjson is optional and only changes speed, not output
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-    # Try to use Playwright-captured authentication data
-    try:
-        auth = TwitterAuthenticator(data_dir=data_dir)
-        common_headers = auth.get_common_headers()
-        cookies_dict = auth.get_cookies_dict()
-        home_html, ondemand_js = auth.get_public_transaction_generator_data()
-        if not (common_headers and cookies_dict and home_html and ondemand_js):
-            sys.stderr.write("ERROR: Required authentication or transaction generator data is missing.\n")
-            sys.stderr.write("Please run playwright_login_and_export.py first and ensure you are logged in.\n")
-            sys.stdout.write(json.dumps({"id": None, "success": False, "error": "Missing authentication or transaction generator data"}) + '\n')
-            sys.stdout.flush()
+# Maximum number of commands executed at the same time. Commands beyond this
+# limit wait for a free slot instead of blocking the stdin reader.
+MAX_CONCURRENCY = int(os.getenv('TWIKIT_MAX_CONCURRENCY', '16'))
+
+# Priority lanes sharing those slots ('lane=number,...' overrides): scheduling
+# weights, and how many commands may wait in each lane before new ones are
+# rejected as overloaded
+LANE_WEIGHTS = os.getenv('TWIKIT_LANE_WEIGHTS', '')
+LANE_QUEUE_LIMITS = os.getenv('TWIKIT_LANE_QUEUE_LIMITS', '')
+
+# Optional override for the derived transaction generator state cache file
+TRANSACTION_CACHE_FILE = os.getenv('TWIKIT_TRANSACTION_CACHE_FILE')
+
+# Seconds between checks of the session store for a re-login written by another process
+SESSION_RELOAD_INTERVAL = float(os.getenv('TWIKIT_SESSION_RELOAD_INTERVAL', '2'))
+
+# Seconds between background checks of the public home page for a rotated
+# ondemand.s bundle (0 disables the refresher); the home URL and the ondemand.s
+# URL template ('{}' is the bundle hash) can point at a local stand-in for testing
+ARTIFACT_REFRESH_INTERVAL = float(os.getenv('TWIKIT_ARTIFACT_REFRESH_INTERVAL', '1800'))
+ARTIFACT_REFRESH_HOME_URL = os.getenv('TWIKIT_PUBLIC_HOME_URL', PUBLIC_HOME_URL)
+ARTIFACT_ONDEMAND_URL_TEMPLATE = os.getenv('TWIKIT_ARTIFACT_ONDEMAND_URL_TEMPLATE', ONDEMAND_FILE_URL_TEMPLATE)
+
+# Account pool: several exported sessions, one data directory each, given as
+# name=path entries (or bare paths, named after the directory) separated by
+# commas. Unset means the single account in TWIKIT_DATA_DIR.
+ACCOUNT_DIRS = os.getenv('TWIKIT_ACCOUNT_DIRS', '')
+
+# An account that fails this many commands in a row is skipped by read routing
+# for ACCOUNT_COOLDOWN seconds
+ACCOUNT_MAX_CONSECUTIVE_ERRORS = int(os.getenv('TWIKIT_ACCOUNT_MAX_CONSECUTIVE_ERRORS', '5'))
+ACCOUNT_COOLDOWN = float(os.getenv('TWIKIT_ACCOUNT_COOLDOWN', '60'))
+
+# Longest a request waits in an endpoint's rate-limit queue for the next window
+# before failing, and how often a 429 is retried after waiting
+RATE_LIMIT_MAX_WAIT = float(os.getenv('TWIKIT_RATE_LIMIT_MAX_WAIT', '900'))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv('TWIKIT_RATE_LIMIT_MAX_RETRIES', '2'))
+
+# Response cache for read actions: entry and byte caps (0 entries disables it)
+# and 'action=seconds,...' TTL overrides
+CACHE_MAX_ENTRIES = int(os.getenv('TWIKIT_CACHE_MAX_ENTRIES', '2048'))
+CACHE_MAX_BYTES = int(os.getenv('TWIKIT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_TTLS = os.getenv('TWIKIT_CACHE_TTLS', '')
+
+# Persistent screen_name -> user id index fed by every result containing users:
+# its JSON-lines file (defaults to user_index.jsonl in TWIKIT_DATA_DIR, 'off'
+# keeps it in memory only) and the age in seconds after which an entry is
+# looked up again
+USER_INDEX_FILE = os.getenv('TWIKIT_USER_INDEX_FILE')
+USER_INDEX_MAX_AGE = float(os.getenv('TWIKIT_USER_INDEX_MAX_AGE', str(7 * 86400)))
+
+# Local SQLite store of every fetched tweet and user, queried by local_search
+# and local_timeline: its database file (defaults to local_store.sqlite3 in
+# TWIKIT_DATA_DIR, 'off' keeps it in memory only) and the age in seconds after
+# which tweets are dropped (0 keeps them)
+LOCAL_STORE_FILE = os.getenv('TWIKIT_LOCAL_STORE_FILE')
+LOCAL_STORE_MAX_AGE = float(os.getenv('TWIKIT_LOCAL_STORE_MAX_AGE', str(90 * 86400)))
+
+# Default page cap for 'iterate' mode commands that don't set args.max_pages
+ITERATE_MAX_PAGES = int(os.getenv('TWIKIT_ITERATE_MAX_PAGES', '50'))
+
+# Most pages a 'sync' mode command walks back towards the previous high-water
+# mark when it doesn't set args.max_pages; a delta longer than that is
+# returned incomplete
+SYNC_MAX_PAGES = int(os.getenv('TWIKIT_SYNC_MAX_PAGES', '10'))
+
+# Tweets a hashtag_analytics command reads when it doesn't set args.max_tweets
+ANALYTICS_MAX_TWEETS = int(os.getenv('TWIKIT_ANALYTICS_MAX_TWEETS', '2000'))
+
+# Bulk writes: items processed at once when the command doesn't set
+# args.parallelism, and the most ids one command may carry
+BULK_PARALLELISM = int(os.getenv('TWIKIT_BULK_PARALLELISM', '4'))
+BULK_MAX_ITEMS = int(os.getenv('TWIKIT_BULK_MAX_ITEMS', '1000'))
+
+# Index of this process in the Node worker pool (TwikitBridgeClient)
+WORKER_INDEX = os.getenv('TWIKIT_WORKER_INDEX')
+
+# Serve clients on this Unix socket instead of stdin/stdout, so several Node
+# processes on one host share one warm service; it exits after
+# SOCKET_IDLE_TIMEOUT seconds without a connected client (0 keeps it running)
+SOCKET_PATH = os.getenv('TWIKIT_SOCKET_PATH')
+SOCKET_IDLE_TIMEOUT = float(os.getenv('TWIKIT_SOCKET_IDLE_TIMEOUT', '0'))
+
+# Commands answered immediately instead of waiting for a concurrency slot, so
+# health checks, cancellations, queue stats and other workers' cache
+# invalidations still get through while the worker is saturated; local store
+# reads never go upstream and don't need one either
+CONTROL_ACTIONS = frozenset({'ping', 'cancel', 'get_queue_stats', 'invalidate_cache', *LOCAL_ACTIONS})
+
+# Modules whose presence in sys.modules at 'ready' time indicates a startup regression
+HEAVY_MODULES = ('playwright', 'requests', 'bs4', 'x_client_transaction', 'twikit')
+
+
+class StartupReport:
+    """Milliseconds since process start at which each startup phase finished."""
+
+    def __init__(self):
+        self.phases = {}
+        self.modules_at_ready = []
+
+    def mark(self, phase):
+        self.phases[phase] = round((time.perf_counter() - _PROCESS_START) * 1000, 1)
+
+    def mark_ready(self):
+        self.mark('ready')
+        self.modules_at_ready = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def as_dict(self):
+        return {"phases_ms": dict(self.phases), "heavy_modules_at_ready": list(self.modules_at_ready)}
+
+    def write(self):
+        sys.stderr.write(f"Startup report: {json.dumps(self.as_dict())}\n")
+
+
+class AccountState:
+    """
+    One account of the pool: its session store, transaction generator (built in
+    the background), twikit client and load/error counters.
+    """
+
+    def __init__(self, name, store, startup_report, cache_file=None, startup_phase='transaction_generator'):
+        self.name = name
+        self.store = store
+        self.startup_report = startup_report
+        self.cache_file = cache_file
+        self.startup_phase = startup_phase
+        self.transaction_generator_task = None
+        self._refresh_task = None
+        self._session_client_task = None
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.unhealthy_until = 0.0
+        self.rate_limiter = RateLimiter(RATE_LIMIT_MAX_WAIT, RATE_LIMIT_MAX_RETRIES)
+
+    def log(self, message):
+        sys.stderr.write(f"[{self.name}] {message}\n")
+
+    # --- Load and health ---
+
+    def is_healthy(self):
+        return time.monotonic() >= self.unhealthy_until and self.store.has_credentials()
+
+    def begin(self):
+        self.in_flight += 1
+        self.requests += 1
+
+    def end(self, error=None):
+        self.in_flight -= 1
+        if error is None:
+            self.consecutive_errors = 0
+            return
+        self.errors += 1
+        self.consecutive_errors += 1
+        if self.consecutive_errors == ACCOUNT_MAX_CONSECUTIVE_ERRORS:
+            self.unhealthy_until = time.monotonic() + ACCOUNT_COOLDOWN
+            self.log(f"{self.consecutive_errors} consecutive errors; skipping for reads for {ACCOUNT_COOLDOWN:g}s.")
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "data_dir": str(self.store.data_dir),
+            "generation": self.store.snapshot().generation,
+            "healthy": self.is_healthy(),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "consecutive_errors": self.consecutive_errors,
+            "rate_limits": self.rate_limiter.stats(),
+        }
+
+    # --- Transaction generator ---
+
+    def start_transaction_generator(self):
+        self.transaction_generator_task = asyncio.create_task(self._build_transaction_generator())
+
+    async def _load_transaction_generator(self):
+        # Derived state is cached next to the artifacts, so the scan only runs
+        # when home/ondemand actually change
+        return await asyncio.to_thread(
+            load_transaction_engine, self.store.home_path, self.store.ondemand_path, self.cache_file)
+
+    async def _build_transaction_generator(self):
+        try:
+            generator = await self._load_transaction_generator()
+        except Exception as e:
+            self.log(f"Error building transaction generator: {str(e)}")
+            raise
+        finally:
+            self.startup_report.mark(self.startup_phase)
+            self.startup_report.write()
+        self.log("Loaded transaction generator data from Playwright export.")
+        return generator
+
+    async def get_transaction_generator(self):
+        """Wait for the background construction (shielded so one cancelled caller can't abort it)."""
+        return await asyncio.shield(self.transaction_generator_task)
+
+    def refresh_transaction_generator(self):
+        """Rebuild the generator in the background and swap it in once it is ready."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_transaction_generator())
+
+    async def _refresh_transaction_generator(self):
+        try:
+            generator = await self._load_transaction_generator()
+        except Exception as e:
+            # Keep serving with the current generator
+            self.log(f"Error rebuilding transaction generator: {str(e)}")
             return
-        # Set up transaction generator
-        from x_client_transaction import ClientTransaction
-        import bs4
-        home_soup = bs4.BeautifulSoup(home_html, 'html.parser')
-        ondemand_soup = bs4.BeautifulSoup(ondemand_js, 'html.parser')
-        transaction_generator = ClientTransaction(home_page_response=home_soup, ondemand_file_response=ondemand_soup)
-        sys.stderr.write("Loaded authentication and transaction generator data from Playwright export.\n")
+        # Requests already holding the old generator finish with it; new ones
+        # get the replacement without waiting on the rebuild.
+        ready = asyncio.get_running_loop().create_future()
+        ready.set_result(generator)
+        self.transaction_generator_task = ready
+        self.log("Swapped in rebuilt transaction generator.")
+
+    # --- twikit client ---
+
+    async def get_session_client(self):
+        """The account's twikit client, created on first use so startup never imports twikit."""
+        if self._session_client_task is None:
+            self._session_client_task = asyncio.create_task(self._create_session_client())
+        return await asyncio.shield(self._session_client_task)
+
+    async def _create_session_client(self):
+        try:
+            await asyncio.to_thread(importlib.import_module, 'twikit')
+            session_client = SessionClient(self.store, self.rate_limiter)
+        except Exception:
+            # Let the next command retry instead of caching the failure
+            self._session_client_task = None
+            raise
+        self.log("Created shared twikit client.")
+        return session_client
+
+    async def close_session_client(self):
+        if self._session_client_task is not None and self._session_client_task.done() \
+                and not self._session_client_task.cancelled() and self._session_client_task.exception() is None:
+            await self._session_client_task.result().close()
+
+    # --- Background upkeep ---
+
+    async def refresh_artifacts(self):
+        """
+        Re-fetch the public home page off the hot path; when ondemand.s rotated,
+        persist the new artifacts and swap in a rebuilt generator.
+        """
+        changed = await asyncio.to_thread(refresh_public_artifacts, self.store, ARTIFACT_REFRESH_HOME_URL,
+                                          ARTIFACT_ONDEMAND_URL_TEMPLATE)
+        if changed:
+            self.log("ondemand.s bundle rotated; rebuilding transaction generator.")
+            self.refresh_transaction_generator()
+            await self._refresh_task
+        return changed
+
+    async def refresh_artifacts_periodically(self):
+        if ARTIFACT_REFRESH_INTERVAL <= 0:
+            return
+        while True:
+            await asyncio.sleep(ARTIFACT_REFRESH_INTERVAL)
+            try:
+                await self.refresh_artifacts()
+            except Exception as e:
+                self.log(f"Error refreshing home/ondemand artifacts: {str(e)}")
+
+    async def watch_session_store(self):
+        """Hot-reload the session store when a login script rewrites it."""
+        while True:
+            await asyncio.sleep(SESSION_RELOAD_INTERVAL)
+            try:
+                changed = self.store.reload_if_changed()
+            except Exception as e:
+                # A store we can't parse leaves the current snapshot in place
+                self.log(f"Error reloading session store: {str(e)}")
+                continue
+            if changed:
+                self.log(f"Session store changed on disk; reloaded generation {self.store.snapshot().generation}.")
+                self.refresh_transaction_generator()
+
+
+class BridgeState:
+    """The account pool shared by command handlers."""
+
+    def __init__(self, accounts, startup_report, cache, scheduler, user_index, local_store):
+        self.accounts = {account.name: account for account in accounts}
+        # Writes without an explicit 'account' go to the first configured one
+        self.primary = accounts[0]
+        self.startup_report = startup_report
+        self.cache = cache
+        self.single_flight = SingleFlight()
+        self.scheduler = scheduler
+        self.user_index = user_index
+        self.local_store = local_store
+        # The user index and the local store do all their disk I/O on this
+        # thread, one call at a time: a write may wait seconds for another
+        # worker's SQLite lock, and the event loop must not wait with it
+        self.store_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bridge-store')
+        # Running commands by reply queue (one per connection) and request id, for 'cancel'
+        self.running = {}
+        self.cancelled = 0
+        self.deadline_exceeded = 0
+        # SocketServer when serving on a Unix socket
+        self.server = None
+
+    async def in_store_thread(self, function, *args):
+        # Shielded: a cancelled command's queued write still happens, in its turn
+        return await asyncio.shield(asyncio.get_running_loop().run_in_executor(self.store_thread, function, *args))
+
+    def route(self, action, args):
+        """
+        Pick the account for a command: the one named in args['account'] if
+        given, the primary account for unnamed writes (PINNED_ACTIONS), otherwise the healthy
+        account with the fewest commands in flight.
+        """
+        name = args.get('account') if isinstance(args, dict) else None
+        if name:
+            if name not in self.accounts:
+                raise ValueError(f"Unknown account '{name}'")
+            return self.accounts[name]
+        if action in PINNED_ACTIONS:
+            return self.primary
+        candidates = [account for account in self.accounts.values() if account.is_healthy()]
+        # With every account cooling down, keep serving rather than failing outright
+        return min(candidates or self.accounts.values(), key=lambda account: (account.in_flight, account.requests))
+
+    def stats(self):
+        return [account.stats() for account in self.accounts.values()]
+
+
+def parse_account_dirs(value, default_dir):
+    """[(name, data_dir), ...] from TWIKIT_ACCOUNT_DIRS, or the single default account."""
+    entries = [entry.strip() for entry in value.split(',') if entry.strip()]
+    if not entries:
+        return [('default', default_dir)]
+    accounts = []
+    for entry in entries:
+        name, sep, path = entry.partition('=')
+        if not sep:
+            name, path = os.path.basename(os.path.normpath(entry)), entry
+        if any(name == existing for existing, _ in accounts):
+            raise ValueError(f"Duplicate account name '{name}' in TWIKIT_ACCOUNT_DIRS")
+        accounts.append((name.strip(), path.strip()))
+    return accounts
+
+
+async def generate_transaction_id_for(args, account):
+    """Generate a transaction ID for one {'method', 'url'} mapping."""
+    if not isinstance(args, dict) or 'url' not in args or 'method' not in args:
+        raise ValueError("Missing 'url' or 'method' for get_transaction_id action")
+    path = urlparse(args['url']).path
+    try:
+        transaction_generator = await account.get_transaction_generator()
+        return transaction_generator.generate_transaction_id(method=args['method'], path=path)
     except Exception as e:
-        sys.stderr.write(f"Error loading Playwright authentication data: {str(e)}\n")
-        sys.stdout.write(json.dumps({"id": None, "success": False, "error": str(e)}) + '\n')
-        sys.stdout.flush()
+        raise RuntimeError(f"Failed to generate transaction ID: {str(e)}") from e
+
+
+async def run_account_action(action, args, account, metrics):
+    """Run a twikit action on one account, keeping its load and error counters."""
+    account.begin()
+    error = None
+    # Each command runs in its own task, so the context var is per command
+    current_metrics.set(metrics)
+    try:
+        session_client = await account.get_session_client()
+        client = await session_client.prepare(account)
+        return await ACTIONS[action](client, args)
+    except ValueError:
+        # Bad arguments say nothing about the account's health
+        raise
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        account.end(error)
+
+
+async def run_cached_action(action, args, account, state, metrics):
+    """
+    Serve reads from the response cache (unless args['cache'] is false) or
+    through a single upstream call shared by identical concurrent reads, and
+    invalidate what a successful write makes stale.
+
+    Returns:
+        tuple: (data, meta entries for the reply)
+    """
+    cache = state.cache
+    if action in WRITE_ACTIONS:
+        data = await run_account_action(action, args, account, metrics)
+        await state.in_store_thread(state.user_index.record, data)
+        await state.in_store_thread(state.local_store.record, data)
+        if action == 'delete_tweet':
+            await state.in_store_thread(state.local_store.delete_tweet, args['id'])
+        stale_tags = write_tags(action, args, account.name)
+        if not stale_tags:
+            return data, {}
+        cache.invalidate(stale_tags)
+        # Sibling worker processes have caches of their own; the Node side
+        # forwards these tags to them as an 'invalidate_cache' command
+        return data, {"invalidated": stale_tags}
+
+    # Reads of the account's own data are keyed per account; other reads
+    # only when the caller asked for a specific account
+    key_account = account.name if action in PINNED_ACTIONS else args.get('account')
+    key = cache.make_key(action, args, key_account)
+    cacheable = args.get('cache') is not False and cache.is_cacheable(action)
+    if cacheable:
+        hit, data = cache.get(key)
+        if hit:
+            return data, {"cache": "hit"}
+    started_epoch = cache.epoch()
+    data, coalesced = await state.single_flight.run(
+        key, lambda flight_metrics: run_account_action(action, args, account, flight_metrics), metrics)
+    meta = {}
+    if coalesced:
+        meta["coalesced"] = True
+    else:
+        await state.in_store_thread(state.user_index.record, data)
+        await state.in_store_thread(state.local_store.record, data)
+        if cacheable:
+            cache.put(key, data, read_tags(action, args, data, account.name), started_epoch)
+    if cacheable:
+        meta["cache"] = "miss"
+    return data, meta
+
+
+async def iterate_action(request_id, action, args, account, state, emit, metrics):
+    """
+    Walk the cursors of a paged read, emitting one 'page' frame per page, and
+    return the terminal frame. Stops at the last page, args['max_pages']
+    (default ITERATE_MAX_PAGES) or args['max_items'], whichever comes first.
+
+    Frames and the terminal frame carry a 'resume' marker, {cursor, skip}:
+    the cursor of the page to read next and how many of its items were
+    already delivered (non-zero when max_items cut a page short), or None at
+    the last page. Passing both back as args 'cursor' and 'skip' continues
+    the walk without repeating or losing items.
+    """
+    if action not in PAGED_ACTIONS:
+        raise ValueError(f"Action '{action}' does not support iterate mode")
+    max_pages = int(args.get('max_pages') or ITERATE_MAX_PAGES)
+    max_items = int(args['max_items']) if args.get('max_items') else None
+    fields = parse_fields(args['fields']) if args.get('fields') is not None else None
+    skip = int(args.get('skip') or 0)
+    page_args = {key: value for key, value in args.items() if key not in ('max_pages', 'max_items', 'skip')}
+    fetched = pages = items = 0
+    cursor = page_args.get('cursor')
+    next_cursor = cursor
+    resume = {"cursor": cursor, "skip": skip}
+    while fetched < max_pages:
+        page, _ = await run_cached_action(action, {**page_args, 'cursor': cursor}, account, state, metrics)
+        fetched += 1
+        page_items = (page.get('items') or [])[skip:]
+        next_cursor = page.get('next_cursor')
+        # A cursor that doesn't advance would return the same page again
+        resume = {"cursor": next_cursor, "skip": 0} if next_cursor and next_cursor != cursor else None
+        if max_items is not None and len(page_items) > max_items - items:
+            page_items = page_items[:max_items - items]
+            resume = {"cursor": cursor, "skip": skip + len(page_items)}
+        # An empty page can still have more behind it; only non-empty ones are sent
+        if page_items:
+            pages += 1
+            items += len(page_items)
+            await emit({"id": request_id, "success": True, "stream": "page", "page": pages,
+                        "data": {"items": project(page_items, fields), "next_cursor": next_cursor, "resume": resume}})
+        if resume is None or resume["skip"] or (max_items is not None and items >= max_items):
+            break
+        cursor, skip = next_cursor, 0
+    return {"id": request_id, "success": True, "stream": "end", "account": account.name,
+            "data": {"pages": pages, "items": items, "next_cursor": next_cursor, "resume": resume},
+            "meta": metrics.as_dict()}
+
+
+def item_id(item) -> Optional[int]:
+    try:
+        return int(item['id'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+async def sync_action(request_id, action, args, account, state, metrics):
+    """
+    Return only what is newer than the previous sync of the same timeline or
+    query: walk pages from the newest item until one reaches the stored
+    high-water mark, then move the mark up to the newest id returned. The
+    first sync returns one page and sets the mark. args['subscriber'] keeps
+    independent marks for several pollers of the same timeline or query, and
+    args['reset'] starts over.
+    """
+    if action not in SYNC_ACTIONS:
+        raise ValueError(f"Action '{action}' does not support sync mode")
+    key_args = SYNC_ACTIONS[action]
+    require(args, key_args[0][0])
+    key_values = [str(args.get(name) or default) for name, default in key_args]
+    if action == 'search_tweet' and key_values[1] != 'Latest':
+        raise ValueError("sync mode needs search_type 'Latest', the only newest-first search")
+    key = json.dumps([action, *key_values, str(args.get('subscriber') or '')], ensure_ascii=False)
+    if args.get('reset') is True:
+        await state.in_store_thread(state.local_store.drop_mark, key)
+    previous = await state.in_store_thread(state.local_store.get_mark, key)
+    max_pages = 1 if previous is None else int(args.get('max_pages') or SYNC_MAX_PAGES)
+    fields = parse_fields(args['fields']) if args.get('fields') is not None else None
+    # A cached page would hide what was posted since
+    page_args = {name: value for name, value in args.items()
+                 if name not in ('max_pages', 'subscriber', 'reset', 'cursor')}
+    page_args['cache'] = False
+    delta = {}
+    pages = 0
+    complete = previous is None
+    cursor = None
+    while pages < max_pages:
+        page, _ = await run_cached_action(action, {**page_args, 'cursor': cursor}, account, state, metrics)
+        pages += 1
+        page_items = page.get('items') or []
+        ids = [item_id(item) for item in page_items]
+        for item, tweet_id in zip(page_items, ids):
+            if tweet_id is not None and (previous is None or tweet_id > previous):
+                delta.setdefault(tweet_id, item)
+        next_cursor = page.get('next_cursor')
+        known = [tweet_id for tweet_id in ids if tweet_id is not None]
+        # The oldest item decides: a pinned tweet at the top of a timeline is old but says nothing
+        if not known or not next_cursor or next_cursor == cursor or \
+                (previous is not None and min(known) <= previous):
+            complete = True
+            break
+        cursor = next_cursor
+    items = [delta[tweet_id] for tweet_id in sorted(delta, reverse=True)]
+    high_water = max(delta) if delta else previous
+    if delta:
+        await state.in_store_thread(state.local_store.set_mark, key, high_water)
+    return {"id": request_id, "success": True, "account": account.name,
+            "data": {"items": project(items, fields), "new_items": len(items),
+                     "high_water": str(high_water) if high_water is not None else None,
+                     "previous_high_water": str(previous) if previous is not None else None,
+                     "first_sync": previous is None, "complete": complete, "pages": pages},
+            "meta": metrics.as_dict()}
+
+
+async def hashtag_analytics_action(request_id, args, account, state, emit, metrics):
+    """
+    Stream Latest search pages for args['hashtag'] through HashtagAnalytics,
+    emitting a 'progress' frame per page, and return the report as the
+    terminal frame. Only the current page is held in memory. Stops after
+    args['max_tweets'] (default ANALYTICS_MAX_TWEETS), at the first tweet
+    older than args['since'] or at the last page.
+    """
+    require(args, 'hashtag')
+    hashtag = '#' + str(args['hashtag']).lstrip('#')
+    since, until = parse_time(args.get('since')), parse_time(args.get('until'))
+    max_tweets = int(args.get('max_tweets') or ANALYTICS_MAX_TWEETS)
+    query = hashtag
+    if since is not None:
+        query += f" since_time:{int(since)}"
+    if until is not None:
+        query += f" until_time:{int(until)}"
+    analytics = HashtagAnalytics(hashtag, int(args.get('bucket_seconds') or DEFAULT_BUCKET_SECONDS))
+    pages = 0
+    complete = False
+    cursor = None
+    previous_ids = set()
+    while analytics.tweets < max_tweets:
+        page, _ = await run_cached_action('search_tweet', {'query': query, 'search_type': 'Latest',
+                                                           'count': args.get('count') or 20, 'cursor': cursor,
+                                                           'cache': False}, account, state, metrics)
+        pages += 1
+        page_items = page.get('items') or []
+        batch = []
+        reached_since = False
+        for item in page_items:
+            # New tweets can shift results between pages; only the previous page is remembered
+            if item.get('id') in previous_ids:
+                continue
+            tweet_id = item_id(item)
+            timestamp = tweet_timestamp(tweet_id, item.get('created_at')) if tweet_id is not None else 0.0
+            if since is not None and timestamp and timestamp < since:
+                reached_since = True
+                continue
+            if until is not None and timestamp >= until:
+                continue
+            batch.append(item)
+        analytics.add_page(batch[:max_tweets - analytics.tweets])
+        previous_ids = {item.get('id') for item in page_items}
+        await emit({"id": request_id, "success": True, "stream": "progress",
+                    "pages": pages, "tweets": analytics.tweets})
+        next_cursor = page.get('next_cursor')
+        if not page_items or not next_cursor or next_cursor == cursor or reached_since:
+            complete = True
+            break
+        cursor = next_cursor
+    report = analytics.report()
+    report.update(query=query, pages=pages, complete=complete)
+    return {"id": request_id, "success": True, "stream": "end", "account": account.name,
+            "data": report, "meta": metrics.as_dict()}
+
+
+async def bulk_action(request_id, action, args, state, emit, metrics):
+    """
+    Run one write per id with bounded parallelism, emitting a 'progress' frame
+    as each item finishes, and return the terminal frame with every item's
+    outcome. Items keep going past individual failures; once an endpoint's
+    rate-limit window is out of reach the remaining items are skipped.
+    """
+    spec = BULK_ACTIONS[action]
+    require(args, spec.items_key, *spec.required)
+    if not isinstance(args[spec.items_key], list):
+        raise ValueError(f"'{spec.items_key}' must be a list")
+    items = list(dict.fromkeys(str(item) for item in args[spec.items_key]))
+    if len(items) > BULK_MAX_ITEMS:
+        raise ValueError(f"{len(items)} items exceed the limit of {BULK_MAX_ITEMS} per command")
+    parallelism = max(1, int(args.get('parallelism') or BULK_PARALLELISM))
+    account = state.route(spec.action, args)
+    results = [None] * len(items)
+    slots = asyncio.Semaphore(parallelism)
+    done = 0
+    stop_reason = None
+    stale_tags = set()
+
+    async def run_item(index, item):
+        nonlocal done, stop_reason
+        async with slots:
+            if stop_reason is not None:
+                result = {"id": item, "success": False, "skipped": True, "error": stop_reason}
+            else:
+                try:
+                    data, extra_meta = await run_cached_action(spec.action, spec.item_args(args, item), account, state,
+                                                               metrics)
+                    stale_tags.update(extra_meta.get("invalidated", ()))
+                    result = {"id": item, "success": True, "data": data}
+                except RateLimitExceeded as e:
+                    stop_reason = f"Skipped after rate limit: {str(e)}"
+                    result = {"id": item, "success": False, "error": str(e)}
+                except Exception as e:
+                    result = {"id": item, "success": False, "error": str(e)}
+        results[index] = result
+        done += 1
+        await emit({"id": request_id, "success": True, "stream": "progress",
+                    "done": done, "total": len(items), "item": result})
+
+    await asyncio.gather(*(run_item(index, item) for index, item in enumerate(items)))
+    succeeded = sum(1 for result in results if result["success"])
+    skipped = sum(1 for result in results if result.get("skipped"))
+    meta = metrics.as_dict()
+    if stale_tags:
+        # Forwarded to the other workers like a single write's
+        meta["invalidated"] = sorted(stale_tags)
+    return {"id": request_id, "success": True, "stream": "end", "account": account.name,
+            "data": {"total": len(items), "succeeded": succeeded, "failed": len(items) - succeeded - skipped,
+                     "skipped": skipped, "results": results},
+            "meta": meta}
+
+
+async def lookup_indexed_user(args, state):
+    """
+    Answer get_user_by_screen_name from the user index when the caller only
+    wants indexed fields (typically just the id) and doesn't bypass the cache.
+    """
+    if args.get('fields') is None or args.get('cache') is False or not args.get('screen_name'):
+        return None
+    if not all(field.split('.')[0] in INDEX_FIELDS for field in args['fields']):
+        return None
+    return await state.in_store_thread(state.user_index.lookup, args['screen_name'])
+
+
+async def resolve_screen_names(args, state, metrics):
+    """
+    Ids and indexed profile fields for many screen names at once: index hits
+    first, the rest through get_user_by_screen_name with bounded parallelism.
+    """
+    require(args, 'screen_names')
+    if not isinstance(args['screen_names'], list):
+        raise ValueError("'screen_names' must be a list")
+    names = list(dict.fromkeys(str(name).lstrip('@') for name in args['screen_names']))
+    if len(names) > BULK_MAX_ITEMS:
+        raise ValueError(f"{len(names)} screen names exceed the limit of {BULK_MAX_ITEMS} per command")
+    refresh = args.get('refresh') is True
+    users, errors = {}, {}
+    missing = []
+    entries = [None] * len(names) if refresh else \
+        await state.in_store_thread(lambda: [state.user_index.lookup(name) for name in names])
+    for name, entry in zip(names, entries):
+        if entry is not None:
+            users[name] = entry
+        else:
+            missing.append(name)
+    slots = asyncio.Semaphore(max(1, int(args.get('parallelism') or BULK_PARALLELISM)))
+
+    async def resolve(name):
+        lookup_args = {'screen_name': name, 'cache': not refresh}
+        async with slots:
+            try:
+                data, _ = await run_cached_action('get_user_by_screen_name', lookup_args,
+                                                  state.route('get_user_by_screen_name', lookup_args), state, metrics)
+            except Exception as e:
+                errors[name] = str(e)
+                return
+        users[name] = {field: data.get(field) for field in INDEX_FIELDS} if isinstance(data, dict) else None
+
+    await asyncio.gather(*(resolve(name) for name in missing))
+    return {"users": users, "errors": errors, "index_hits": len(names) - len(missing), "lookups": len(missing)}
+
+
+async def handle_command(command_data, state, emit=None, metrics=None):
+    """
+    Build the response dict for one parsed command. Commands with
+    "mode": "iterate" also send their intermediate frames through emit.
+    metrics defaults to a fresh RequestMetrics bound to the command's deadline.
+    """
+    request_id = None
+    if metrics is None:
+        metrics = RequestMetrics(command_deadline(command_data))
+    try:
+        request_id = command_data.get('id')
+        action = command_data.get('action')
+        args = command_data.get('args', {})
+        if not action:
+            raise ValueError("Missing 'action' in command")
+        if command_data.get('mode') == 'iterate':
+            if emit is None:
+                raise ValueError("iterate mode is not available here")
+            response_data = await iterate_action(request_id, action, args, state.route(action, args), state, emit,
+                                                 metrics)
+        elif command_data.get('mode') == 'sync':
+            response_data = await sync_action(request_id, action, args, state.route(action, args), state, metrics)
+        elif action == 'get_transaction_id':
+            # Expects 'url' and 'method' in args
+            transaction_id = await generate_transaction_id_for(args, state.route(action, args))
+            response_data = {"id": request_id, "success": True, "data": transaction_id}
+        elif action == 'get_transaction_ids':
+            # Expects 'items': [{'method': ..., 'url': ...}, ...]; each item
+            # reports its own success/error so one bad item doesn't fail the batch
+            items = args.get('items')
+            if not isinstance(items, list):
+                raise ValueError("Missing 'items' list for get_transaction_ids action")
+            account = state.route(action, args)
+            results = []
+            for item in items:
+                try:
+                    results.append({"success": True, "data": await generate_transaction_id_for(item, account)})
+                except Exception as e:
+                    results.append({"success": False, "error": str(e)})
+            response_data = {"id": request_id, "success": True, "data": results}
+        elif action == 'refresh_transaction_artifacts':
+            # Immediate rotation check, e.g. after requests start failing
+            # (every account, or only args['account'])
+            name = args.get('account')
+            if name and name not in state.accounts:
+                raise ValueError(f"Unknown account '{name}'")
+            accounts = [state.accounts[name]] if name else list(state.accounts.values())
+            changed = {account.name: await account.refresh_artifacts() for account in accounts}
+            response_data = {"id": request_id, "success": True,
+                             "data": {"changed": any(changed.values()), "accounts": changed}}
+        elif action == 'ping':
+            response_data = {"id": request_id, "success": True,
+                             "data": {"pid": os.getpid(), "worker": WORKER_INDEX,
+                                      "socket": state.server.stats() if state.server else None,
+                                      "cancelled": state.cancelled, "deadline_exceeded": state.deadline_exceeded}}
+        elif action == 'get_startup_report':
+            response_data = {"id": request_id, "success": True, "data": state.startup_report.as_dict()}
+        elif action == 'get_account_stats':
+            response_data = {"id": request_id, "success": True, "data": state.stats()}
+        elif action == 'get_cache_stats':
+            response_data = {"id": request_id, "success": True,
+                             "data": {**state.cache.stats(), "single_flight": state.single_flight.stats(),
+                                      "user_index": state.user_index.stats(),
+                                      "local_store": await state.in_store_thread(state.local_store.stats)}}
+        elif action == 'get_queue_stats':
+            response_data = {"id": request_id, "success": True, "data": state.scheduler.stats()}
+        elif action == 'clear_cache':
+            response_data = {"id": request_id, "success": True, "data": {"removed": state.cache.clear()}}
+        elif action == 'invalidate_cache':
+            tags = args.get('tags')
+            if not isinstance(tags, list):
+                raise ValueError("'tags' must be a list")
+            response_data = {"id": request_id, "success": True, "data": {"removed": state.cache.invalidate(tags)}}
+        elif action == 'hashtag_analytics':
+            if emit is None:
+                raise ValueError("hashtag_analytics is not available here")
+            response_data = await hashtag_analytics_action(request_id, args, state.route('search_tweet', args),
+                                                           state, emit, metrics)
+        elif action in BULK_ACTIONS:
+            if emit is None:
+                raise ValueError("bulk actions are not available here")
+            response_data = await bulk_action(request_id, action, args, state, emit, metrics)
+        elif action in LOCAL_ACTIONS:
+            fields = parse_fields(args['fields']) if args.get('fields') is not None else None
+            data = await state.in_store_thread(LOCAL_ACTIONS[action], state.local_store, args)
+            response_data = {"id": request_id, "success": True, "data": project(data, fields),
+                             "meta": {"local": True}}
+        elif action == 'resolve_screen_names':
+            data = await resolve_screen_names(args, state, metrics)
+            response_data = {"id": request_id, "success": True, "data": data, "meta": metrics.as_dict()}
+        elif action in ACTIONS:
+            fields = parse_fields(args['fields']) if args.get('fields') is not None else None
+            indexed = await lookup_indexed_user(args, state) if action == 'get_user_by_screen_name' else None
+            if indexed is not None:
+                response_data = {"id": request_id, "success": True, "data": project(indexed, fields),
+                                 "meta": {"index": "hit"}}
+            else:
+                account = state.route(action, args)
+                try:
+                    data, extra_meta = await run_cached_action(action, args, account, state, metrics)
+                    data = project(data, fields)
+                except Exception as e:
+                    response_data = {"id": request_id, "success": False, "error": str(e),
+                                     "account": account.name, "meta": metrics.as_dict()}
+                else:
+                    meta = {**metrics.as_dict(), **extra_meta}
+                    response_data = {"id": request_id, "success": True, "data": data,
+                                     "account": account.name, "meta": meta}
+        else:
+            response_data = {"id": request_id, "success": False, "error": f"Unknown action '{action}'"}
+    except Exception as e:
+        response_data = {"id": request_id, "success": False, "error": str(e)}
+    return response_data
+
+
+def command_deadline(command_data):
+    """The command's 'deadline' (epoch milliseconds) in epoch seconds, or None."""
+    deadline = command_data.get('deadline')
+    return float(deadline) / 1000 if deadline is not None else None
+
+
+def cancel_command(command_data, running):
+    """Cancel the command named by args.id that arrived on the same connection."""
+    request_id = command_data.get('id')
+    target = (command_data.get('args') or {}).get('id')
+    task = running.get(target)
+    cancelled = task is not None and not task.done() and task.cancel()
+    return {"id": request_id, "success": True, "data": {"id": target, "cancelled": bool(cancelled)}}
+
+
+def command_lane(command_data):
+    """
+    The command's 'priority' lane if given; otherwise writes are interactive,
+    page walks, bulk writes and analytics background and everything else default.
+    """
+    priority = command_data.get('priority')
+    if priority is not None:
+        if priority not in LANES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(LANES)}")
+        return priority
+    if command_data.get('mode') == 'iterate' or command_data.get('action') in BULK_ACTIONS or \
+            command_data.get('action') == 'hashtag_analytics':
+        return 'background'
+    if command_data.get('action') in WRITE_ACTIONS:
+        return 'interactive'
+    return 'default'
+
+
+async def run_command(line, state, out_queue):
+    """
+    Execute one command line in its priority lane and queue its reply.
+
+    A command with a 'deadline' that passes while it waits for a slot or runs
+    is abandoned with an error reply; one cancelled through a 'cancel'
+    command gets no reply, as its sender has already given up on it. For a
+    streamed command the deadline covers the wait for the next frame, the
+    way the Node side re-arms its timeout: every frame sent pushes it back
+    by the budget the command arrived with.
+    """
+    try:
+        command_data = json.loads(line)
+        if not isinstance(command_data, dict):
+            raise ValueError("Command must be a JSON object")
+    except ValueError as e:
+        await out_queue.put({"id": None, "success": False, "error": f"Invalid JSON command: {str(e)}"})
+        return
+    try:
+        metrics = RequestMetrics(command_deadline(command_data))
+        lane = command_lane(command_data)
+    except (TypeError, ValueError) as e:
+        await out_queue.put({"id": command_data.get('id'), "success": False, "error": f"Invalid command: {str(e)}"})
         return
+    action = command_data.get('action')
+    if action == 'cancel':
+        await out_queue.put(cancel_command(command_data, state.running.get(out_queue, {})))
+        return
+    if action in CONTROL_ACTIONS:
+        await out_queue.put(await handle_command(command_data, state, out_queue.put))
+        return
+
+    frame_budget = None
+    streamed = command_data.get('mode') == 'iterate' or action in BULK_ACTIONS or action == 'hashtag_analytics'
+    if streamed and metrics.deadline is not None:
+        frame_budget = max(0.0, metrics.deadline - time.time())
 
+    async def emit(frame):
+        await out_queue.put(frame)
+        if frame_budget is not None:
+            metrics.deadline = time.time() + frame_budget
+
+    async def execute():
+        try:
+            async with state.scheduler.slot(lane):
+                return await handle_command(command_data, state, emit, metrics)
+        except Overloaded as e:
+            # Explicit backpressure: the client may retry later or shed the request
+            return {"id": command_data.get('id'), "success": False, "error": f"overloaded: {str(e)}",
+                    "overloaded": True, "lane": lane}
+
+    request_id = command_data.get('id')
+    running = state.running.setdefault(out_queue, {})
+    if request_id is not None:
+        running[request_id] = asyncio.current_task()
+    task = asyncio.ensure_future(execute())
+    try:
+        while True:
+            timeout = None if metrics.deadline is None else max(0.0, metrics.deadline - time.time())
+            await asyncio.wait({task}, timeout=timeout)
+            if task.done():
+                response_data = task.result()
+                break
+            if time.time() >= metrics.deadline:
+                task.cancel()
+                state.deadline_exceeded += 1
+                response_data = {"id": request_id, "success": False, "error": f"Deadline exceeded for action '{action}'"}
+                break
+    except asyncio.CancelledError:
+        task.cancel()
+        state.cancelled += 1
+        raise
+    finally:
+        if running.get(request_id) is asyncio.current_task():
+            del running[request_id]
+        if not running:
+            state.running.pop(out_queue, None)
+    await out_queue.put(response_data)
+
+
+def encode_payload(response_data) -> bytes:
+    """One JSON document without insignificant whitespace."""
+    if orjson is not None:
+        return orjson.dumps(response_data)
+    return json.dumps(response_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def encode_frame(response_data) -> bytes:
+    """One JSON line for the stdout transport."""
+    return encode_payload(response_data) + b'\n'
+
+
+async def stdout_writer(out_queue):
+    """Single writer for stdout so replies from concurrent tasks never interleave."""
+    while True:
+        response_data = await out_queue.get()
+        if response_data is None:
+            break
+        sys.stdout.buffer.write(encode_frame(response_data))
+        sys.stdout.flush()
+
+
+async def serve_stdio(state):
+    """Commands from stdin, replies on stdout; the transport used by a spawning Node process."""
     # Notify Node.js that Python service is ready
     ready_signal = {"status": "ready"}
     sys.stdout.write(json.dumps(ready_signal) + '\n')
     sys.stdout.flush()
+    state.startup_report.mark_ready()
 
-    # Process commands from stdin
+    # Every command runs as its own task so a slow command never holds up the
+    # ones queued behind it; replies are matched to requests by 'id' on the
+    # Node side and may be written in any order.
     loop = asyncio.get_event_loop()
+    out_queue = asyncio.Queue()
+    writer_task = asyncio.create_task(stdout_writer(out_queue))
+    pending_tasks = set()
     while True:
         line = await loop.run_in_executor(None, sys.stdin.readline)
         if not line:
             break # EOF
-        request_id = None
-        try:
-            command_data = json.loads(line)
-            request_id = command_data.get('id')
-            action = command_data.get('action')
-            args = command_data.get('args', {})
-            if not action:
-                raise ValueError("Missing 'action' in command")
-            if action == 'get_transaction_id':
-                # Expects 'url' and 'method' in args
-                if 'url' not in args or 'method' not in args:
-                    raise ValueError("Missing 'url' or 'method' for get_transaction_id action")
-                method = args['method']
-                url = args['url']
-                try:
-                    path = urlparse(url).path
-                    transaction_id = transaction_generator.generate_transaction_id(method=method, path=path)
-                    response_data = {"id": request_id, "success": True, "data": transaction_id}
-                except Exception as e:
-                    response_data = {"id": request_id, "success": False, "error": f"Failed to generate transaction ID: {str(e)}"}
-            else:
-                response_data = {"id": request_id, "success": False, "error": f"Unknown action '{action}'"}
-        except json.JSONDecodeError as e:
-            response_data = {"id": request_id, "success": False, "error": f"Invalid JSON command: {str(e)}"}
-        except Exception as e:
-            response_data = {"id": request_id, "success": False, "error": str(e)}
-        sys.stdout.write(json.dumps(response_data) + '\n')
+        if not line.strip():
+            continue
+        task = asyncio.create_task(run_command(line, state, out_queue))
+        pending_tasks.add(task)
+        task.add_done_callback(pending_tasks.discard)
+
+    # Drain in-flight commands before shutting down the writer
+    if pending_tasks:
+        await asyncio.gather(*pending_tasks, return_exceptions=True)
+    await out_queue.put(None)
+    await writer_task
+
+
+async def serve_socket(state):
+    """Length-prefixed frames on SOCKET_PATH until SIGTERM/SIGINT or the idle timeout."""
+    server = SocketServer(SOCKET_PATH, lambda payload, out_queue: run_command(payload, state, out_queue),
+                          encode_payload, SOCKET_IDLE_TIMEOUT)
+    try:
+        await server.start()
+    except Exception as e:
+        sys.stderr.write(f"Could not listen on {SOCKET_PATH}: {str(e)}\n")
+        sys.stdout.write(json.dumps({"id": None, "success": False, "error": str(e)}) + '\n')
+        sys.stdout.flush()
+        await server.close()
+        return
+    state.server = server
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, server.stop)
+    # Whoever started the service (possibly detached) learns the socket is up
+    sys.stdout.write(json.dumps({"status": "ready", "socket": SOCKET_PATH}) + '\n')
+    sys.stdout.flush()
+    state.startup_report.mark_ready()
+    await server.wait_stopped()
+    await server.close()
+
+
+async def main():
+    data_dir = os.getenv('TWIKIT_DATA_DIR', './twitter_data')
+    startup_report = StartupReport()
+    startup_report.mark('imports')
+
+    # Try to use Playwright-captured authentication data; accounts whose export
+    # is incomplete are left out of the pool
+    try:
+        account_dirs = parse_account_dirs(ACCOUNT_DIRS, data_dir)
+        stores = []
+        for name, account_dir in account_dirs:
+            store = SessionStore(data_dir=account_dir)
+            if not (store.has_credentials() and store.has_transaction_artifacts()):
+                sys.stderr.write(f"[{name}] Authentication or transaction generator data missing in {account_dir}; skipping.\n")
+                continue
+            stores.append((name, store))
+        if not stores:
+            sys.stderr.write("ERROR: Required authentication or transaction generator data is missing.\n")
+            sys.stderr.write("Please run playwright_login_and_export.py first and ensure you are logged in.\n")
+            sys.stdout.write(json.dumps({"id": None, "success": False, "error": "Missing authentication or transaction generator data"}) + '\n')
+            sys.stdout.flush()
+            return
+        sys.stderr.write(f"Loaded authentication data from Playwright export for {len(stores)} account(s): "
+                         f"{', '.join(name for name, _ in stores)}.\n")
+    except Exception as e:
+        sys.stderr.write(f"Error loading Playwright authentication data: {str(e)}\n")
+        sys.stdout.write(json.dumps({"id": None, "success": False, "error": str(e)}) + '\n')
         sys.stdout.flush()
+        return
+    startup_report.mark('credentials')
+
+    # The transaction generator is built off the critical path; requests that
+    # need it wait on the background task instead of delaying 'ready'.
+    # A single cache file override only makes sense for a single account
+    cache_file = TRANSACTION_CACHE_FILE if len(stores) == 1 else None
+    accounts = [AccountState(name, store, startup_report, cache_file,
+                             'transaction_generator' if i == 0 else f'transaction_generator:{name}')
+                for i, (name, store) in enumerate(stores)]
+    cache = ResponseCache(parse_ttls(CACHE_TTLS), CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+    scheduler = LaneScheduler(MAX_CONCURRENCY, parse_lane_values(LANE_WEIGHTS, DEFAULT_WEIGHTS),
+                              parse_lane_values(LANE_QUEUE_LIMITS, DEFAULT_QUEUE_LIMITS))
+    user_index_file = USER_INDEX_FILE or os.path.join(data_dir, 'user_index.jsonl')
+    user_index = UserIndex(None if user_index_file == 'off' else user_index_file, USER_INDEX_MAX_AGE)
+    local_store_file = LOCAL_STORE_FILE or os.path.join(data_dir, 'local_store.sqlite3')
+    local_store = LocalStore(None if local_store_file == 'off' else local_store_file, LOCAL_STORE_MAX_AGE)
+    state = BridgeState(accounts, startup_report, cache, scheduler, user_index, local_store)
+    background_tasks = []
+    for account in accounts:
+        account.start_transaction_generator()
+        background_tasks.append(asyncio.create_task(account.watch_session_store()))
+        background_tasks.append(asyncio.create_task(account.refresh_artifacts_periodically()))
+
+    if SOCKET_PATH:
+        await serve_socket(state)
+    else:
+        await serve_stdio(state)
+
+    for task in background_tasks:
+        task.cancel()
+    for account in accounts:
+        await account.close_session_client()
+        # Retrieve a failed background build so it isn't reported as never retrieved
+        if account.transaction_generator_task.done() and not account.transaction_generator_task.cancelled():
+            account.transaction_generator_task.exception()
+    # Let queued index and store writes finish before the database closes
+    state.store_thread.shutdown()
+    local_store.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+"""
+Persistent screen_name -> user id index.
+
+Nearly every user and list command starts by resolving a screen name to an id
+(get_user_by_screen_name with fields ['id']). User ids never change, so the
+service remembers every user it sees in any result, together with a few
+lightweight profile fields, and answers those lookups locally.
+
+Entries live in memory and in an append-only JSON-lines file, which is
+compacted when it has grown to several times the live entry count. Other
+processes sharing the file (pool workers, or a shared socket service before
+a restart) pick up each other's lines when a lookup misses.
+"""
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Optional
+
+# Profile fields kept per user; lookups asking only for these can be served locally
+INDEX_FIELDS = ('id', 'screen_name', 'name', 'profile_image_url', 'is_blue_verified', 'verified',
+                'followers_count', 'following_count', 'statuses_count')
+
+# Rewrite the file once it holds this many times more lines than live entries
+COMPACT_RATIO = 4
+COMPACT_MIN_LINES = 1000
+
+
+def collect_users(data, depth=0) -> Iterable[dict]:
+    """Serialized users anywhere in a result: pages, tweets' authors, single users."""
+    if depth > 4:
+        return
+    if isinstance(data, dict):
+        if data.get('id') and data.get('screen_name'):
+            yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from collect_users(value, depth + 1)
+    elif isinstance(data, list):
+        for value in data:
+            if isinstance(value, (dict, list)):
+                yield from collect_users(value, depth + 1)
+
+
+class UserIndex:
+    def __init__(self, path: Optional[str], max_age: float = 7 * 86400):
+        self.path = path
+        self.max_age = max_age
+        self._by_name: Dict[str, dict] = {}
+        self._lines = 0
+        self._offset = 0
+        self._inode = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.recorded = 0
+        if path:
+            self._load(full=True)
+
+    @staticmethod
+    def _key(screen_name):
+        return str(screen_name).lstrip('@').lower()
+
+    def _load(self, full=False):
+        """Read the file from the last offset, or from the start after a rewrite by another process."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if full or stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._by_name.clear()
+            self._offset = 0
+            self._lines = 0
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except OSError as e:
+            sys.stderr.write(f"Could not read user index {self.path}: {str(e)}\n")
+            return
+        # A line still being appended by another process is read next time
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get('screen_name') and entry.get('id'):
+                self._keep(entry)
+            self._lines += 1
+        self._offset += end
+
+    def _keep(self, entry):
+        key = self._key(entry['screen_name'])
+        current = self._by_name.get(key)
+        if current is None or entry.get('updated_at', 0) >= current.get('updated_at', 0):
+            self._by_name[key] = entry
+
+    def lookup(self, screen_name, refresh_stale=True) -> Optional[dict]:
+        """A fresh entry for screen_name, or None; counts as a hit or miss."""
+        key = self._key(screen_name)
+        entry = self._by_name.get(key)
+        if entry is None and self.path:
+            self._load()
+            entry = self._by_name.get(key)
+        if entry is not None and refresh_stale and time.time() - entry.get('updated_at', 0) > self.max_age:
+            self.stale += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {field: entry.get(field) for field in INDEX_FIELDS}
+
+    def record(self, data):
+        """Remember every user in a result."""
+        now = time.time()
+        new_lines = []
+        for user in collect_users(data):
+            entry = {field: user.get(field) for field in INDEX_FIELDS if field in user}
+            entry['id'] = str(entry['id'])
+            current = self._by_name.get(self._key(entry['screen_name']))
+            if current is not None:
+                # Partial projections keep the fields they didn't carry
+                entry = {**current, **entry}
+                if all(current.get(field) == entry.get(field) for field in INDEX_FIELDS) and \
+                        now - current.get('updated_at', 0) < self.max_age / 2:
+                    continue
+            entry['updated_at'] = now
+            self._keep(entry)
+            new_lines.append(json.dumps(entry, separators=(',', ':'), ensure_ascii=False))
+        if not new_lines:
+            return
+        self.recorded += len(new_lines)
+        if self.path:
+            self._append(new_lines)
+
+    def _append(self, lines):
+        payload = ('\n'.join(lines) + '\n').encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # O_APPEND keeps concurrent writers' lines whole
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            sys.stderr.write(f"Could not write user index {self.path}: {str(e)}\n")
+            return
+        self._lines += len(lines)
+        if self._lines > max(COMPACT_MIN_LINES, COMPACT_RATIO * len(self._by_name)):
+            self._compact()
+        else:
+            # Our own lines are already in memory
+            try:
+                stat = os.stat(self.path)
+                if stat.st_ino == self._inode and stat.st_size == self._offset + len(payload):
+                    self._offset = stat.st_size
+                elif self._inode is None:
+                    self._inode = stat.st_ino
+            except OSError:
+                pass
+
+    def _compact(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self._by_name.values():
+                    f.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+        except OSError as e:
+            sys.stderr.write(f"Could not compact user index {self.path}: {str(e)}\n")
+            return
+        self._inode = stat.st_ino
+        self._offset = stat.st_size
+        self._lines = len(self._by_name)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._by_name), "path": self.path, "max_age": self.max_age,
+                "hits": self.hits, "misses": self.misses, "stale": self.stale, "recorded": self.recorded,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
@@ -1,186 +1,533 @@
-import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
-import { randomUUID } from 'crypto';
 import { EventEmitter } from 'events';
+import { CommandOptions, CommandPriority, TwikitBridgeWorker, WorkerStats } from './twikitBridgeWorker.js';
 
-interface PendingRequest {
-    resolve: (value: any) => void;
-    reject: (reason?: any) => void;
-    timeout: NodeJS.Timeout;
+export { BridgeOverloadedError } from './twikitBridgeWorker.js';
+export type { CommandPriority } from './twikitBridgeWorker.js';
+
+// Where an iteration left off: the cursor of the page to read next and how
+// many of that page's items were already delivered
+export interface IterateResume {
+    cursor: string | null;
+    skip: number;
+}
+
+export interface IterateOptions {
+    count?: number;    // Page size requested upstream
+    maxPages?: number; // Defaults to the service's TWIKIT_ITERATE_MAX_PAGES
+    maxItems?: number;
+    cursor?: string;   // Start from this upstream cursor
+    resume?: IterateResume; // Continue a previous iteration exactly where it stopped
+    fields?: string[]; // Projection applied to every item, see sendCommand
+    priority?: CommandPriority; // Defaults to 'background'
+}
+
+export interface IteratePage {
+    items: any[];
+    next_cursor: string | null;
+    resume: IterateResume | null; // null after the last page
+}
+
+export interface IterateSummary {
+    pages: number;
+    items: number;
+    next_cursor: string | null;
+    resume: IterateResume | null;
+}
+
+export interface SyncOptions {
+    count?: number;      // Page size requested upstream
+    maxPages?: number;   // Defaults to the service's TWIKIT_SYNC_MAX_PAGES
+    fields?: string[];
+    subscriber?: string; // Separate high-water mark for this poller
+    reset?: boolean;     // Forget the mark and start over
+}
+
+export interface SyncResult {
+    items: any[];        // Only items newer than the previous sync, newest first
+    new_items: number;
+    high_water: string | null;
+    previous_high_water: string | null;
+    first_sync: boolean; // No mark yet: items is the newest page and sets it
+    complete: boolean;   // False when maxPages ran out before reaching the previous mark
+    pages: number;
+}
+
+export interface HashtagAnalyticsOptions {
+    since?: string;         // ISO 8601 bounds on the tweets' creation time
+    until?: string;
+    maxTweets?: number;     // Defaults to the service's TWIKIT_ANALYTICS_MAX_TWEETS
+    bucketSeconds?: number; // Initial time histogram bucket width, widened to keep at most 512 buckets
+    priority?: CommandPriority; // Defaults to 'background'
+    onProgress?: (progress: { pages: number; tweets: number }) => void;
+}
+
+export interface LocalQueryOptions {
+    userId?: string;     // Only tweets by this author (or screenName)
+    screenName?: string;
+    since?: string;      // ISO 8601 bounds on the tweets' creation time, since inclusive
+    until?: string;
+    count?: number;
+    cursor?: string;     // next_cursor of the previous page
+    fields?: string[];
+}
+
+export interface BulkOptions {
+    parallelism?: number; // Items processed at once, defaults to the service's TWIKIT_BULK_PARALLELISM
+    priority?: CommandPriority; // Defaults to 'background'
+    onProgress?: (progress: BulkProgress) => void;
 }
 
+export interface BulkItemResult {
+    id: string;
+    success: boolean;
+    data?: any;
+    error?: string;
+    skipped?: boolean; // Not attempted because the endpoint's rate limit ran out
+}
+
+export interface BulkProgress {
+    done: number;
+    total: number;
+    item: BulkItemResult;
+}
+
+export interface BulkSummary {
+    total: number;
+    succeeded: number;
+    failed: number;
+    skipped: number;
+    results: BulkItemResult[];
+}
+
+export interface TransactionIdRequest {
+    method: string;
+    url: string;
+}
+
+export interface TransactionIdResult {
+    success: boolean;
+    data?: string;
+    error?: string;
+}
+
+export interface AccountStats {
+    name: string;
+    data_dir: string;
+    generation: number;
+    healthy: boolean;
+    in_flight: number;
+    requests: number;
+    errors: number;
+    error_rate: number;
+    consecutive_errors: number;
+}
+
+// Projections matching what the v2 handlers request via user.fields / tweet.fields
+export const TWIKIT_USER_SUMMARY_FIELDS = ['id', 'screen_name', 'name', 'followers_count', 'following_count', 'statuses_count'];
+export const TWIKIT_TWEET_SUMMARY_FIELDS = [
+    'id', 'created_at', 'text', 'user.id', 'user.screen_name',
+    'reply_count', 'retweet_count', 'favorite_count', 'quote_count', 'view_count',
+];
+
 export class TwikitBridgeClient extends EventEmitter {
-    private pythonProcess: ChildProcessWithoutNullStreams | null = null;
-    private pendingRequests: Map<string, PendingRequest> = new Map();
+    private workers: TwikitBridgeWorker[] = [];
     private pythonScriptPath: string = 'python_bridge/twikit_service.py'; // Relative to project root
     private command: string; // Was: 'python3', now set by constructor
     private requestTimeoutMs: number = 30000; // 30 seconds
-    private serviceReady: boolean = false;
+    private uploadTimeoutMs: number = parseInt(process.env.TWIKIT_UPLOAD_TIMEOUT_MS || '900000', 10); // Includes video processing
+    private workerCount: number;
+    // Unix socket of a shared service (see twikit_service.py TWIKIT_SOCKET_PATH) used instead of child processes
+    private socketPath: string | undefined = process.env.TWIKIT_BRIDGE_SOCKET || undefined;
+    private healthCheckIntervalMs: number = parseInt(process.env.TWIKIT_BRIDGE_HEALTH_INTERVAL_MS || '15000', 10);
+    private healthCheckTimeoutMs: number = 5000;
+    private maxHealthFailures: number = 3; // Consecutive failed checks before a worker is restarted
+    private healthFailures: Map<number, number> = new Map();
+    private restartAttempts: Map<number, number> = new Map();
+    private healthTimer: NodeJS.Timeout | null = null;
+    private stopping: boolean = false;
     private serviceReadyPromise: Promise<void>;
     private resolveServiceReady!: () => void;
     private rejectServiceReady!: (reason?: any) => void;
 
-    constructor(pythonExecutablePath: string) {
+    constructor(pythonExecutablePath: string, workerCount?: number) {
         super();
         this.command = pythonExecutablePath;
+        // Several processes share the credential data dir; one process is bound to one core by the GIL
+        this.workerCount = Math.max(1, workerCount ?? parseInt(process.env.TWIKIT_BRIDGE_WORKERS || '1', 10));
+        if (this.socketPath) {
+            // One multiplexed connection carries any number of concurrent requests
+            this.workerCount = 1;
+        }
         this.serviceReadyPromise = new Promise((resolve, reject) => {
             this.resolveServiceReady = resolve;
             this.rejectServiceReady = reject;
         });
+        // Avoid an unhandled rejection when nobody is waiting on readiness yet
+        this.serviceReadyPromise.catch(() => {});
     }
 
-    public async startService(): Promise<void> {
-        return new Promise<void>((resolve, reject) => {
-            this.pythonProcess = spawn(this.command, [this.pythonScriptPath], {
-                env: { ...process.env },
-                cwd: process.cwd(), // Ensure script is found relative to project root
-            });
+    private createWorker(index: number): TwikitBridgeWorker {
+        const env: NodeJS.ProcessEnv = { ...process.env, TWIKIT_WORKER_INDEX: String(index) };
+        if (index > 0) {
+            // Worker 0 polls x.com for a rotated ondemand.s bundle; the others
+            // pick up the rewritten artifacts through the session store watcher
+            env.TWIKIT_ARTIFACT_REFRESH_INTERVAL = '0';
+        }
+        const worker = new TwikitBridgeWorker(index, this.command, this.pythonScriptPath, env, this.requestTimeoutMs, this.socketPath);
+        worker.on('meta', (requestId, meta, account) => this.emit('meta', requestId, meta, account));
+        worker.on('ready', () => {
+            this.restartAttempts.set(index, 0);
+            this.healthFailures.set(index, 0);
+            this.resolveServiceReady();
+            this.emit('worker-ready', index);
+        });
+        worker.on('exit', (code, signal) => {
+            this.emit('exit', code, signal, index);
+            if (!this.stopping) this.scheduleRestart(worker);
+        });
+        return worker;
+    }
 
-            let stdoutBuffer = '';
-
-            this.pythonProcess.stdout.on('data', (data) => {
-                stdoutBuffer += data.toString();
-                let newlineIndex;
-                while ((newlineIndex = stdoutBuffer.indexOf('\n')) !== -1) {
-                    const line = stdoutBuffer.substring(0, newlineIndex);
-                    stdoutBuffer = stdoutBuffer.substring(newlineIndex + 1);
-                    try {
-                        const response = JSON.parse(line);
-                        if (response.status === 'ready') {
-                            this.serviceReady = true;
-                            this.resolveServiceReady(); 
-                            resolve(); // Resolve startService promise
-                            this.emit('ready');
-                            return; // Don't process as a regular response
-                        }
-
-                        const requestId = response.id;
-                        if (this.pendingRequests.has(requestId)) {
-                            const request = this.pendingRequests.get(requestId)!;
-                            clearTimeout(request.timeout);
-                            if (response.success) {
-                                request.resolve(response.data);
-                            } else {
-                                request.reject(new Error(response.error || 'Unknown Python error'));
-                            }
-                            this.pendingRequests.delete(requestId);
-                        } else if (response.id === null && !response.success && response.error && response.error.includes('Missing TWIKIT_USERNAME')){
-                            // This is an initialization error from Python before service is ready
-                            console.error(`[TwikitBridgeClient] Python service initialization error: ${response.error}`);
-                            this.rejectServiceReady(new Error(response.error));
-                            reject(new Error(response.error)); // Reject startService promise for critical init errors
-                        }
-                    } catch (e) {
-                        console.error(`[TwikitBridgeClient] Error parsing JSON from Python: ${line}`, e);
-                    }
-                }
-            });
+    private scheduleRestart(worker: TwikitBridgeWorker) {
+        const attempt = this.restartAttempts.get(worker.index) ?? 0;
+        this.restartAttempts.set(worker.index, attempt + 1);
+        const delay = Math.min(30000, 1000 * 2 ** attempt);
+        console.error(`[TwikitBridgeClient] Restarting worker ${worker.index} in ${delay} ms.`);
+        setTimeout(() => {
+            if (this.stopping || worker.isReady) return;
+            worker.restarts++;
+            // A failed start ends in 'exit', which schedules the next attempt
+            worker.start().catch(() => {});
+        }, delay);
+    }
 
-            this.pythonProcess.stderr.on('data', (data) => {
-                console.error(`[TwikitBridgeClient] [Python stderr]: ${data.toString()}`);
-            });
+    public async startService(): Promise<void> {
+        this.stopping = false;
+        this.workers = Array.from({ length: this.workerCount }, (_, index) => this.createWorker(index));
+        const starts = this.workers.map(worker => worker.start());
+        try {
+            // Serve as soon as one worker is up; the rest join the pool when ready
+            await Promise.any(starts);
+        } catch (error) {
+            const err = (error as AggregateError).errors?.[0] ?? error;
+            this.rejectServiceReady(err);
+            await this.stopService();
+            throw err;
+        }
+        starts.forEach(start => start.catch(() => {})); // Failures are handled by respawn
+        this.healthTimer = setInterval(() => this.checkHealth(), this.healthCheckIntervalMs);
+        this.healthTimer.unref();
+        this.emit('ready');
+    }
 
-            this.pythonProcess.on('exit', (code, signal) => {
-                const exitError = new Error(`Python service exited with code ${code} and signal ${signal}`);
-                console.error(`[TwikitBridgeClient] Python service exited. Code: ${code}, Signal: ${signal}`);
-                this.serviceReady = false;
-                this.pythonProcess = null;
-                this.pendingRequests.forEach(request => {
-                    clearTimeout(request.timeout);
-                    request.reject(exitError);
-                });
-                this.pendingRequests.clear();
-                if (!this.serviceReadyPromise) { // if startService hasn't resolved/rejected yet
-                     this.rejectServiceReady(exitError);
-                     reject(exitError);
-                }
-                this.emit('exit', code, signal);
-            });
+    private async checkHealth() {
+        await Promise.all(this.workers.filter(worker => worker.isReady).map(async worker => {
+            if (await worker.healthCheck(this.healthCheckTimeoutMs)) {
+                this.healthFailures.set(worker.index, 0);
+                return;
+            }
+            const failures = (this.healthFailures.get(worker.index) ?? 0) + 1;
+            this.healthFailures.set(worker.index, failures);
+            if (failures >= this.maxHealthFailures) {
+                console.error(`[TwikitBridgeClient] Worker ${worker.index} failed ${failures} health checks; restarting it.`);
+                this.healthFailures.set(worker.index, 0);
+                await worker.stop(); // The exit handler fails its requests and schedules the respawn
+            }
+        }));
+    }
 
-            this.pythonProcess.on('error', (err) => {
-                console.error('[TwikitBridgeClient] Failed to start Python service:', err);
-                this.serviceReady = false;
-                this.pythonProcess = null;
-                this.rejectServiceReady(err);
-                reject(err); // Reject startService promise
-            });
+    public async stopService(): Promise<void> {
+        this.stopping = true;
+        if (this.healthTimer) {
+            clearInterval(this.healthTimer);
+            this.healthTimer = null;
+        }
+        await Promise.all(this.workers.map(worker => worker.stop()));
+    }
 
-            // Timeout for service readiness itself
-            const readyTimeout = setTimeout(() => {
-                if (!this.serviceReady) {
-                    const err = new Error('Python service did not become ready in time');
-                    console.error('[TwikitBridgeClient]', err);
-                    this.rejectServiceReady(err);
-                    reject(err);
-                    this.stopService();
-                }
+    /** Least outstanding requests among ready workers, preferring ones passing health checks. */
+    private pickWorker(): TwikitBridgeWorker | null {
+        const ready = this.workers.filter(worker => worker.isReady);
+        const healthy = ready.filter(worker => worker.healthy);
+        const candidates = healthy.length > 0 ? healthy : ready;
+        if (candidates.length === 0) return null;
+        return candidates.reduce((best, worker) => worker.outstanding < best.outstanding ? worker : best);
+    }
+
+    private async waitForWorker(): Promise<TwikitBridgeWorker> {
+        await this.serviceReadyPromise; // Wait for service to be ready if not already
+        const worker = this.pickWorker();
+        if (worker) return worker;
+        // Every worker is restarting; wait for the first to come back
+        return new Promise((resolve, reject) => {
+            const onReady = () => {
+                const next = this.pickWorker();
+                if (!next) return;
+                clearTimeout(timeout);
+                this.off('worker-ready', onReady);
+                resolve(next);
+            };
+            const timeout = setTimeout(() => {
+                this.off('worker-ready', onReady);
+                reject(new Error('Python service is not running or not ready.'));
             }, this.requestTimeoutMs);
+            this.on('worker-ready', onReady);
+        });
+    }
 
-            this.serviceReadyPromise.finally(() => clearTimeout(readyTimeout));
+    public async sendCommand(action: string, args: any = {}, options: CommandOptions = {}): Promise<any> {
+        const worker = await this.waitForWorker();
+        let staleTags: string[] = [];
+        const data = await worker.sendCommand(action, args, {
+            ...options,
+            onMeta: (meta) => {
+                staleTags = meta.invalidated ?? [];
+                options.onMeta?.(meta);
+            },
         });
+        if (staleTags.length > 0) {
+            // Each worker caches reads itself: drop what this write made stale in
+            // the others before the caller can issue a read that lands on one of them
+            await this.invalidateElsewhere(worker, staleTags);
+        }
+        return data;
     }
 
-    public async stopService(): Promise<void> {
-        if (this.pythonProcess) {
-            this.pythonProcess.kill('SIGTERM'); // Send SIGTERM for graceful shutdown
-            // Add a timeout for SIGKILL if it doesn't exit gracefully
-            await new Promise(resolve => setTimeout(resolve, 1000)); // Wait a bit
-            if (this.pythonProcess && !this.pythonProcess.killed) {
-                this.pythonProcess.kill('SIGKILL');
+    private async invalidateElsewhere(source: TwikitBridgeWorker, tags: string[]): Promise<void> {
+        // Workers that aren't ready come back with an empty cache
+        const others = this.workers.filter(worker => worker !== source && worker.isReady);
+        const results = await Promise.allSettled(others.map(worker => worker.sendCommand('invalidate_cache', { tags })));
+        results.forEach((result, i) => {
+            if (result.status === 'rejected') {
+                console.error(`[TwikitBridgeClient] Failed to invalidate cache on worker ${others[i].index}:`, result.reason);
             }
-            this.pythonProcess = null;
-        }
-        this.serviceReady = false;
+        });
     }
 
-    public async sendCommand(action: string, args: any = {}): Promise<any> {
-        if (!this.pythonProcess || !this.pythonProcess.stdin || !this.serviceReady) {
-            await this.serviceReadyPromise; // Wait for service to be ready if not already
-            if (!this.pythonProcess || !this.pythonProcess.stdin || !this.serviceReady) {
-                 throw new Error('Python service is not running or not ready.');
+    /** Run a command on every ready worker, e.g. to collect or reset per-process state. */
+    public async broadcast(action: string, args: any = {}): Promise<any[]> {
+        await this.serviceReadyPromise;
+        const ready = this.workers.filter(worker => worker.isReady);
+        return Promise.all(ready.map(worker => worker.sendCommand(action, args)));
+    }
+
+    getWorkerStats(): WorkerStats[] {
+        return this.workers.map(worker => worker.stats());
+    }
+
+    async getTransactionId(method: string, url: string): Promise<string> {
+        return this.sendCommand('get_transaction_id', { method, url });
+    }
+
+    async getTransactionIds(items: TransactionIdRequest[]): Promise<TransactionIdResult[]> {
+        // One round trip for the whole batch; each item carries its own success/error
+        return this.sendCommand('get_transaction_ids', { items });
+    }
+
+    async refreshTransactionArtifacts(account?: string): Promise<{ changed: boolean; accounts: Record<string, boolean> }> {
+        // Ask the service to check for a rotated ondemand.s bundle now instead of waiting for its refresher
+        return this.sendCommand('refresh_transaction_artifacts', account ? { account } : {});
+    }
+
+    async getAccountStats(): Promise<AccountStats[]> {
+        // Per-account in-flight counts, error rates and health of the Python account pool,
+        // summed over the worker processes.
+        // Any command may name an account with args.account; writes without one use the first account.
+        const perWorker: AccountStats[][] = await this.broadcast('get_account_stats');
+        const merged = new Map<string, AccountStats>();
+        for (const accounts of perWorker) {
+            for (const account of accounts) {
+                const total = merged.get(account.name);
+                if (!total) {
+                    merged.set(account.name, { ...account });
+                    continue;
+                }
+                total.generation = Math.max(total.generation, account.generation);
+                total.healthy = total.healthy || account.healthy;
+                total.in_flight += account.in_flight;
+                total.requests += account.requests;
+                total.errors += account.errors;
+                total.consecutive_errors = Math.max(total.consecutive_errors, account.consecutive_errors);
             }
         }
+        for (const total of merged.values()) {
+            total.error_rate = total.requests ? Math.round(total.errors / total.requests * 10000) / 10000 : 0;
+        }
+        return [...merged.values()];
+    }
 
-        const requestId = randomUUID();
-        const command = { id: requestId, action, args };
+    async getStartupReport(): Promise<any[]> {
+        // Phase timings (ms since Python process start) and heavy modules loaded before 'ready', per worker
+        return this.broadcast('get_startup_report');
+    }
 
-        return new Promise((resolve, reject) => {
-            const timeout = setTimeout(() => {
-                if (this.pendingRequests.has(requestId)) {
-                    this.pendingRequests.delete(requestId);
-                    reject(new Error(`Request to Python service timed out for action: ${action}`));
-                }
-            }, this.requestTimeoutMs);
+    async getCacheStats(): Promise<any> {
+        // Hit/miss/eviction counts of the bridge's read cache, overall and per action,
+        // plus how many reads were coalesced into another in-flight call.
+        // Each worker has its own cache; totals are summed and per-worker stats kept under `workers`.
+        const workers: any[] = await this.broadcast('get_cache_stats');
+        const totals: any = { workers };
+        for (const key of ['entries', 'bytes', 'hits', 'misses', 'evictions', 'expirations', 'invalidations']) {
+            totals[key] = workers.reduce((sum, stats) => sum + (stats[key] ?? 0), 0);
+        }
+        const lookups = totals.hits + totals.misses;
+        totals.hit_rate = lookups ? Math.round(totals.hits / lookups * 10000) / 10000 : 0;
+        return totals;
+    }
 
-            this.pendingRequests.set(requestId, { resolve, reject, timeout });
+    async getQueueStats(): Promise<any[]> {
+        // Slots in use and queue depth per priority lane (interactive/default/background),
+        // one entry per worker process
+        return this.broadcast('get_queue_stats');
+    }
+
+    async clearCache(): Promise<{ removed: number }> {
+        const results: { removed: number }[] = await this.broadcast('clear_cache');
+        return { removed: results.reduce((sum, result) => sum + result.removed, 0) };
+    }
 
-            try {
-                 if (this.pythonProcess && this.pythonProcess.stdin) {
-                    this.pythonProcess.stdin.write(JSON.stringify(command) + '\n');
-                } else {
-                    throw new Error("Python process stdin not available.")
+    /**
+     * Stream a paged read: the service walks the cursors itself and sends one frame
+     * per page under a single request id. Yields each page as it arrives and returns
+     * the terminal summary, whose resume marker continues the iteration (also after
+     * maxItems stopped it part-way through a page).
+     */
+    public async *iterate(action: string, args: any = {}, options: IterateOptions = {}): AsyncGenerator<IteratePage, IterateSummary, void> {
+        const pages: IteratePage[] = [];
+        let finished = false;
+        let error: any = null;
+        let summary: IterateSummary | undefined;
+        let wake: (() => void) | null = null;
+        const notify = () => {
+            const resume = wake;
+            wake = null;
+            if (resume) resume();
+        };
+
+        const iterArgs: any = { ...args };
+        if (options.count !== undefined) iterArgs.count = options.count;
+        if (options.maxPages !== undefined) iterArgs.max_pages = options.maxPages;
+        if (options.maxItems !== undefined) iterArgs.max_items = options.maxItems;
+        if (options.cursor !== undefined) iterArgs.cursor = options.cursor;
+        if (options.resume) {
+            iterArgs.cursor = options.resume.cursor;
+            iterArgs.skip = options.resume.skip;
+        }
+        if (options.fields !== undefined) iterArgs.fields = options.fields;
+
+        // A consumer that stops early (break/return) cancels the remaining pages in the service
+        const abort = new AbortController();
+        this.sendCommand(action, iterArgs, {
+            mode: 'iterate',
+            priority: options.priority,
+            signal: abort.signal,
+            onFrame: (frame) => {
+                pages.push(frame.data);
+                notify();
+            },
+        }).then(
+            (result) => { summary = result; finished = true; notify(); },
+            (err) => { error = err; finished = true; notify(); },
+        );
+
+        try {
+            while (true) {
+                if (pages.length > 0) {
+                    yield pages.shift()!;
+                    continue;
                 }
-            } catch (error) {
-                clearTimeout(timeout);
-                this.pendingRequests.delete(requestId);
-                reject(error);
+                if (finished) {
+                    if (error) throw error;
+                    return summary!;
+                }
+                await new Promise<void>(resolve => { wake = resolve; });
             }
-        });
+        } finally {
+            if (!finished) abort.abort();
+        }
+    }
+
+    iterateSearchTweet(query: string, search_type: string, options: IterateOptions = {}) {
+        return this.iterate('search_tweet', { query, search_type }, options);
+    }
+
+    iterateUserFollowers(user_id: string, options: IterateOptions = {}) {
+        return this.iterate('get_user_followers', { user_id }, options);
     }
 
-    // --- Twikit specific methods will go here ---
-    // Example:
-    async searchTweet(query: string, search_type: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('search_tweet', { query, search_type, count, cursor });
+    iterateUserFollowing(user_id: string, options: IterateOptions = {}) {
+        return this.iterate('get_user_following', { user_id }, options);
     }
 
-    async getUserByScreenName(screen_name: string): Promise<any> {
-        return this.sendCommand('get_user_by_screen_name', { screen_name });
+    iterateListMembers(list_id: string, options: IterateOptions = {}) {
+        return this.iterate('get_list_members', { list_id }, options);
     }
 
-    async getUserTweets(user_id: string, tweet_type: string = 'Tweets', count: number = 20, cursor?: string ): Promise<any> {
+    iterateRetweeters(tweet_id: string, options: IterateOptions = {}) {
+        return this.iterate('get_retweeters', { tweet_id }, options);
+    }
+
+    // --- Twikit specific methods ---
+    // Dispatched by python_bridge/twikit_actions.py through one shared twikit.Client.
+    // Tweets, users and lists come back with a fixed set of fields; the optional
+    // `fields` argument (dotted for nested objects, e.g. ['id', 'user.screen_name'])
+    // trims results, or each item of a page, to just those fields.
+    async searchTweet(query: string, search_type: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('search_tweet', { query, search_type, count, cursor, fields });
+    }
+
+    async getUserByScreenName(screen_name: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_user_by_screen_name', { screen_name, fields });
+    }
+
+    /**
+     * Resolve many screen names to user ids, from the bridge's persistent user
+     * index where possible. Returns { users, errors, index_hits, lookups }.
+     */
+    async resolveScreenNames(screen_names: string[], refresh: boolean = false): Promise<any> {
+        return this.sendCommand('resolve_screen_names', { screen_names, refresh });
+    }
+
+    /**
+     * Search tweets the bridge has already fetched (its local SQLite store),
+     * newest first, without an upstream call. Every word of the query must
+     * match; "quoted" phrases match as a whole.
+     */
+    async localSearch(query: string, options: LocalQueryOptions = {}): Promise<any> {
+        return this.sendCommand('local_search', { query, ...this.localQueryArgs(options) });
+    }
+
+    /** An author's tweets from the bridge's local store, newest first, without an upstream call. */
+    async localTimeline(options: LocalQueryOptions): Promise<any> {
+        return this.sendCommand('local_timeline', this.localQueryArgs(options));
+    }
+
+    private localQueryArgs({ userId, screenName, since, until, count, cursor, fields }: LocalQueryOptions): any {
+        return { user_id: userId, screen_name: screenName, since, until, count, cursor, fields };
+    }
+
+    /**
+     * Tweets posted since the previous syncUserTweets of this user (and tweet
+     * type); the service keeps the high-water mark and stops paging at it,
+     * so polling costs one request when nothing is new.
+     */
+    async syncUserTweets(user_id: string, tweet_type: string = 'Tweets', options: SyncOptions = {}): Promise<SyncResult> {
+        return this.sendCommand('get_user_tweets', { user_id, type: tweet_type, ...this.syncArgs(options) }, { mode: 'sync' });
+    }
+
+    /** Latest search results posted since the previous syncSearch of the same query, see syncUserTweets. */
+    async syncSearch(query: string, options: SyncOptions = {}): Promise<SyncResult> {
+        return this.sendCommand('search_tweet', { query, search_type: 'Latest', ...this.syncArgs(options) }, { mode: 'sync' });
+    }
+
+    private syncArgs({ count, maxPages, fields, subscriber, reset }: SyncOptions): any {
+        return { count, max_pages: maxPages, fields, subscriber, reset };
+    }
+
+    async getUserTweets(user_id: string, tweet_type: string = 'Tweets', count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
         // Note: `twikit` get_user_tweets takes `user_id`, `type`, `count`, `cursor`
         // `type` in twikit is 'Tweets', 'TweetsAndReplies', 'Media'
-        return this.sendCommand('get_user_tweets', { user_id, type: tweet_type, count, cursor });
+        return this.sendCommand('get_user_tweets', { user_id, type: tweet_type, count, cursor, fields });
     }
     
     async createTweet(text: string, media_ids?: string[], reply_to?: string, poll?: any): Promise<any> {
@@ -191,8 +538,8 @@ export class TwikitBridgeClient extends EventEmitter {
         return this.sendCommand('create_tweet', args);
     }
 
-    async getTweetById(id: string): Promise<any> {
-        return this.sendCommand('get_tweet_by_id', { id });
+    async getTweetById(id: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_tweet_by_id', { id, fields });
     }
 
     async deleteTweet(id: string): Promise<any> {
@@ -215,12 +562,12 @@ export class TwikitBridgeClient extends EventEmitter {
         return this.sendCommand('delete_retweet', { tweet_id });
     }
 
-    async getRetweeters(tweet_id: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('get_retweeters', { tweet_id, count, cursor });
+    async getRetweeters(tweet_id: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_retweeters', { tweet_id, count, cursor, fields });
     }
 
-    async getUserFavorites(user_id: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('get_user_favorites', { user_id, count, cursor });
+    async getUserFavorites(user_id: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_user_favorites', { user_id, count, cursor, fields });
     }
 
     async followUser(user_id: string): Promise<any> {
@@ -231,19 +578,62 @@ export class TwikitBridgeClient extends EventEmitter {
         return this.sendCommand('unfollow_user', { user_id });
     }
 
-    async getUserFollowers(user_id: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('get_user_followers', { user_id, count, cursor });
+    async getUserFollowers(user_id: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_user_followers', { user_id, count, cursor, fields });
+    }
+
+    async getUserFollowing(user_id: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_user_following', { user_id, count, cursor, fields });
+    }
+
+    /**
+     * Run a bulk write in the service: one command for the whole id list, with
+     * a progress frame per finished item and a per-item summary at the end.
+     */
+    private bulk(action: string, args: any, options: BulkOptions): Promise<BulkSummary> {
+        const bulkArgs: any = { ...args };
+        if (options.parallelism !== undefined) bulkArgs.parallelism = options.parallelism;
+        return this.sendCommand(action, bulkArgs, {
+            priority: options.priority,
+            onFrame: (frame) => options.onProgress?.({ done: frame.done, total: frame.total, item: frame.item }),
+        });
+    }
+
+    async bulkAddListMembers(list_id: string, user_ids: string[], options: BulkOptions = {}): Promise<BulkSummary> {
+        return this.bulk('bulk_add_list_members', { list_id, user_ids }, options);
+    }
+
+    async bulkFollow(user_ids: string[], options: BulkOptions = {}): Promise<BulkSummary> {
+        return this.bulk('bulk_follow', { user_ids }, options);
+    }
+
+    async bulkFavorite(tweet_ids: string[], options: BulkOptions = {}): Promise<BulkSummary> {
+        return this.bulk('bulk_favorite', { tweet_ids }, options);
     }
 
-    async getUserFollowing(user_id: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('get_user_following', { user_id, count, cursor });
+    /**
+     * Counts, engagement sums and percentiles, top authors, co-occurring
+     * hashtags and a time histogram over Latest search results for a hashtag.
+     * The service folds one page at a time into fixed-size aggregates, so
+     * large reports don't hold the tweets in memory on either side.
+     */
+    async hashtagAnalytics(hashtag: string, options: HashtagAnalyticsOptions = {}): Promise<any> {
+        const { since, until, maxTweets, bucketSeconds, priority, onProgress } = options;
+        return this.sendCommand('hashtag_analytics',
+            { hashtag, since, until, max_tweets: maxTweets, bucket_seconds: bucketSeconds }, {
+                priority,
+                // Progress frames also keep the request's timeout from firing on long reports
+                onFrame: (frame) => onProgress?.({ pages: frame.pages, tweets: frame.tweets }),
+            });
     }
 
     async uploadMedia(path: string, mediaType?: string): Promise<string> {
-        // Returns a media_id string
+        // Returns a media_id string. The service streams the file in concurrent
+        // segments and resumes an interrupted upload of the same file.
         const args: any = { path };
         if (mediaType) args.media_type = mediaType;
-        return this.sendCommand('upload_media', args);
+        const result = await this.sendCommand('upload_media', args, { timeoutMs: this.uploadTimeoutMs });
+        return result.media_id;
     }
 
     async createList(name: string, description?: string, privateList?: boolean): Promise<any> {
@@ -261,12 +651,12 @@ export class TwikitBridgeClient extends EventEmitter {
         return this.sendCommand('remove_list_member', { list_id, user_id });
     }
 
-    async getListMembers(list_id: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('get_list_members', { list_id, count, cursor });
+    async getListMembers(list_id: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_list_members', { list_id, count, cursor, fields });
     }
 
-    async getUserLists(user_id: string, count: number = 20, cursor?: string): Promise<any> {
-        return this.sendCommand('get_user_lists', { user_id, count, cursor });
+    async getUserLists(user_id: string, count: number = 20, cursor?: string, fields?: string[]): Promise<any> {
+        return this.sendCommand('get_user_lists', { user_id, count, cursor, fields });
     }
 
     // Add other methods corresponding to twikit.Client methods you plan to use
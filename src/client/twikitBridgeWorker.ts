@@ -0,0 +1,457 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import { randomUUID } from 'crypto';
+import { EventEmitter } from 'events';
+import { createConnection, Socket } from 'net';
+
+interface PendingRequest {
+    resolve: (value: any) => void;
+    reject: (reason?: any) => void;
+    timeout: NodeJS.Timeout;
+    action: string;
+    onFrame?: (frame: any) => void; // Intermediate frames of streamed commands ('iterate' mode, bulk actions, hashtag_analytics)
+    onMeta?: (meta: any) => void;
+}
+
+export type CommandPriority = 'interactive' | 'default' | 'background';
+
+export interface CommandOptions {
+    mode?: 'iterate' | 'sync';
+    // Scheduling lane in the service; by default writes are interactive and iterate commands background
+    priority?: CommandPriority;
+    onFrame?: (frame: any) => void;
+    onMeta?: (meta: any) => void; // Called with the reply's meta before the command settles
+    signal?: AbortSignal; // Aborting rejects the request and cancels it in the service
+    timeoutMs?: number;   // Overrides the worker's request timeout, e.g. for uploads
+}
+
+export interface WorkerStats {
+    index: number;
+    pid: number | null;
+    ready: boolean;
+    healthy: boolean;
+    outstanding: number;
+    completed: number;
+    restarts: number;
+    lastHealthCheckMs: number | null;
+}
+
+// Requests a worker may have outstanding before new ones are rejected as overloaded
+const MAX_PENDING_REQUESTS = parseInt(process.env.TWIKIT_BRIDGE_MAX_PENDING || '1024', 10);
+
+/** Rejection of a command because a queue on the way to the service is full. */
+export class BridgeOverloadedError extends Error {
+    readonly code = 'OVERLOADED';
+
+    constructor(message: string, readonly lane?: string) {
+        super(message);
+        this.name = 'BridgeOverloadedError';
+    }
+}
+
+// Socket transport frames: 4-byte big-endian payload length, then one JSON document
+const FRAME_HEADER_BYTES = 4;
+
+/**
+ * One twikit_service.py process. Requests sent to it are tracked in its own
+ * pending map, so when the process dies only its in-flight requests fail.
+ *
+ * With a socketPath the worker is instead a connection to a shared service
+ * listening on that Unix socket (TWIKIT_SOCKET_PATH), which it starts as a
+ * detached process if nothing is listening yet. Stopping the worker only
+ * closes the connection; the service keeps serving its other clients.
+ *
+ * Events: 'ready', 'exit' (code, signal, wasReady), 'meta' (requestId, meta, account)
+ */
+export class TwikitBridgeWorker extends EventEmitter {
+    public readonly index: number;
+    public restarts: number = 0;
+    public completed: number = 0;
+    public healthy: boolean = true;
+    public lastHealthCheckMs: number | null = null;
+    private pythonProcess: ChildProcessWithoutNullStreams | null = null;
+    private socket: Socket | null = null;
+    private pendingRequests: Map<string, PendingRequest> = new Map();
+    private ready: boolean = false;
+
+    constructor(
+        index: number,
+        private command: string,
+        private scriptPath: string,
+        private env: NodeJS.ProcessEnv,
+        private requestTimeoutMs: number,
+        private socketPath?: string,
+    ) {
+        super();
+        this.index = index;
+    }
+
+    get isReady(): boolean {
+        return this.ready && (this.pythonProcess !== null || this.socket !== null);
+    }
+
+    get outstanding(): number {
+        return this.pendingRequests.size;
+    }
+
+    get pid(): number | null {
+        return this.pythonProcess?.pid ?? null;
+    }
+
+    /** Spawn the process; resolves on its 'ready' line, rejects if it exits or reports an error first. */
+    public start(): Promise<void> {
+        if (this.socketPath) return this.connect(this.socketPath);
+        return new Promise<void>((resolve, reject) => {
+            let settled = false;
+            const settle = (err?: Error) => {
+                if (settled) return;
+                settled = true;
+                clearTimeout(readyTimeout);
+                if (err) reject(err); else resolve();
+            };
+
+            this.ready = false;
+            this.healthy = true;
+            const pythonProcess = spawn(this.command, [this.scriptPath], {
+                env: this.env,
+                cwd: process.cwd(), // Ensure script is found relative to project root
+            });
+            this.pythonProcess = pythonProcess;
+
+            let stdoutBuffer = '';
+
+            pythonProcess.stdout.on('data', (data) => {
+                stdoutBuffer += data.toString();
+                let newlineIndex;
+                while ((newlineIndex = stdoutBuffer.indexOf('\n')) !== -1) {
+                    const line = stdoutBuffer.substring(0, newlineIndex);
+                    stdoutBuffer = stdoutBuffer.substring(newlineIndex + 1);
+                    this.handleMessage(line, settle);
+                }
+            });
+
+            pythonProcess.stderr.on('data', (data) => {
+                console.error(`[TwikitBridgeClient] [worker ${this.index}] [Python stderr]: ${data.toString()}`);
+            });
+
+            pythonProcess.on('exit', (code, signal) => {
+                const wasReady = this.ready;
+                const exitError = new Error(`Python service worker ${this.index} exited with code ${code} and signal ${signal}`);
+                console.error(`[TwikitBridgeClient] [worker ${this.index}] Python service exited. Code: ${code}, Signal: ${signal}`);
+                this.ready = false;
+                if (this.pythonProcess === pythonProcess) this.pythonProcess = null;
+                // Only this worker's requests are affected
+                this.failPending(exitError);
+                settle(exitError);
+                this.emit('exit', code, signal, wasReady);
+            });
+
+            pythonProcess.on('error', (err) => {
+                console.error(`[TwikitBridgeClient] [worker ${this.index}] Failed to start Python service:`, err);
+                this.ready = false;
+                if (this.pythonProcess === pythonProcess) this.pythonProcess = null;
+                settle(err);
+            });
+
+            // Timeout for service readiness itself
+            const readyTimeout = setTimeout(() => {
+                if (!this.ready) {
+                    const err = new Error(`Python service worker ${this.index} did not become ready in time`);
+                    console.error('[TwikitBridgeClient]', err);
+                    settle(err);
+                    this.stop();
+                }
+            }, this.requestTimeoutMs);
+        });
+    }
+
+    /**
+     * Connect to the shared service on socketPath, starting it if nothing
+     * listens there yet. Several clients racing to start it is harmless: the
+     * service holds a lock on the path and all but one of them exit.
+     */
+    private async connect(socketPath: string): Promise<void> {
+        const deadline = Date.now() + this.requestTimeoutMs;
+        let spawned = false;
+        for (;;) {
+            try {
+                return await this.openSocket(socketPath);
+            } catch (error: any) {
+                const absent = error?.code === 'ENOENT' || error?.code === 'ECONNREFUSED';
+                if (!absent || Date.now() >= deadline) {
+                    // Same outcome as a spawned process exiting, so the pool retries later
+                    this.emit('exit', null, null, false);
+                    throw error;
+                }
+                if (!spawned) {
+                    this.spawnSharedService(socketPath);
+                    spawned = true;
+                }
+                await new Promise(resolve => setTimeout(resolve, 200));
+            }
+        }
+    }
+
+    private spawnSharedService(socketPath: string) {
+        console.error(`[TwikitBridgeClient] [worker ${this.index}] Starting shared Python service on ${socketPath}`);
+        const service = spawn(this.command, [this.scriptPath], {
+            env: { ...this.env, TWIKIT_SOCKET_PATH: socketPath },
+            cwd: process.cwd(),
+            detached: true, // Outlives this process; other clients may be using it
+            stdio: 'ignore',
+        });
+        service.on('error', (err) => {
+            console.error(`[TwikitBridgeClient] [worker ${this.index}] Failed to start shared Python service:`, err);
+        });
+        service.unref();
+    }
+
+    private openSocket(socketPath: string): Promise<void> {
+        return new Promise<void>((resolve, reject) => {
+            let settled = false;
+            let connected = false;
+            const settle = (err?: Error) => {
+                if (settled) return;
+                settled = true;
+                clearTimeout(readyTimeout);
+                if (err) reject(err); else resolve();
+            };
+
+            this.ready = false;
+            this.healthy = true;
+            const socket = createConnection(socketPath);
+            let buffer = Buffer.alloc(0);
+
+            socket.on('connect', () => {
+                connected = true;
+                this.socket = socket;
+            });
+
+            socket.on('data', (chunk: Buffer) => {
+                buffer = buffer.length === 0 ? chunk : Buffer.concat([buffer, chunk]);
+                while (buffer.length >= FRAME_HEADER_BYTES) {
+                    const length = buffer.readUInt32BE(0);
+                    if (buffer.length < FRAME_HEADER_BYTES + length) break;
+                    const payload = buffer.subarray(FRAME_HEADER_BYTES, FRAME_HEADER_BYTES + length);
+                    buffer = buffer.subarray(FRAME_HEADER_BYTES + length);
+                    this.handleMessage(payload.toString('utf8'), settle);
+                }
+            });
+
+            socket.on('error', (err) => {
+                if (connected) {
+                    console.error(`[TwikitBridgeClient] [worker ${this.index}] Socket error:`, err);
+                }
+                settle(err); // 'close' follows and fails the pending requests
+            });
+
+            socket.on('close', () => {
+                if (this.socket === socket) this.socket = null;
+                if (!connected) return; // Connect failure, retried by connect()
+                const wasReady = this.ready;
+                const closeError = new Error(`Connection to Python service on ${socketPath} closed`);
+                console.error(`[TwikitBridgeClient] [worker ${this.index}] Connection to Python service closed.`);
+                this.ready = false;
+                this.failPending(closeError);
+                settle(closeError);
+                this.emit('exit', null, null, wasReady);
+            });
+
+            const readyTimeout = setTimeout(() => {
+                if (!this.ready) {
+                    const err = new Error(`Python service on ${socketPath} did not become ready in time`);
+                    console.error('[TwikitBridgeClient]', err);
+                    settle(err);
+                    socket.destroy();
+                }
+            }, this.requestTimeoutMs);
+        });
+    }
+
+    /** One JSON document from the service: the ready signal, an init error, or a reply. */
+    private handleMessage(text: string, settle: (err?: Error) => void) {
+        try {
+            const response = JSON.parse(text);
+            if (response.status === 'ready') {
+                this.ready = true;
+                settle();
+                this.emit('ready');
+                return; // Don't process as a regular response
+            }
+            if (response.id === null && !response.success) {
+                // Initialization error reported before the service became ready
+                console.error(`[TwikitBridgeClient] [worker ${this.index}] Python service initialization error: ${response.error}`);
+                settle(new Error(response.error || 'Python service failed to initialize'));
+                return;
+            }
+            this.handleResponse(response);
+        } catch (e) {
+            console.error(`[TwikitBridgeClient] [worker ${this.index}] Error parsing JSON from Python: ${text}`, e);
+        }
+    }
+
+    private failPending(error: Error) {
+        this.pendingRequests.forEach(request => {
+            clearTimeout(request.timeout);
+            request.reject(error);
+        });
+        this.pendingRequests.clear();
+    }
+
+    private handleResponse(response: any) {
+        const requestId = response.id;
+        const request = this.pendingRequests.get(requestId);
+        if (!request) return;
+        clearTimeout(request.timeout);
+        if (response.stream && response.stream !== 'end') {
+            // More frames follow; the timeout covers the gap to the next one
+            request.timeout = this.armTimeout(requestId);
+            request.onFrame?.(response);
+            return;
+        }
+        if (response.meta) {
+            // Per-command metadata, e.g. time spent in the bridge's rate-limit queue
+            this.emit('meta', requestId, response.meta, response.account);
+            request.onMeta?.(response.meta);
+        }
+        this.pendingRequests.delete(requestId);
+        this.completed++;
+        if (response.success) {
+            request.resolve(response.data);
+        } else if (response.overloaded) {
+            request.reject(new BridgeOverloadedError(response.error, response.lane));
+        } else {
+            request.reject(new Error(response.error || 'Unknown Python error'));
+        }
+    }
+
+    public async stop(): Promise<void> {
+        const socket = this.socket;
+        if (socket) {
+            // Leave the shared service running for its other clients
+            await new Promise<void>(resolve => {
+                socket.once('close', () => resolve());
+                socket.end();
+                setTimeout(() => { socket.destroy(); resolve(); }, 1000).unref();
+            });
+        }
+        const pythonProcess = this.pythonProcess;
+        if (pythonProcess) {
+            pythonProcess.kill('SIGTERM'); // Send SIGTERM for graceful shutdown
+            // Add a timeout for SIGKILL if it doesn't exit gracefully
+            await new Promise(resolve => setTimeout(resolve, 1000)); // Wait a bit
+            if (pythonProcess.exitCode === null && pythonProcess.signalCode === null) {
+                pythonProcess.kill('SIGKILL');
+            }
+            if (this.pythonProcess === pythonProcess) this.pythonProcess = null;
+        }
+        this.ready = false;
+    }
+
+    private armTimeout(requestId: string, timeoutMs: number = this.requestTimeoutMs): NodeJS.Timeout {
+        return setTimeout(() => {
+            this.abandon(requestId, (action) => new Error(`Request to Python service timed out for action: ${action}`));
+        }, timeoutMs);
+    }
+
+    /** Fail a pending request locally and tell the service to stop working on it. */
+    private abandon(requestId: string, makeError: (action: string) => Error) {
+        const request = this.pendingRequests.get(requestId);
+        if (!request) return;
+        clearTimeout(request.timeout);
+        this.pendingRequests.delete(requestId);
+        request.reject(makeError(request.action));
+        try {
+            // Fire and forget: the reply carries an id nobody waits for
+            this.write({ id: randomUUID(), action: 'cancel', args: { id: requestId } });
+        } catch (error) {
+            // The transport is gone, and with it the work
+        }
+    }
+
+    private write(command: any) {
+        if (this.socket) {
+            const payload = Buffer.from(JSON.stringify(command), 'utf8');
+            const header = Buffer.alloc(FRAME_HEADER_BYTES);
+            header.writeUInt32BE(payload.length, 0);
+            this.socket.write(Buffer.concat([header, payload]));
+        } else if (this.pythonProcess) {
+            this.pythonProcess.stdin.write(JSON.stringify(command) + '\n');
+        }
+    }
+
+    public sendCommand(action: string, args: any = {}, options: CommandOptions = {}, timeoutMs: number | undefined = options.timeoutMs): Promise<any> {
+        if (!this.isReady) {
+            return Promise.reject(new Error(`Python service worker ${this.index} is not running or not ready.`));
+        }
+        if (this.pendingRequests.size >= MAX_PENDING_REQUESTS) {
+            return Promise.reject(new BridgeOverloadedError(
+                `overloaded: worker ${this.index} has ${this.pendingRequests.size} requests outstanding`));
+        }
+        if (options.signal?.aborted) {
+            return Promise.reject(new Error(`Request aborted for action: ${action}`));
+        }
+
+        const requestId = randomUUID();
+        const command: any = { id: requestId, action, args };
+        if (options.priority) command.priority = options.priority;
+        if (options.mode) command.mode = options.mode;
+        // The service drops the command once nobody is waiting for it any more.
+        // Streamed commands re-arm their timeout per frame, and the service pushes
+        // their deadline back by the same budget with every frame it sends
+        command.deadline = Date.now() + (timeoutMs ?? this.requestTimeoutMs);
+
+        return new Promise((resolve, reject) => {
+            const timeout = this.armTimeout(requestId, timeoutMs);
+            const onAbort = () => {
+                this.abandon(requestId, (aborted) => new Error(`Request aborted for action: ${aborted}`));
+            };
+            // However the request settles, stop listening: a long-lived signal
+            // shared by many commands would otherwise keep every closure alive
+            const settle = <T>(callback: (value: T) => void) => (value: T) => {
+                options.signal?.removeEventListener('abort', onAbort);
+                callback(value);
+            };
+
+            this.pendingRequests.set(requestId, {
+                resolve: settle(resolve), reject: settle(reject), timeout, action,
+                onFrame: options.onFrame, onMeta: options.onMeta,
+            });
+            options.signal?.addEventListener('abort', onAbort, { once: true });
+
+            try {
+                this.write(command);
+            } catch (error) {
+                clearTimeout(timeout);
+                this.pendingRequests.get(requestId)?.reject(error);
+                this.pendingRequests.delete(requestId);
+            }
+        });
+    }
+
+    /** Round trip a 'ping' command; marks the worker unhealthy when it fails. */
+    public async healthCheck(timeoutMs: number): Promise<boolean> {
+        const start = Date.now();
+        try {
+            await this.sendCommand('ping', {}, {}, timeoutMs);
+            this.lastHealthCheckMs = Date.now() - start;
+            this.healthy = true;
+        } catch (error) {
+            this.lastHealthCheckMs = null;
+            this.healthy = false;
+        }
+        return this.healthy;
+    }
+
+    public stats(): WorkerStats {
+        return {
+            index: this.index,
+            pid: this.pid,
+            ready: this.isReady,
+            healthy: this.healthy,
+            outstanding: this.outstanding,
+            completed: this.completed,
+            restarts: this.restarts,
+            lastHealthCheckMs: this.lastHealthCheckMs,
+        };
+    }
+}
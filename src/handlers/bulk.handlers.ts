@@ -0,0 +1,117 @@
+import { TwitterClient as ApiV2Client } from '../client/twitter.js';
+import { BulkItemResult, BulkSummary, TwikitBridgeClient } from '../client/twikitBridgeClient.js';
+import { HandlerResponse } from '../types/handlers.js';
+import { createResponse } from '../utils/response.js';
+
+export interface BulkAddUsersToListArgs {
+    listId: string;
+    userIds: string[];
+    parallelism?: number;
+}
+
+export interface BulkFollowUsersArgs {
+    userIds: string[];
+    parallelism?: number;
+}
+
+export interface BulkLikeTweetsArgs {
+    tweetIds: string[];
+    parallelism?: number;
+}
+
+// Items in flight at once in API mode; Twikit mode uses the bridge's TWIKIT_BULK_PARALLELISM
+const API_BULK_PARALLELISM = 4;
+
+// Type guard to check client type
+function isApiV2Client(client: ApiV2Client | TwikitBridgeClient): client is ApiV2Client {
+    return client instanceof ApiV2Client;
+}
+
+/** Run one API v2 call per id with bounded concurrency, collecting the same summary the bridge returns. */
+async function runApiBulk(ids: string[], parallelism: number, call: (id: string) => Promise<any>): Promise<BulkSummary> {
+    const unique = [...new Set(ids)];
+    const results: BulkItemResult[] = new Array(unique.length);
+    let next = 0;
+    const worker = async () => {
+        while (next < unique.length) {
+            const index = next++;
+            const id = unique[index];
+            try {
+                results[index] = { id, success: true, data: await call(id) };
+            } catch (error) {
+                results[index] = { id, success: false, error: error instanceof Error ? error.message : String(error) };
+            }
+        }
+    };
+    await Promise.all(Array.from({ length: Math.max(1, Math.min(parallelism, unique.length)) }, worker));
+    const succeeded = results.filter(result => result.success).length;
+    return { total: unique.length, succeeded, failed: unique.length - succeeded, skipped: 0, results };
+}
+
+function summarize(summary: BulkSummary): string {
+    const skipped = summary.skipped ? `, ${summary.skipped} skipped` : '';
+    return `${summary.succeeded}/${summary.total} succeeded (${summary.failed} failed${skipped}): ${JSON.stringify(summary.results)}`;
+}
+
+export async function handleBulkAddUsersToList(
+    client: ApiV2Client | TwikitBridgeClient,
+    { listId, userIds, parallelism }: BulkAddUsersToListArgs
+): Promise<HandlerResponse> {
+    try {
+        if (isApiV2Client(client)) {
+            const summary = await runApiBulk(userIds, parallelism ?? API_BULK_PARALLELISM,
+                async (userId) => (await client.v2.addListMember(listId, userId)).data);
+            return createResponse(`Added users to list ${listId}: ${summarize(summary)}`);
+        } else {
+            const summary = await client.bulkAddListMembers(listId, userIds, { parallelism });
+            return createResponse(`Added users to list ${listId} (via Twikit): ${summarize(summary)}`);
+        }
+    } catch (error) {
+        if (error instanceof Error) {
+            throw new Error(`Failed to add users to list: ${error.message}`);
+        }
+        throw new Error('Failed to add users to list: Unknown error occurred');
+    }
+}
+
+export async function handleBulkFollowUsers(
+    client: ApiV2Client | TwikitBridgeClient,
+    { userIds, parallelism }: BulkFollowUsersArgs
+): Promise<HandlerResponse> {
+    try {
+        if (isApiV2Client(client)) {
+            const summary = await runApiBulk(userIds, parallelism ?? API_BULK_PARALLELISM,
+                async (userId) => (await client.v2.follow(process.env.X_USER_ID!, userId)).data);
+            return createResponse(`Followed users: ${summarize(summary)}`);
+        } else {
+            const summary = await client.bulkFollow(userIds, { parallelism });
+            return createResponse(`Followed users (via Twikit): ${summarize(summary)}`);
+        }
+    } catch (error) {
+        if (error instanceof Error) {
+            throw new Error(`Failed to follow users: ${error.message}`);
+        }
+        throw new Error('Failed to follow users: Unknown error occurred');
+    }
+}
+
+export async function handleBulkLikeTweets(
+    client: ApiV2Client | TwikitBridgeClient,
+    { tweetIds, parallelism }: BulkLikeTweetsArgs
+): Promise<HandlerResponse> {
+    try {
+        if (isApiV2Client(client)) {
+            const summary = await runApiBulk(tweetIds, parallelism ?? API_BULK_PARALLELISM,
+                async (tweetId) => (await client.v2.like(process.env.X_USER_ID!, tweetId)).data);
+            return createResponse(`Liked tweets: ${summarize(summary)}`);
+        } else {
+            const summary = await client.bulkFavorite(tweetIds, { parallelism });
+            return createResponse(`Liked tweets (via Twikit): ${summarize(summary)}`);
+        }
+    } catch (error) {
+        if (error instanceof Error) {
+            throw new Error(`Failed to like tweets: ${error.message}`);
+        }
+        throw new Error('Failed to like tweets: Unknown error occurred');
+    }
+}
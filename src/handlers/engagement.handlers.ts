@@ -1,5 +1,5 @@
 import { TwitterClient as ApiV2Client } from '../client/twitter.js';
-import { TwikitBridgeClient } from '../client/twikitBridgeClient.js';
+import { TwikitBridgeClient, TWIKIT_USER_SUMMARY_FIELDS, TWIKIT_TWEET_SUMMARY_FIELDS } from '../client/twikitBridgeClient.js';
 import { UserV2 } from 'twitter-api-v2';
 import { 
     HandlerResponse, 
@@ -116,8 +116,8 @@ export async function handleGetRetweets(
             const retweets = await client.v2.tweetRetweetedBy(tweetId, { 'max_results': maxResults });
             return createResponse(`Retweets for ${tweetId}: ${JSON.stringify(retweets.data, null, 2)}`);
         } else {
-            const result = await client.getRetweeters(tweetId, maxResults);
-            return createResponse(`Retweets for ${tweetId} (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await client.getRetweeters(tweetId, maxResults, undefined, TWIKIT_USER_SUMMARY_FIELDS);
+            return createResponse(`Retweets for ${tweetId} (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
@@ -137,8 +137,8 @@ export async function handleGetLikedTweets(
             return createResponse(`Liked tweets for user ${userId}: ${JSON.stringify(likedTweets.data, null, 2)}`);
         } else {
             // Twikit client.get_user_favorites(user_id, count, cursor)
-            const result = await client.getUserFavorites(userId, maxResults);
-            return createResponse(`Liked tweets for user ${userId} (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await client.getUserFavorites(userId, maxResults, undefined, TWIKIT_TWEET_SUMMARY_FIELDS);
+            return createResponse(`Liked tweets for user ${userId} (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
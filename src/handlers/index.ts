@@ -2,4 +2,5 @@
 export * from './tweet.handlers.js';
 export * from './user.handlers.js';
 export * from './list.handlers.js';
-export * from './engagement.handlers.js'; 
\ No newline at end of file
+export * from './engagement.handlers.js';
+export * from './bulk.handlers.js'; 
\ No newline at end of file
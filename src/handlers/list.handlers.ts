@@ -1,5 +1,5 @@
 import { TwitterClient as ApiV2Client } from '../client/twitter.js';
-import { TwikitBridgeClient } from '../client/twikitBridgeClient.js';
+import { TwikitBridgeClient, TWIKIT_USER_SUMMARY_FIELDS } from '../client/twikitBridgeClient.js';
 import { HandlerResponse } from '../types/handlers.js';
 import { createResponse } from '../utils/response.js';
 import { ListV2, UserV2, ApiResponseError } from 'twitter-api-v2';
@@ -50,10 +50,10 @@ export async function handleGetUserLists(
             return createResponse(`Lists for user ${username}: ${JSON.stringify(lists.data, null, 2)}`);
         } else {
             // Twikit needs user ID. Get it first.
-            const user = await client.getUserByScreenName(username);
+            const user = await client.getUserByScreenName(username, ['id']);
             if (!user || !user.id) throw new Error(`User ${username} not found via Twikit.`);
             const result = await client.getUserLists(user.id, maxResults);
-            return createResponse(`Lists for user ${username} (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            return createResponse(`Lists for user ${username} (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
@@ -145,8 +145,8 @@ export async function handleGetListMembers(
             const users = await client.v2.listMembers(listId, { 'max_results': maxResults, 'user.fields': userFields as any });
             return createResponse(`List members for ${listId}: ${JSON.stringify(users.data, null, 2)}`);
         } else {
-            const result = await client.getListMembers(listId, maxResults);
-            return createResponse(`List members for ${listId} (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await client.getListMembers(listId, maxResults, undefined, TWIKIT_USER_SUMMARY_FIELDS);
+            return createResponse(`List members for ${listId} (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
@@ -1,5 +1,5 @@
 import { TwitterClient as ApiV2Client } from '../client/twitter.js';
-import { TwikitBridgeClient } from '../client/twikitBridgeClient.js';
+import { TwikitBridgeClient, TWIKIT_TWEET_SUMMARY_FIELDS } from '../client/twikitBridgeClient.js';
 import { HandlerResponse } from '../types/handlers.js';
 import { createResponse } from '../utils/response.js';
 import { TweetV2, TwitterApiReadOnly, UserV2, TweetSearchRecentV2Paginator } from 'twitter-api-v2';
@@ -14,6 +14,24 @@ interface HashtagAnalyticsArgs {
     hashtag: string;
     startTime?: string;
     endTime?: string;
+    maxTweets?: number;
+}
+
+export interface SearchLocalTweetsArgs {
+    query: string;
+    username?: string;
+    since?: string;
+    until?: string;
+    maxResults?: number;
+    cursor?: string;
+}
+
+export interface GetLocalUserTimelineArgs {
+    username: string;
+    since?: string;
+    until?: string;
+    maxResults?: number;
+    cursor?: string;
 }
 
 interface TweetWithAuthor extends TweetV2 {
@@ -27,7 +45,7 @@ function isApiV2Client(client: ApiV2Client | TwikitBridgeClient): client is ApiV
 
 export async function handleSearchTweets(
     client: ApiV2Client | TwikitBridgeClient,
-    { query, maxResults = 10 }: { query: string; maxResults?: number }
+    { query, maxResults = 10, onlyNew = false }: { query: string; maxResults?: number; onlyNew?: boolean }
 ): Promise<HandlerResponse> {
     try {
         if (isApiV2Client(client)) {
@@ -39,10 +57,15 @@ export async function handleSearchTweets(
             });
             return createResponse(`Search results for "${query}": ${JSON.stringify(searchResults.data, null, 2)}`);
         } else {
+            if (onlyNew) {
+                // The bridge remembers the newest result returned for this query and pages only down to it
+                const delta = await client.syncSearch(query, { count: maxResults, fields: TWIKIT_TWEET_SUMMARY_FIELDS });
+                return createResponse(`New search results for "${query}" (via Twikit): ${JSON.stringify(delta)}`);
+            }
             // Twikit search_tweet takes query, search_type ('Latest', 'Top', 'User', 'Image', 'Video'), count, cursor
             // Defaulting to 'Latest' search_type for now.
-            const result = await client.searchTweet(query, 'Latest', maxResults);
-            return createResponse(`Search results for "${query}" (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await client.searchTweet(query, 'Latest', maxResults, undefined, TWIKIT_TWEET_SUMMARY_FIELDS);
+            return createResponse(`Search results for "${query}" (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
@@ -54,7 +77,7 @@ export async function handleSearchTweets(
 
 export async function handleHashtagAnalytics(
     client: ApiV2Client | TwikitBridgeClient,
-    { hashtag, startTime, endTime }: { hashtag: string; startTime?: string; endTime?: string }
+    { hashtag, startTime, endTime, maxTweets }: { hashtag: string; startTime?: string; endTime?: string; maxTweets?: number }
 ): Promise<HandlerResponse> {
     try {
         if (isApiV2Client(client)) {
@@ -63,12 +86,11 @@ export async function handleHashtagAnalytics(
             const analytics = await client.v2.tweetCountRecent(cleanHashtag, { start_time: startTime, end_time: endTime });
             return createResponse(`Hashtag analytics for #${cleanHashtag}: ${JSON.stringify(analytics.data, null, 2)}\nTotal tweets: ${analytics.meta?.total_tweet_count}`);
         } else {
-            // Twikit does not have a direct equivalent for recent tweet counts for a hashtag.
-            // We could perform a search for the hashtag and count results, but it's not the same.
-            // For now, indicating limited support for this specific function with Twikit.
-            return createResponse(`Hashtag analytics for "${hashtag}" (via Twikit) is not directly supported. You can use general search. Searching for tweets with the hashtag...`);
-            // Optionally, perform a search: const result = await client.searchTweet(hashtag, 'Latest', 20);
-            // return createResponse(`Search for "${hashtag}" (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            // Twikit has no tweet counts endpoint; the bridge streams Latest search
+            // pages for the hashtag into incremental aggregates instead
+            const report = await client.hashtagAnalytics(hashtag, { since: startTime, until: endTime, maxTweets });
+            const coverage = report.complete ? '' : ` (first ${report.tweets} matching tweets; raise maxTweets for more)`;
+            return createResponse(`Hashtag analytics for ${report.hashtag} (via Twikit)${coverage}: ${JSON.stringify(report)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
@@ -76,4 +98,45 @@ export async function handleHashtagAnalytics(
         }
         throw new Error('Failed to get hashtag analytics: Unknown error occurred');
     }
-} 
\ No newline at end of file
+}
+
+export async function handleSearchLocalTweets(
+    client: ApiV2Client | TwikitBridgeClient,
+    { query, username, since, until, maxResults = 20, cursor }: SearchLocalTweetsArgs
+): Promise<HandlerResponse> {
+    try {
+        if (isApiV2Client(client)) {
+            return createResponse('Searching locally stored tweets is only available via Twikit. Use searchTweets instead.');
+        }
+        // Answered from tweets the bridge has already fetched; no upstream call, no rate budget
+        const result = await client.localSearch(query, {
+            screenName: username, since, until, count: maxResults, cursor, fields: TWIKIT_TWEET_SUMMARY_FIELDS,
+        });
+        return createResponse(`Locally stored tweets matching "${query}": ${JSON.stringify(result)}`);
+    } catch (error) {
+        if (error instanceof Error) {
+            throw new Error(`Failed to search local tweets for "${query}": ${error.message}`);
+        }
+        throw new Error('Failed to search local tweets: Unknown error occurred');
+    }
+}
+
+export async function handleGetLocalUserTimeline(
+    client: ApiV2Client | TwikitBridgeClient,
+    { username, since, until, maxResults = 20, cursor }: GetLocalUserTimelineArgs
+): Promise<HandlerResponse> {
+    try {
+        if (isApiV2Client(client)) {
+            return createResponse('Locally stored timelines are only available via Twikit. Use getUserTimeline instead.');
+        }
+        const result = await client.localTimeline({
+            screenName: username, since, until, count: maxResults, cursor, fields: TWIKIT_TWEET_SUMMARY_FIELDS,
+        });
+        return createResponse(`Locally stored tweets by @${username.replace(/^@/, '')}: ${JSON.stringify(result)}`);
+    } catch (error) {
+        if (error instanceof Error) {
+            throw new Error(`Failed to get local timeline for ${username}: ${error.message}`);
+        }
+        throw new Error('Failed to get local timeline: Unknown error occurred');
+    }
+}
@@ -1,5 +1,5 @@
 import { TwitterClient as ApiV2Client } from '../client/twitter.js';
-import { TwikitBridgeClient } from '../client/twikitBridgeClient.js';
+import { TwikitBridgeClient, TWIKIT_TWEET_SUMMARY_FIELDS } from '../client/twikitBridgeClient.js';
 import { HandlerResponse, GetUserTimelineArgs as AppGetUserTimelineArgs } from '../types/handlers.js';
 import { createResponse } from '../utils/response.js';
 import { TweetV2, TTweetv2Expansion, TTweetv2UserField } from 'twitter-api-v2';
@@ -137,7 +137,7 @@ export async function handleDeleteTweet(
 // This handler needs to be aligned with types.ts GetUserTimelineArgs which uses username, not userId.
 export const handleGetUserTimeline = async (
     client: ApiV2Client | TwikitBridgeClient,
-    { userId, username, maxResults = 10, tweetFields = ['created_at', 'public_metrics', 'author_id'], expansions = ['author_id' as TTweetv2Expansion], userFields = ['username' as TTweetv2UserField] }: AppGetUserTimelineArgs & { userId?: string; username?: string }
+    { userId, username, maxResults = 10, tweetFields = ['created_at', 'public_metrics', 'author_id'], expansions = ['author_id' as TTweetv2Expansion], userFields = ['username' as TTweetv2UserField], onlyNew = false }: AppGetUserTimelineArgs & { userId?: string; username?: string }
 ): Promise<HandlerResponse> => {
     try {
         if (isApiV2Client(client)) {
@@ -160,15 +160,20 @@ export const handleGetUserTimeline = async (
             let effectiveUserId = userId;
             if(!effectiveUserId && username) {
                 // TwikitBridgeClient needs a method like getUserByScreenName to convert username to ID first
-                const userObj = await (client as TwikitBridgeClient).getUserByScreenName(username);
+                const userObj = await (client as TwikitBridgeClient).getUserByScreenName(username, ['id']);
                 if (!userObj || !userObj.id) throw new Error(`User ${username} not found via Twikit.`);
                 effectiveUserId = userObj.id;
             }
             if (!effectiveUserId) throw new Error ('User ID or username is required for Twikit client timeline.');
 
+            if (onlyNew) {
+                // The bridge remembers the newest tweet returned and pages only down to it
+                const delta = await (client as TwikitBridgeClient).syncUserTweets(effectiveUserId, 'Tweets', { count: maxResults, fields: TWIKIT_TWEET_SUMMARY_FIELDS });
+                return createResponse(`New tweets in user timeline (via Twikit): ${JSON.stringify(delta)}`);
+            }
             // Assuming TwikitBridgeClient.getUserTweets takes userId, type, count, cursor
-            const result = await (client as TwikitBridgeClient).getUserTweets(effectiveUserId, 'Tweets', maxResults);
-            return createResponse(`User timeline (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await (client as TwikitBridgeClient).getUserTweets(effectiveUserId, 'Tweets', maxResults, undefined, TWIKIT_TWEET_SUMMARY_FIELDS);
+            return createResponse(`User timeline (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
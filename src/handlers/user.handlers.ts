@@ -1,5 +1,5 @@
 import { TwitterClient as ApiV2Client } from '../client/twitter.js';
-import { TwikitBridgeClient } from '../client/twikitBridgeClient.js';
+import { TwikitBridgeClient, TWIKIT_USER_SUMMARY_FIELDS } from '../client/twikitBridgeClient.js';
 import { UserV2, TTweetv2UserField } from 'twitter-api-v2';
 import { 
     HandlerResponse, 
@@ -64,7 +64,7 @@ export async function handleFollowUser(
             return createResponse(`Followed ${username}: ${data.following}`);
         } else {
             // Twikit follow method usually takes user_id. Need to get user_id from username first.
-            const user = await client.getUserByScreenName(username);
+            const user = await client.getUserByScreenName(username, ['id']);
             if (!user || !user.id) throw new Error(`User ${username} not found via Twikit.`);
             const result = await client.followUser(user.id);
             return createResponse(`Followed ${username} (via Twikit): ${result.following !== undefined ? result.following : JSON.stringify(result)}`);
@@ -88,7 +88,7 @@ export async function handleUnfollowUser(
             const { data } = await client.v2.unfollow(process.env.X_USER_ID!, userToUnfollow.data.id);
             return createResponse(`Unfollowed ${username}: ${data.following}`);
         } else {
-            const user = await client.getUserByScreenName(username);
+            const user = await client.getUserByScreenName(username, ['id']);
             if (!user || !user.id) throw new Error(`User ${username} not found via Twikit.`);
             const result = await client.unfollowUser(user.id);
             return createResponse(`Unfollowed ${username} (via Twikit): ${result.following !== undefined ? !result.following : JSON.stringify(result)}`);
@@ -112,10 +112,10 @@ export async function handleGetFollowers(
             const followers = await client.v2.followers(user.data.id, { 'max_results': maxResults, 'user.fields': 'username,public_metrics' });
             return createResponse(`Followers for ${username}: ${JSON.stringify(followers.data, null, 2)}`);
         } else {
-            const user = await client.getUserByScreenName(username);
+            const user = await client.getUserByScreenName(username, ['id']);
             if (!user || !user.id) throw new Error(`User ${username} not found via Twikit.`);
-            const result = await client.getUserFollowers(user.id, maxResults);
-            return createResponse(`Followers for ${username} (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await client.getUserFollowers(user.id, maxResults, undefined, TWIKIT_USER_SUMMARY_FIELDS);
+            return createResponse(`Followers for ${username} (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
@@ -136,10 +136,10 @@ export async function handleGetFollowing(
             const following = await client.v2.following(user.data.id, { 'max_results': maxResults, 'user.fields': 'username,public_metrics' });
             return createResponse(`Following for ${username}: ${JSON.stringify(following.data, null, 2)}`);
         } else {
-            const user = await client.getUserByScreenName(username);
+            const user = await client.getUserByScreenName(username, ['id']);
             if (!user || !user.id) throw new Error(`User ${username} not found via Twikit.`);
-            const result = await client.getUserFollowing(user.id, maxResults);
-            return createResponse(`Following for ${username} (via Twikit): ${JSON.stringify(result, null, 2)}`);
+            const result = await client.getUserFollowing(user.id, maxResults, undefined, TWIKIT_USER_SUMMARY_FIELDS);
+            return createResponse(`Following for ${username} (via Twikit): ${JSON.stringify(result)}`);
         }
     } catch (error) {
         if (error instanceof Error) {
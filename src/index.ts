@@ -40,9 +40,18 @@ import {
     handleGetListMembers,
     handleGetUserLists
 } from './handlers/list.handlers.js';
+import {
+    handleBulkAddUsersToList,
+    handleBulkFollowUsers,
+    handleBulkLikeTweets
+} from './handlers/bulk.handlers.js';
 import {
     handleSearchTweets,
-    handleHashtagAnalytics
+    handleHashtagAnalytics,
+    handleSearchLocalTweets,
+    handleGetLocalUserTimeline,
+    SearchLocalTweetsArgs,
+    GetLocalUserTimelineArgs
 } from './handlers/search.handlers.js';
 import { GetUserTimelineArgs } from './types/handlers.js';
 import { z } from 'zod';
@@ -249,6 +258,9 @@ async function registerTools() {
                 case 'likeTweet':
                     handlerResponse = await handleLikeTweet(activeTwitterClient, args as { tweetId: string });
                     break;
+                case 'bulkLikeTweets':
+                    handlerResponse = await handleBulkLikeTweets(activeTwitterClient, args as { tweetIds: string[]; parallelism?: number });
+                    break;
                 case 'unlikeTweet':
                     handlerResponse = await handleUnlikeTweet(activeTwitterClient, args as { tweetId: string });
                     break;
@@ -276,6 +288,9 @@ async function registerTools() {
                 case 'unfollowUser':
                     handlerResponse = await handleUnfollowUser(activeTwitterClient, args as { username: string });
                     break;
+                case 'bulkFollowUsers':
+                    handlerResponse = await handleBulkFollowUsers(activeTwitterClient, args as { userIds: string[]; parallelism?: number });
+                    break;
                 case 'getFollowers':
                     handlerResponse = await handleGetFollowers(activeTwitterClient, args as { username: string; maxResults?: number });
                     break;
@@ -291,6 +306,9 @@ async function registerTools() {
                 case 'removeUserFromList':
                     handlerResponse = await handleRemoveUserFromList(activeTwitterClient, args as { listId: string; userId: string });
                     break;
+                case 'bulkAddUsersToList':
+                    handlerResponse = await handleBulkAddUsersToList(activeTwitterClient, args as { listId: string; userIds: string[]; parallelism?: number });
+                    break;
                 case 'getListMembers':
                     handlerResponse = await handleGetListMembers(activeTwitterClient, args as { listId: string; maxResults?: number; userFields?: string[] });
                     break;
@@ -298,10 +316,16 @@ async function registerTools() {
                     handlerResponse = await handleGetUserLists(activeTwitterClient, args as { username: string; maxResults?: number });
                     break;
                 case 'searchTweets':
-                    handlerResponse = await handleSearchTweets(activeTwitterClient, args as { query: string; maxResults?: number; searchType?: string; tweetFields?: string[] });
+                    handlerResponse = await handleSearchTweets(activeTwitterClient, args as { query: string; maxResults?: number; searchType?: string; tweetFields?: string[]; onlyNew?: boolean });
+                    break;
+                case 'searchLocalTweets':
+                    handlerResponse = await handleSearchLocalTweets(activeTwitterClient, args as SearchLocalTweetsArgs);
+                    break;
+                case 'getLocalUserTimeline':
+                    handlerResponse = await handleGetLocalUserTimeline(activeTwitterClient, args as GetLocalUserTimelineArgs);
                     break;
                 case 'getHashtagAnalytics':
-                    handlerResponse = await handleHashtagAnalytics(activeTwitterClient, args as { hashtag: string; startTime?: string; endTime?: string });
+                    handlerResponse = await handleHashtagAnalytics(activeTwitterClient, args as { hashtag: string; startTime?: string; endTime?: string; maxTweets?: number });
                     break;
                 default:
                     console.error(`[MCP Server] Tool handler for ${toolName} not implemented.`);
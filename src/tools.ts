@@ -41,6 +41,26 @@ export const TOOLS = {
             required: ['tweetId'],
         },
     },
+    bulkLikeTweets: {
+        description: 'Like many tweets by their IDs in one call, reporting the outcome for each tweet',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                tweetIds: {
+                    type: 'array',
+                    items: { type: 'string' },
+                    description: 'The IDs of the tweets to like'
+                },
+                parallelism: {
+                    type: 'number',
+                    description: 'How many tweets to like at once (default: 4)',
+                    minimum: 1,
+                    maximum: 16
+                }
+            },
+            required: ['tweetIds'],
+        },
+    },
     unlikeTweet: {
         description: 'Unlike a previously liked tweet',
         inputSchema: {
@@ -94,6 +114,10 @@ export const TOOLS = {
                         type: 'string'
                     },
                     description: 'Fields to include in the tweet objects'
+                },
+                onlyNew: {
+                    type: 'boolean',
+                    description: 'Only return tweets posted since the previous onlyNew search for the same query (Twikit mode). The first call returns the latest page. Cheap to poll'
                 }
             },
             required: ['query']
@@ -149,6 +173,10 @@ export const TOOLS = {
                         enum: ['username', 'name', 'profile_image_url', 'verified']
                     },
                     description: 'User fields to include in the response'
+                },
+                onlyNew: {
+                    type: 'boolean',
+                    description: "Only return tweets posted since the previous onlyNew call for this user (Twikit mode). The first call returns the latest page. Cheap to poll"
                 }
             },
             required: ['userId']
@@ -271,6 +299,26 @@ export const TOOLS = {
             required: ['username'],
         },
     },
+    bulkFollowUsers: {
+        description: 'Follow many users by their IDs in one call, reporting the outcome for each user',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                userIds: {
+                    type: 'array',
+                    items: { type: 'string' },
+                    description: 'The IDs of the users to follow'
+                },
+                parallelism: {
+                    type: 'number',
+                    description: 'How many users to follow at once (default: 4)',
+                    minimum: 1,
+                    maximum: 16
+                }
+            },
+            required: ['userIds'],
+        },
+    },
     getFollowers: {
         description: 'Get followers of a user',
         inputSchema: {
@@ -353,6 +401,27 @@ export const TOOLS = {
             required: ['listId', 'username'],
         },
     },
+    bulkAddUsersToList: {
+        description: 'Add many users to a Twitter list in one call, reporting the outcome for each user',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                listId: { type: 'string', description: 'The ID of the list' },
+                userIds: {
+                    type: 'array',
+                    items: { type: 'string' },
+                    description: 'The IDs of the users to add'
+                },
+                parallelism: {
+                    type: 'number',
+                    description: 'How many users to add at once (default: 4)',
+                    minimum: 1,
+                    maximum: 16
+                }
+            },
+            required: ['listId', 'userIds'],
+        },
+    },
     getListMembers: {
         description: 'Get members of a Twitter list',
         inputSchema: {
@@ -401,6 +470,35 @@ export const TOOLS = {
             required: ['username'],
         },
     },
+    searchLocalTweets: {
+        description: 'Search tweets already fetched by earlier calls (Twikit mode only). Answered from a local store in milliseconds without using rate limits; results only cover tweets seen before',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                query: { type: 'string', description: 'Words that must all appear in the tweet; "quoted" phrases match as a whole' },
+                username: { type: 'string', description: 'Only tweets by this user' },
+                since: { type: 'string', description: 'Only tweets created at or after this time (ISO 8601)' },
+                until: { type: 'string', description: 'Only tweets created before this time (ISO 8601)' },
+                maxResults: { type: 'number', description: 'Maximum number of results to return (default: 20)', minimum: 1, maximum: 500 },
+                cursor: { type: 'string', description: 'next_cursor from a previous call, for the next page' }
+            },
+            required: ['query']
+        }
+    },
+    getLocalUserTimeline: {
+        description: "Get a user's tweets from those already fetched by earlier calls (Twikit mode only), newest first, without using rate limits",
+        inputSchema: {
+            type: 'object',
+            properties: {
+                username: { type: 'string', description: 'The username of the user' },
+                since: { type: 'string', description: 'Only tweets created at or after this time (ISO 8601)' },
+                until: { type: 'string', description: 'Only tweets created before this time (ISO 8601)' },
+                maxResults: { type: 'number', description: 'Maximum number of results to return (default: 20)', minimum: 1, maximum: 500 },
+                cursor: { type: 'string', description: 'next_cursor from a previous call, for the next page' }
+            },
+            required: ['username']
+        }
+    },
     getHashtagAnalytics: {
         description: 'Get analytics for a specific hashtag',
         inputSchema: {
@@ -417,6 +515,11 @@ export const TOOLS = {
                 endTime: {
                     type: 'string',
                     description: 'End time for the analysis (ISO 8601)'
+                },
+                maxTweets: {
+                    type: 'number',
+                    description: 'Most matching tweets to analyze, newest first (Twikit mode, default: 2000)',
+                    minimum: 1
                 }
             },
             required: ['hashtag']
@@ -35,6 +35,7 @@ export interface GetUserTimelineArgs {
     tweetFields?: string[];
     expansions?: TTweetv2Expansion[];
     userFields?: TTweetv2UserField[];
+    onlyNew?: boolean; // Twikit mode: only tweets since the previous onlyNew call
 }
 
 export interface AddUserToListArgs {
@@ -61,12 +62,14 @@ export interface GetUserListsArgs {
 export interface SearchTweetsArgs {
     query: string;
     maxResults?: number;
+    onlyNew?: boolean;
 }
 
 export interface HashtagAnalyticsArgs {
     hashtag: string;
     startTime?: string;
     endTime?: string;
+    maxTweets?: number;
 }
 
 export type TwitterHandler<T> = (client: TwitterClient, args: T) => Promise<HandlerResponse>; 
\ No newline at end of file